@@ -1,33 +1,86 @@
 import jwt
 import os
+import time
 from datetime import datetime, timedelta, timezone
-from werkzeug.security import check_password_hash
+from sqlalchemy.orm import joinedload
 from app.models.collaborateur import Collaborateur
+from app.auth.mots_de_passe import planifier_rehachage, verifier_mot_de_passe
+from app.auth.permissions import (
+    compiler_permissions,
+    empreinte_permissions,
+    permissions_effectives,
+)
+from app.auth.utils import (
+    REFRESH_TOKEN_FILE,
+    enregistrer_tokens,
+    verifier_refresh_token,
+)
 from app.database import SessionLocal
-from dotenv import load_dotenv
+from app import config
 
-# Charge les variables d'environnement depuis le fichier .env
-load_dotenv()
-
-# Clé secrète pour signer et vérifier les JWT
-SECRET_KEY = os.getenv("SECRET_KEY")
+# Clé secrète pour signer et vérifier les JWT (lue depuis le .env par app.config)
+SECRET_KEY = config.SECRET_KEY
 JWT_ALGORITHM = "HS256"
 
 
-def login(email: str, mot_de_passe: str, expire_minutes: int = 60) -> str:
+def creer_token_acces(collab: Collaborateur, expire_minutes: int = None) -> str:
+    """
+    Crée le token JWT d'accès d'un collaborateur (chargé avec son rôle).
+
+    Le payload contient l'ID, l'email, le rôle, les permissions du rôle
+    (compilées en masques de bits) et la date d'expiration.
+    """
+    # Permissions du rôle lues en base (par défaut si absentes ou à l'ancien format)
+    permissions = permissions_effectives(collab.role.role, collab.role.permissions)
+
+    # Prépare le payload du JWT
+    payload = {
+        "id": str(collab.id),  # Identifiant du collaborateur
+        "email": collab.email,
+        "role": collab.role.role,
+        "role_id": collab.role_id,
+        # Masques compilés : chaque vérification est un test de bit, sans requête
+        "permissions": compiler_permissions(permissions),
+        "permissions_empreinte": empreinte_permissions(permissions),
+        # Expiration : ACCESS_TOKEN_MINUTES (60 min par défaut)
+        "exp": datetime.now(timezone.utc)
+        + timedelta(minutes=expire_minutes or config.ACCESS_TOKEN_MINUTES),
+    }
+
+    # Encode le token JWT
+    return jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def creer_refresh_token(collab_id) -> str:
+    """
+    Crée le refresh token d'un collaborateur : il ne donne accès à aucune
+    commande et sert seulement à obtenir un nouveau token d'accès
+    (REFRESH_TOKEN_JOURS jours de validité).
+    """
+    payload = {
+        "id": str(collab_id),
+        "type": "refresh",
+        "exp": datetime.now(timezone.utc) + timedelta(days=config.REFRESH_TOKEN_JOURS),
+    }
+    return jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+
+def login(email: str, mot_de_passe: str, expire_minutes: int = None) -> str:
     """
     Authentifie un collaborateur et renvoie un token JWT s'il est valide.
 
     Étapes :
         1. Récupère le collaborateur dans la base via l'email fourni.
         2. Vérifie que le mot de passe correspond au hash stocké.
-        3. Crée un payload JWT avec l'ID, l'email, le rôle et la date d'expiration.
-        4. Encode le payload en token JWT signé avec la clé secrète.
+        3. Crée le token d'accès (voir `creer_token_acces`).
+        4. Rehache le mot de passe si les paramètres de son hash diffèrent de
+           PASSWORD_HASH_METHOD (voir `planifier_rehachage`).
 
     Paramètres :
         email (str): Email du collaborateur.
         mot_de_passe (str): Mot de passe en clair.
-        expire_minutes (int, optionnel): Durée de validité du token en minutes (défaut=60).
+        expire_minutes (int, optionnel): Durée de validité du token en minutes
+            (défaut : ACCESS_TOKEN_MINUTES, 60).
 
     Retour :
         str: Token JWT encodé.
@@ -37,28 +90,91 @@ def login(email: str, mot_de_passe: str, expire_minutes: int = 60) -> str:
     """
     db = SessionLocal()
     try:
-        # Recherche le collaborateur par email
-        collab = db.query(Collaborateur).filter_by(email=email).first()
+        # Recherche le collaborateur par email, avec son rôle dans la même requête
+        collab = (
+            db.query(Collaborateur)
+            .options(joinedload(Collaborateur.role))
+            .filter_by(email=email)
+            .first()
+        )
         if not collab:
             raise ValueError("Email ou mot de passe incorrect")
 
         # Vérifie le mot de passe avec le hash stocké
-        if not check_password_hash(collab.mot_de_passe, mot_de_passe):
+        if not verifier_mot_de_passe(collab.mot_de_passe, mot_de_passe):
             raise ValueError("Email ou mot de passe incorrect")
 
-        # Prépare le payload du JWT
-        payload = {
-            "id": str(collab.id),  # Identifiant du collaborateur
-            "email": collab.email,
-            "role": collab.role.role,
-            "exp": datetime.now(timezone.utc)
-            + timedelta(minutes=expire_minutes),  # Expiration 60min par défaut
-        }
-
-        # Encode le token JWT
-        token = jwt.encode(payload, SECRET_KEY, algorithm=JWT_ALGORITHM)
+        token = creer_token_acces(collab, expire_minutes)
+
+        # Hash calculé avec d'anciens paramètres : remplacé par la méthode configurée
+        planifier_rehachage(SessionLocal, collab.id, collab.mot_de_passe, mot_de_passe)
         return token
 
     finally:
         # Ferme la session pour libérer les ressources
         db.close()
+
+
+def rafraichir(refresh_token: str) -> tuple[str, str]:
+    """
+    Renouvelle les tokens à partir d'un refresh token, sans mot de passe.
+
+    Le collaborateur et son rôle sont relus : le nouveau token porte les
+    permissions actuelles. Le refresh token est lui aussi renouvelé.
+
+    Paramètres :
+        refresh_token (str): Refresh token reçu à la connexion.
+
+    Retour :
+        tuple[str, str]: Nouveau token d'accès et nouveau refresh token.
+
+    Exceptions :
+        PermissionError: Si le refresh token est expiré ou invalide.
+        ValueError: Si le collaborateur n'existe plus.
+    """
+    payload = verifier_refresh_token(refresh_token)
+    db = SessionLocal()
+    try:
+        collab = (
+            db.query(Collaborateur)
+            .options(joinedload(Collaborateur.role))
+            .filter_by(id=int(payload["id"]))
+            .first()
+        )
+        if not collab:
+            raise ValueError("Collaborateur introuvable. Veuillez vous reconnecter.")
+        return creer_token_acces(collab), creer_refresh_token(collab.id)
+    finally:
+        db.close()
+
+
+def rafraichir_si_necessaire(token: str) -> str:
+    """
+    Renouvelle sans message un token d'accès qui expire dans moins de
+    TOKEN_REFRESH_AVANCE secondes, si un refresh token est enregistré.
+
+    Les nouveaux tokens sont écrits dans les fichiers locaux. En cas d'échec
+    (refresh token expiré, collaborateur supprimé), le token d'origine est
+    renvoyé : sa vérification affichera l'erreur habituelle.
+
+    Retour :
+        str: Token d'accès à utiliser.
+    """
+    if not os.path.exists(REFRESH_TOKEN_FILE):
+        return token
+    try:
+        # Seule l'expiration est lue ici : la signature est vérifiée ensuite
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp", 0)
+    except jwt.InvalidTokenError:
+        return token
+    if exp - time.time() > config.TOKEN_REFRESH_AVANCE:
+        return token
+
+    with open(REFRESH_TOKEN_FILE, "r") as f:
+        refresh_token = f.read().strip()
+    try:
+        nouveau, refresh_token = rafraichir(refresh_token)
+    except (PermissionError, ValueError):
+        return token
+    enregistrer_tokens(nouveau, refresh_token)
+    return nouveau
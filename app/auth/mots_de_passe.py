@@ -0,0 +1,202 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import update
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+from app import config
+from app.models.collaborateur import Collaborateur
+
+# Paramètres par défaut de werkzeug, pour comparer "scrypt" à "scrypt:32768:8:1"
+SCRYPT_PAR_DEFAUT = ("32768", "8", "1")  # n (coût), r, p
+PBKDF2_PAR_DEFAUT = ("sha256", str(DEFAULT_PBKDF2_ITERATIONS))  # hash, itérations
+
+# Pool de processus partagé pendant `pool_hachage` (créé au premier besoin)
+_pool_ouvert = False
+_executeur = None
+
+
+def methode_normalisee(methode: str) -> str:
+    """
+    Complète une méthode de hachage werkzeug avec ses paramètres par défaut,
+    telle qu'elle apparaît en tête d'un hash stocké.
+
+    Exemples :
+        "scrypt"        -> "scrypt:32768:8:1"
+        "pbkdf2:sha256" -> "pbkdf2:sha256:1000000"
+    """
+    nom, *parametres = methode.split(":")
+    defauts = {"scrypt": SCRYPT_PAR_DEFAUT, "pbkdf2": PBKDF2_PAR_DEFAUT}.get(nom)
+    if defauts is None:
+        return methode
+    return ":".join([nom, *parametres, *defauts[len(parametres) :]])
+
+
+def hacher_mot_de_passe(mot_de_passe: str, methode: str = None) -> str:
+    """
+    Hache un mot de passe avec la méthode configurée (PASSWORD_HASH_METHOD).
+
+    Paramètres :
+        mot_de_passe : Mot de passe en clair.
+        methode : Méthode werkzeug (ex : "scrypt:16384:8:1", "pbkdf2:sha256:600000") ;
+                  celle de la configuration si absente.
+
+    Retour :
+        str : Hash au format werkzeug "méthode$sel$hash".
+    """
+    return generate_password_hash(
+        mot_de_passe,
+        method=methode or config.PASSWORD_HASH_METHOD,
+        salt_length=config.PASSWORD_SALT_LENGTH,
+    )
+
+
+@contextmanager
+def pool_hachage():
+    """
+    Partage un même pool de processus entre les appels à `hacher_mots_de_passe`
+    faits dans le bloc (ex : tous les lots d'un import), au lieu de démarrer
+    des processus à chaque appel. Le pool est arrêté à la sortie du bloc.
+
+    Exemple d'utilisation :
+        with pool_hachage():
+            for lot in lots:
+                hashs = hacher_mots_de_passe(lot)
+    """
+    global _pool_ouvert, _executeur
+    if _pool_ouvert:  # Bloc imbriqué : le pool du bloc englobant est réutilisé
+        yield
+        return
+    _pool_ouvert = True
+    try:
+        yield
+    finally:
+        _pool_ouvert = False
+        if _executeur is not None:
+            _executeur.shutdown()
+            _executeur = None
+
+
+def hacher_mots_de_passe(mots_de_passe: list[str], methode: str = None) -> list[str]:
+    """
+    Hache une liste de mots de passe en parallèle, sur un processus par cœur
+    (PASSWORD_HASH_WORKERS, 0 = nombre de cœurs de la machine).
+
+    Le hachage occupe entièrement un cœur : des processus (et non des threads)
+    permettent d'en utiliser plusieurs. Les petites listes sont hachées sur
+    place, sans démarrer de processus. Dans un bloc `pool_hachage`, les
+    processus sont démarrés une fois et réutilisés d'un appel à l'autre.
+
+    Paramètres :
+        mots_de_passe : Mots de passe en clair.
+        methode : Méthode werkzeug ; celle de la configuration si absente.
+
+    Retour :
+        list[str] : Hashs, dans l'ordre de `mots_de_passe`.
+    """
+    global _executeur
+    methode = methode or config.PASSWORD_HASH_METHOD
+    coeurs = config.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    processus = min(coeurs, len(mots_de_passe))
+    if processus <= 1:
+        return [hacher_mot_de_passe(mdp, methode) for mdp in mots_de_passe]
+
+    def hacher(executeur):
+        return list(
+            executeur.map(
+                hacher_mot_de_passe,
+                mots_de_passe,
+                [methode] * len(mots_de_passe),
+                chunksize=max(1, len(mots_de_passe) // (processus * 4)),
+            )
+        )
+
+    if _pool_ouvert:
+        if _executeur is None:
+            _executeur = ProcessPoolExecutor(max_workers=coeurs)
+        return hacher(_executeur)
+    with ProcessPoolExecutor(max_workers=processus) as executeur:
+        return hacher(executeur)
+
+
+def verifier_mot_de_passe(hache: str, mot_de_passe: str) -> bool:
+    """Vérifie un mot de passe en clair contre son hash stocké (quelle que soit sa méthode)."""
+    return check_password_hash(hache, mot_de_passe)
+
+
+def methode_du_hash(hache: str) -> str:
+    """Retourne la méthode d'un hash werkzeug ("scrypt:32768:8:1"...), ou None si le format est inconnu."""
+    if not hache or hache.count("$") < 2:
+        return None
+    return hache.split("$", 1)[0]
+
+
+def doit_rehacher(hache: str, methode: str = None) -> bool:
+    """Indique si un hash stocké a été calculé avec d'autres paramètres que la méthode cible."""
+    actuelle = methode_du_hash(hache)
+    cible = methode_normalisee(methode or config.PASSWORD_HASH_METHOD)
+    return actuelle is not None and actuelle != cible
+
+
+def rehacher(SessionLocal, collab_id: int, ancien_hash: str, mot_de_passe: str) -> bool:
+    """
+    Remplace le hash d'un collaborateur par un hash à la méthode cible.
+
+    L'UPDATE porte aussi sur l'ancien hash : si le mot de passe a été changé
+    entre-temps, la ligne n'est pas modifiée.
+
+    Retour :
+        bool : True si le hash a été remplacé.
+    """
+    nouveau = hacher_mot_de_passe(mot_de_passe)
+    db = SessionLocal()
+    try:
+        resultat = db.execute(
+            update(Collaborateur)
+            .where(
+                Collaborateur.id == collab_id,
+                Collaborateur.mot_de_passe == ancien_hash,
+            )
+            .values(mot_de_passe=nouveau)
+        )
+        db.commit()
+        return resultat.rowcount == 1
+    finally:
+        db.close()
+
+
+def planifier_rehachage(
+    SessionLocal, collab_id: int, ancien_hash: str, mot_de_passe: str
+) -> bool:
+    """
+    Rehache le mot de passe après une connexion réussie si son hash n'utilise
+    pas la méthode cible (PASSWORD_REHASH).
+
+    Avec PASSWORD_REHASH_ARRIERE_PLAN, le calcul se fait dans un thread : le
+    token est renvoyé sans attendre, et le processus ne se termine qu'une
+    fois le nouveau hash enregistré.
+
+    Retour :
+        bool : True si un rehachage a été lancé.
+    """
+    if not config.PASSWORD_REHASH or not doit_rehacher(ancien_hash):
+        return False
+
+    def executer():
+        try:
+            rehacher(SessionLocal, collab_id, ancien_hash, mot_de_passe)
+        except Exception:
+            # Opportuniste : en cas d'échec, l'ancien hash reste valide
+            pass
+
+    if config.PASSWORD_REHASH_ARRIERE_PLAN:
+        threading.Thread(target=executer, name="crm-rehachage").start()
+    else:
+        executer()
+    return True
@@ -1,3 +1,6 @@
+import hashlib
+import json
+
 # Permissions par défaut
 DEFAULT_PERMISSIONS = {
     "gestion": {
@@ -19,7 +22,87 @@ DEFAULT_PERMISSIONS = {
     },
 }
 
+# Actions possibles et bit correspondant dans le masque d'une ressource
+ACTIONS = ("lire", "creer", "modifier", "supprimer")
+BITS_ACTIONS = {action: 1 << position for position, action in enumerate(ACTIONS)}
+
+# Ressources soumises à permission
+RESSOURCES = ("client", "collaborateur", "contrat", "evenement", "role")
+
+
+def get_default_permissions(role_name: str) -> dict:
+    """
+    Retourne les permissions par défaut d'un rôle (copie de `DEFAULT_PERMISSIONS`),
+    au format de la colonne `roles.permissions` : {"client": ["lire", "creer"], ...}.
+    """
+    return {
+        ressource: list(actions)
+        for ressource, actions in DEFAULT_PERMISSIONS.get(role_name, {}).items()
+    }
+
+
+def permissions_valides(permissions) -> bool:
+    """
+    Indique si des permissions sont au format attendu : ressource connue ->
+    liste d'actions connues (les anciennes valeurs {"read": ..., "write": ...} ne le sont pas).
+    """
+    return isinstance(permissions, dict) and all(
+        ressource in RESSOURCES
+        and isinstance(actions, list)
+        and all(action in BITS_ACTIONS for action in actions)
+        for ressource, actions in permissions.items()
+    )
+
+
+def permissions_effectives(role_name: str, permissions) -> dict:
+    """
+    Retourne les permissions appliquées à un rôle : celles de la base si elles sont
+    au bon format, sinon (None, ancien format {"read", "write"}) les permissions par
+    défaut du rôle. Des permissions vides ({}) retirent tous les droits du rôle.
+    """
+    if permissions is not None and permissions_valides(permissions):
+        return permissions
+    return get_default_permissions(role_name)
+
 
-def get_default_permissions(role_name: str):
-    # retourne un dict JSON simulant les permissions
-    return {"read": True, "write": False}
+def compiler_permissions(permissions: dict) -> dict:
+    """
+    Compile des permissions en un masque de bits par ressource.
+
+    Exemple : {"client": ["lire", "creer"]} -> {"client": 3}
+
+    Retour :
+        dict : Ressource -> masque des actions autorisées (voir `BITS_ACTIONS`).
+    """
+    masques = {}
+    for ressource, actions in permissions.items():
+        masque = 0
+        for action in actions:
+            masque |= BITS_ACTIONS.get(action, 0)
+        if masque:
+            masques[ressource] = masque
+    return masques
+
+
+def empreinte_permissions(permissions: dict) -> str:
+    """
+    Retourne une empreinte courte des permissions d'un rôle : elle change dès
+    que les permissions changent, ce qui permet de repérer un token périmé.
+    """
+    canonique = json.dumps(
+        {r: sorted(a) for r, a in permissions.items()}, sort_keys=True
+    )
+    return hashlib.sha256(canonique.encode("utf-8")).hexdigest()[:16]
+
+
+def a_permission(masques: dict, action: str, ressource: str) -> bool:
+    """Test de bit : indique si les masques autorisent `action` sur `ressource`."""
+    return bool(masques.get(ressource, 0) & BITS_ACTIONS.get(action, 0))
+
+
+# Masques des rôles par défaut, compilés une fois au chargement du module
+# (utilisés pour les tokens émis avant l'ajout des permissions au JWT)
+MASQUES_PAR_DEFAUT = {
+    role: compiler_permissions(permissions)
+    for role, permissions in DEFAULT_PERMISSIONS.items()
+}
@@ -1,34 +1,42 @@
+import hashlib
 import jwt
 from jwt import ExpiredSignatureError, InvalidTokenError
 import os
-from dotenv import load_dotenv
-
-# Charge les variables d'environnement depuis le fichier .env
-load_dotenv()
+import time
+from app import config
 
 # Fichier où est stocké le token JWT localement
 TOKEN_FILE = ".token"
 
-# Clé secrète pour vérifier le JWT
-SECRET_KEY = os.getenv("SECRET_KEY")
+# Fichier du refresh token (renouvellement du token sans mot de passe)
+REFRESH_TOKEN_FILE = ".refresh_token"
+
+# Clé secrète pour vérifier le JWT (lue depuis le .env par app.config)
+SECRET_KEY = config.SECRET_KEY
 
 # Algorithme utilisé pour encoder/décoder le JWT
 JWT_ALGORITHM = "HS256"
 
+# Payloads déjà vérifiés dans ce processus : empreinte du token -> payload.
+# Un même token (shell, commandes enchaînées) n'est vérifié qu'une fois.
+_claims_verifies = {}
+CLAIMS_CACHE_MAX = 32
+
 
 def verifier_token(token: str):
     """
     Vérifie si un utilisateur est connecté et si le token JWT est valide.
 
     Étapes :
-        1. Vérifie si le fichier de token local existe.
-        2. Lit le token depuis le fichier.
-        3. Décode le token en utilisant la clé secrète et l'algorithme défini.
-        4. Retourne le payload décodé si le token est valide.
+        1. Si aucun token n'est fourni, le lit depuis le fichier de token local.
+        2. Retourne le payload en cache si ce token a déjà été vérifié dans le
+           processus et n'a pas expiré.
+        3. Sinon, décode le token en utilisant la clé secrète et l'algorithme défini.
+        4. Retourne le payload décodé si le token est valide (un refresh token est refusé).
 
     Paramètres :
-        token (str): Token JWT à vérifier (ici le paramètre est optionnel, car le token
-                     est lu depuis le fichier .token).
+        token (str): Token JWT à vérifier. S'il est vide, le token est lu depuis
+                     le fichier .token.
 
     Retour :
         dict: Payload décodé du token JWT (contient par ex. l'ID, email, rôle).
@@ -39,23 +47,75 @@ def verifier_token(token: str):
             - Si le token a expiré.
             - Si le token est invalide ou corrompu.
     """
-    # Vérifie si le fichier de token existe
-    if not os.path.exists(TOKEN_FILE):
-        raise PermissionError(
-            "Aucun token trouvé. Veuillez vous connecter avant d'accéder à cette commande."
-        )
+    if not token:
+        # Vérifie si le fichier de token existe
+        if not os.path.exists(TOKEN_FILE):
+            raise PermissionError(
+                "Aucun token trouvé. Veuillez vous connecter avant d'accéder à cette commande."
+            )
 
-    # Lit le token depuis le fichier
-    with open(TOKEN_FILE, "r") as f:
-        token = f.read().strip()
+        # Lit le token depuis le fichier
+        with open(TOKEN_FILE, "r") as f:
+            token = f.read().strip()
+
+    # Token déjà vérifié et pas encore expiré : signature non recalculée
+    cle = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    payload = _claims_verifies.get(cle)
+    if payload is not None and payload.get("exp", 0) > time.time():
+        return dict(payload)
 
     try:
         # Décode et vérifie le token JWT
         payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
     except ExpiredSignatureError:
         # Token expiré
         raise PermissionError("Votre session a expiré. Veuillez vous reconnecter.")
     except InvalidTokenError:
         # Token invalide
         raise PermissionError("Token invalide. Veuillez vous reconnecter.")
+
+    # Un refresh token ne donne accès à aucune commande
+    if payload.get("type") == "refresh":
+        raise PermissionError("Token invalide. Veuillez vous reconnecter.")
+
+    if len(_claims_verifies) >= CLAIMS_CACHE_MAX:
+        _claims_verifies.clear()
+    _claims_verifies[cle] = payload
+    return dict(payload)
+
+
+def verifier_refresh_token(token: str) -> dict:
+    """
+    Vérifie un refresh token et retourne son payload.
+
+    Exceptions :
+        PermissionError: Si le token est expiré, invalide ou n'est pas un refresh token.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    except ExpiredSignatureError:
+        raise PermissionError("Votre session a expiré. Veuillez vous reconnecter.")
+    except InvalidTokenError:
+        raise PermissionError("Refresh token invalide. Veuillez vous reconnecter.")
+    if payload.get("type") != "refresh":
+        raise PermissionError("Refresh token invalide. Veuillez vous reconnecter.")
+    return payload
+
+
+def enregistrer_tokens(token: str, refresh_token: str):
+    """
+    Écrit le token d'accès et le refresh token dans leurs fichiers locaux.
+
+    Le refresh token, valable plusieurs jours, n'est lisible que par l'utilisateur :
+    le fichier est créé avec ces droits (jamais lisible, même brièvement, selon
+    l'umask) et un fichier existant y est ramené.
+    """
+    with open(TOKEN_FILE, "w") as f:
+        f.write(token)
+    descripteur = os.open(
+        REFRESH_TOKEN_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+    )
+    if hasattr(os, "fchmod"):  # POSIX
+        os.fchmod(descripteur, 0o600)
+    with os.fdopen(descripteur, "w") as f:
+        f.write(refresh_token)
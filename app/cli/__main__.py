@@ -1,28 +1,63 @@
 import typer
-from sentry_init import sentry_sdk
-from app.cli import (
-    auth_cli,
-    db_cli,
-)  # Import des sous-commandes CLI définies dans l'application
+from app import config, telemetrie
+from app.cli.lazy import (
+    GroupeParesseux,
+)  # Groupe qui importe les sous-CLI (auth, db) seulement quand ils sont utilisés
+from app.cli.shell_cli import lancer_shell
 
 # Initialise l'application Typer principale pour le CRM
 # `help` fournit une description affichée lorsque l'utilisateur tape `--help`
-app = typer.Typer(help="CLI global du CRM")
+# Les sous-CLI `auth` et `db` sont déclarés dans `app.cli.lazy.SOUS_CLI` :
+# ils ne sont importés que lorsqu'une de leurs commandes est exécutée.
+app = typer.Typer(help="CLI global du CRM", cls=GroupeParesseux)
 
-# Ajoute le sous-CLI pour gérer l'authentification
-# Accessible via la commande : `python main.py auth ...`
-app.add_typer(auth_cli.app, name="auth", help="Commandes pour l'authentification")
 
-# Ajoute le sous-CLI pour gérer la base de données
-# Accessible via la commande : `python main.py db ...`
-app.add_typer(db_cli.app, name="db", help="Commandes pour gérer les données")
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Affiche le nombre, la durée et les plus lentes des requêtes SQL de la commande",
+    ),
+):
+    """
+    CLI global du CRM.
+    """
+    # Le profil SQL est aussi activé, sans affichage, quand DB_PROFILE_LOG est renseigné
+    if profile or config.DB_PROFILE_LOG:
+        # Import local : SQLAlchemy n'est pas chargé pour `--help`
+        from app.utils.profil_utils import ProfilSQL
+
+        profil = ProfilSQL().demarrer()
+        ctx.call_on_close(
+            lambda: profil.terminer(afficher=profile, journal=config.DB_PROFILE_LOG)
+        )
+    # Envoi des événements métier en attente si un lot est prêt (attente bornée)
+    if telemetrie.actif():
+        ctx.call_on_close(telemetrie.expedier)
+
+
+@app.command("shell")
+def shell():
+    """
+    Ouvre un shell interactif pour enchaîner les commandes auth et db.
+
+    Le moteur, le pool de connexions et le token vérifié restent en mémoire
+    entre les commandes : chaque commande ne paie plus le démarrage de la CLI.
+    """
+    lancer_shell(app)
+
 
 # Point d'entrée du script
 if __name__ == "__main__":
     # Démarre l'application CLI principale
-    # Toutes les commandes ajoutées via add_typer seront disponibles ici
+    # Toutes les commandes déclarées dans SOUS_CLI seront disponibles ici
     try:
         app()
     except Exception as e:
+        # Sentry n'est initialisé qu'en cas d'erreur à remonter
+        from sentry_init import sentry_sdk
+
         sentry_sdk.capture_exception(e)
         raise
@@ -1,7 +1,11 @@
 import typer
 from app.auth.core import (
+    creer_refresh_token,
     login,
-)  # Fonction pour authentifier l'utilisateur et récupérer un token JWT
+    rafraichir,
+)  # Fonctions pour authentifier l'utilisateur et récupérer un token JWT
+from app.auth import utils as auth_utils  # Fichiers locaux des tokens
+from app.auth.utils import enregistrer_tokens, verifier_token
 from pathlib import (
     Path,
 )  # Pour manipuler le chemin du fichier local de manière portable
@@ -14,9 +18,6 @@ app = typer.Typer(help="Commandes pour l'authentification")
 # Initialise la console Rich pour un affichage stylisé
 console = Console()
 
-# Chemin du fichier local où sera stocké le token JWT
-TOKEN_FILE = Path(".token")
-
 
 def intro():
     """
@@ -44,7 +45,8 @@ def login_user(
 
     Étapes :
         1. Appelle `login(email, mot_de_passe)` pour authentifier l'utilisateur.
-        2. Si l'authentification réussit, écrit le token dans le fichier `.token`.
+        2. Si l'authentification réussit, écrit le token dans le fichier `.token`
+           et un refresh token dans `.refresh_token` (voir `auth refresh`).
         3. Affiche un aperçu du token dans la console (partiellement masqué pour la sécurité).
 
     Gestion des erreurs :
@@ -56,8 +58,8 @@ def login_user(
     try:
         # Authentifie l'utilisateur et récupère le token JWT
         token = login(email, mot_de_passe)
-        # Écrit le token dans le fichier local
-        TOKEN_FILE.write_text(token)
+        # Écrit le token et le refresh token (renouvellement sans mot de passe)
+        enregistrer_tokens(token, creer_refresh_token(verifier_token(token)["id"]))
         # Masque partiellement le token pour la sécurité
         short_token = token[:10] + "..." + token[-10:]
         # Affiche un panneau de succès avec le token partiellement masqué
@@ -81,6 +83,44 @@ def login_user(
         )
 
 
+@app.command("refresh")
+def refresh_user():
+    """
+    Renouvelle le token JWT avec le refresh token, sans ressaisir le mot de passe.
+
+    Le rôle et les permissions sont relus : le nouveau token tient compte des
+    modifications du rôle. Le refresh token est lui aussi renouvelé.
+    Les autres commandes le font automatiquement quand le token expire bientôt.
+    """
+    refresh_token_file = Path(auth_utils.REFRESH_TOKEN_FILE)
+    if not refresh_token_file.exists():
+        console.print(
+            Panel.fit(
+                "[yellow]Aucun refresh token trouvé.[/]\n"
+                "[white]Veuillez vous connecter (auth login).[/]",
+                border_style="yellow",
+            )
+        )
+        raise typer.Exit(code=1)
+    try:
+        token, refresh_token = rafraichir(refresh_token_file.read_text().strip())
+    except (PermissionError, ValueError) as e:
+        console.print(
+            Panel.fit(
+                f"[bold red]Renouvellement impossible :[/] {e}", border_style="red"
+            )
+        )
+        raise typer.Exit(code=1)
+    enregistrer_tokens(token, refresh_token)
+    console.print(
+        Panel.fit(
+            "[bold green]Token renouvelé ![/]\n"
+            "[white]Nouveau token JWT enregistré dans [yellow].token[/][/]",
+            border_style="green",
+        )
+    )
+
+
 @app.command("logout")
 def logout_user():
     """
@@ -88,12 +128,15 @@ def logout_user():
 
     Étapes :
         1. Vérifie si le fichier de token existe.
-        2. Supprime le fichier pour invalider la session.
+        2. Supprime le fichier (et le refresh token) pour invalider la session.
         3. Affiche un message de confirmation ou d'erreur.
     """
-    if TOKEN_FILE.exists():
+    # Le refresh token est supprimé dans tous les cas
+    Path(auth_utils.REFRESH_TOKEN_FILE).unlink(missing_ok=True)
+    token_file = Path(auth_utils.TOKEN_FILE)
+    if token_file.exists():
         # Supprime le token pour déconnecter l'utilisateur
-        TOKEN_FILE.unlink()
+        token_file.unlink()
         console.print(
             Panel.fit(
                 "[bold green]Déconnexion réussie ![/]\n"
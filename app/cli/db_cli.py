@@ -1,13 +1,15 @@
+import json
 import typer
 from rich.console import Console
 from datetime import datetime
-from werkzeug.security import (
-    generate_password_hash,
+from pathlib import Path
+from app.auth.mots_de_passe import (
+    hacher_mot_de_passe,
 )  # Pour sécuriser les mots de passe des collaborateurs
-from sqlalchemy.orm import sessionmaker
-from sentry_init import sentry_sdk
-from sqlalchemy import inspect
-from app.database import engine  # Connexion à la base de données
+from app.telemetrie import evenement_metier  # Événements métier envoyés par lots
+from app.database import (
+    SessionLocal,
+)  # Fabrique de sessions (le moteur est créé à la première session)
 from app.models.collaborateur import Collaborateur, Role
 from app.models.client import Client
 from app.models.contrat import Contrat
@@ -17,20 +19,64 @@ from app.utils.db_utils import (
     add_table,
     update_table,
     delete_table,
+    unite_de_travail,
+    add_row,
+    afficher_ajout,
+    afficher_modification,
     add_collaborateur,
     verifier_permission,
-    verifier_connexion,
+    ContexteAuth,
     validate_montant_restant,
     validate_participants,
     validate_email,
     validate_positive_float,
     validate_single_date,
-    afficher_table,
     can_create_evenement,
     can_update_contrat,
     can_update_evenement,
     verifier_modifications,
     can_update_client,
+    DEFAULT_PAGE_SIZE,
+    parse_colonnes,
+    update_proprietaire,
+    diagnostiquer_refus,
+    add_evenement_proprietaire,
+    console as console_db,
+)
+from app.auth.permissions import (
+    ACTIONS,
+    RESSOURCES,
+    get_default_permissions,
+    permissions_valides,
+)
+from app.utils.cache_utils import (
+    enregistrer_cache,
+    get_cache,
+    invalider_reference,
+    role_reference,
+    verifier_collaborateur_role,
+    verifier_role_existe,
+)
+from app.utils.import_utils import IMPORTS, IMPORT_BATCH_SIZE, importer_fichier
+from app.utils.requetes_utils import (
+    requete_filter_contrats,
+    requete_filter_evenements,
+    requetes_cli,
+    plan_execution,
+    utilise_index,
+)
+from app.utils.rendu_utils import (
+    FORMATS_AFFICHAGE,
+    afficher_resultat,
+    messages_sur_stderr,
+    resoudre_format,
+)
+from app.utils.export_utils import (
+    EXPORTS,
+    EXPORT_BATCH_SIZE,
+    FORMATS,
+    COMPRESSIONS,
+    exporter_table,
 )
 
 # Initialise la console Rich pour l'affichage coloré
@@ -39,8 +85,75 @@ console = Console()
 # Initialise l'application Typer pour les commandes CLI
 app = typer.Typer(help="Commandes CLI pour gérer les tables de la base de données")
 
-# Création d'une session SQLAlchemy pour interagir avec la DB
-SessionLocal = sessionmaker(bind=engine)
+
+@app.callback()
+def main(ctx: typer.Context):
+    """
+    Commandes CLI pour gérer les tables de la base de données.
+
+    Crée le contexte d'authentification partagé par la commande invoquée :
+    le token est lu et vérifié une seule fois par invocation. Toutes les
+    fonctions appelées par la commande partagent la même session SQLAlchemy.
+    """
+    if ctx.obj is None:
+        ctx.obj = ContexteAuth(SessionLocal)
+    # Libère la session de la commande (et sa connexion) à la fin de l'exécution
+    ctx.call_on_close(SessionLocal.remove)
+    # Compteurs de succès du cache de référence : une écriture en fin de commande
+    ctx.call_on_close(enregistrer_cache)
+
+
+# Options de pagination communes aux commandes de lecture
+LIMIT_OPTION = typer.Option(
+    None, "--limit", min=1, help="Nombre maximal de lignes à afficher"
+)
+AFTER_ID_OPTION = typer.Option(
+    None, "--after-id", help="Reprend la lecture après cet identifiant"
+)
+PAGE_SIZE_OPTION = typer.Option(
+    DEFAULT_PAGE_SIZE, "--page-size", min=1, help="Nombre de lignes par page"
+)
+
+# Projection : seules les colonnes demandées sont lues en base
+COLUMNS_OPTION = typer.Option(
+    None,
+    "--columns",
+    help="Colonnes à afficher, séparées par des virgules (ex : id,lieu,date_debut)",
+)
+
+# Lecture des tables liées dans la même requête (LEFT JOIN)
+WITH_RELATIONS_OPTION = typer.Option(
+    False,
+    "--with-relations",
+    help="Affiche aussi les noms liés (client, commercial, support)",
+)
+
+# Format d'affichage : Rich dans un terminal, texte ou JSON sans mesure de largeur sinon
+FORMAT_OPTION = typer.Option(
+    None,
+    "--format",
+    help=f"Format : {', '.join(FORMATS_AFFICHAGE)} (défaut : rich dans un terminal, tsv sinon)",
+)
+
+# Parcours interactif : fenêtre de lignes, pages lues au défilement
+PAGER_OPTION = typer.Option(
+    False,
+    "--pager",
+    help="Parcourt les lignes dans un pager (Rich, dans un terminal)",
+)
+
+
+def format_lecture(ctx: typer.Context, format_sortie: str = None) -> str:
+    """
+    Résout le format d'affichage d'une commande de lecture (voir `resoudre_format`).
+
+    Hors Rich, les messages (connexion, titre, pagination) passent sur la
+    sortie d'erreur : la sortie standard ne contient que les données.
+    """
+    format_sortie = resoudre_format(format_sortie)
+    if format_sortie != "rich":
+        messages_sur_stderr(ctx, console, console_db)
+    return format_sortie
 
 
 # ==================== LECTURE ====================
@@ -48,77 +161,188 @@ SessionLocal = sessionmaker(bind=engine)
 
 
 @app.command("read-collaborateurs")
-def read_collaborateurs():
+def read_collaborateurs(
+    ctx: typer.Context,
+    limit: int = LIMIT_OPTION,
+    after_id: int = AFTER_ID_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    columns: str = COLUMNS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+    pager: bool = PAGER_OPTION,
+):
     """
     Affiche tous les collaborateurs enregistrés dans la base de données.
 
-    Cette commande lit tous les enregistrements de la table `Collaborateur`
+    Cette commande lit les enregistrements de la table `Collaborateur`
     et affiche leurs informations principales.
+    La lecture est paginée : voir --limit, --after-id et --page-size.
+    --format choisit l'affichage (rich, plain, tsv, json ou jsonl).
+    --pager ouvre un pager : les pages suivantes sont lues au défilement.
     """
-    if not verifier_permission("lire", "collaborateur"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "collaborateur", ctx.obj):
         return
     console.print("[bold cyan]Lecture des collaborateurs[/]")
-    read_table(Collaborateur, SessionLocal)
+    read_table(
+        Collaborateur,
+        SessionLocal,
+        limit,
+        after_id,
+        page_size,
+        parse_colonnes(Collaborateur, columns),
+        format_sortie=format_sortie,
+        pager=pager,
+    )
 
 
 @app.command("read-clients")
-def read_clients():
+def read_clients(
+    ctx: typer.Context,
+    limit: int = LIMIT_OPTION,
+    after_id: int = AFTER_ID_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    columns: str = COLUMNS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+    pager: bool = PAGER_OPTION,
+):
     """
     Affiche tous les clients enregistrés dans la base de données.
 
-    Cette commande lit tous les enregistrements de la table `Client`
+    Cette commande lit les enregistrements de la table `Client`
     et affiche leurs informations principales.
+    La lecture est paginée : voir --limit, --after-id et --page-size.
+    --format choisit l'affichage (rich, plain, tsv, json ou jsonl).
+    --pager ouvre un pager : les pages suivantes sont lues au défilement.
     """
 
-    if not verifier_permission("lire", "client"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "client", ctx.obj):
         return
     console.print("[bold cyan]Lecture des clients[/]")
-    read_table(Client, SessionLocal)
+    read_table(
+        Client,
+        SessionLocal,
+        limit,
+        after_id,
+        page_size,
+        parse_colonnes(Client, columns),
+        format_sortie=format_sortie,
+        pager=pager,
+    )
 
 
 @app.command("read-contrats")
-def read_contrats():
+def read_contrats(
+    ctx: typer.Context,
+    limit: int = LIMIT_OPTION,
+    after_id: int = AFTER_ID_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    columns: str = COLUMNS_OPTION,
+    with_relations: bool = WITH_RELATIONS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+    pager: bool = PAGER_OPTION,
+):
     """
     Affiche tous les contrats enregistrés dans la base de données.
 
-    Cette commande lit tous les enregistrements de la table `Contrat`
+    Cette commande lit les enregistrements de la table `Contrat`
     et affiche leurs informations principales.
+    La lecture est paginée : voir --limit, --after-id et --page-size.
+    --format choisit l'affichage (rich, plain, tsv, json ou jsonl).
+    --pager ouvre un pager : les pages suivantes sont lues au défilement.
+    --with-relations ajoute le nom du client et du commercial (une requête par page).
     """
 
-    if not verifier_permission("lire", "contrat"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "contrat", ctx.obj):
         return
     console.print("[bold cyan]Lecture des contrats[/]")
-    read_table(Contrat, SessionLocal)
+    read_table(
+        Contrat,
+        SessionLocal,
+        limit,
+        after_id,
+        page_size,
+        parse_colonnes(Contrat, columns),
+        with_relations,
+        format_sortie=format_sortie,
+        pager=pager,
+    )
 
 
 @app.command("read-evenements")
-def read_evenements():
+def read_evenements(
+    ctx: typer.Context,
+    limit: int = LIMIT_OPTION,
+    after_id: int = AFTER_ID_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    columns: str = COLUMNS_OPTION,
+    with_relations: bool = WITH_RELATIONS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+    pager: bool = PAGER_OPTION,
+):
     """
     Affiche tous les événements enregistrés dans la base de données.
 
-    Cette commande lit tous les enregistrements de la table `Evenement`
+    Cette commande lit les enregistrements de la table `Evenement`
     et affiche leurs informations principales.
+    La lecture est paginée : voir --limit, --after-id et --page-size.
+    --format choisit l'affichage (rich, plain, tsv, json ou jsonl).
+    --pager ouvre un pager : les pages suivantes sont lues au défilement.
+    --with-relations ajoute le nom du client et du support (une requête par page).
     """
 
-    if not verifier_permission("lire", "evenement"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "evenement", ctx.obj):
         return
     console.print("[bold cyan]Lecture des événements[/]")
-    read_table(Evenement, SessionLocal)
+    read_table(
+        Evenement,
+        SessionLocal,
+        limit,
+        after_id,
+        page_size,
+        parse_colonnes(Evenement, columns),
+        with_relations,
+        format_sortie=format_sortie,
+        pager=pager,
+    )
 
 
 @app.command("read-roles")
-def read_roles():
+def read_roles(
+    ctx: typer.Context,
+    limit: int = LIMIT_OPTION,
+    after_id: int = AFTER_ID_OPTION,
+    page_size: int = PAGE_SIZE_OPTION,
+    columns: str = COLUMNS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+    pager: bool = PAGER_OPTION,
+):
     """
     Affiche tous les rôles enregistrés dans la base de données.
 
-    Cette commande lit tous les enregistrements de la table `Role`
+    Cette commande lit les enregistrements de la table `Role`
     et affiche leurs informations principales.
+    La lecture est paginée : voir --limit, --after-id et --page-size.
+    --format choisit l'affichage (rich, plain, tsv, json ou jsonl).
+    --pager ouvre un pager : les pages suivantes sont lues au défilement.
     """
 
-    if not verifier_permission("lire", "role"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "role", ctx.obj):
         return
     console.print("[bold cyan]Lecture des rôles[/]")
-    return read_table(Role, SessionLocal)
+    return read_table(
+        Role,
+        SessionLocal,
+        limit,
+        after_id,
+        page_size,
+        parse_colonnes(Role, columns),
+        format_sortie=format_sortie,
+        pager=pager,
+    )
 
 
 # ==================== AJOUT ====================
@@ -127,6 +351,7 @@ def read_roles():
 
 @app.command("add-client")
 def add_client(
+    ctx: typer.Context,
     nom_complet: str,
     email: str,
     telephone: str,
@@ -144,10 +369,10 @@ def add_client(
         contact_commercial_id : ID du collaborateur référent (optionnel).
     """
 
-    if not verifier_permission("creer", "client"):
+    if not verifier_permission("creer", "client", ctx.obj):
         return
 
-    payload = verifier_connexion()
+    payload = ctx.obj.payload
     email = validate_email(email)  # Vérifie la validité de l'email
     contact_commercial_id = payload["id"] if payload["role"] == "commercial" else None
 
@@ -170,6 +395,7 @@ def add_client(
 
 @app.command("add-collaborateur")
 def cli_add_collaborateur(
+    ctx: typer.Context,
     nom: str,
     email: str,
     mot_de_passe: str = typer.Option(..., prompt=True, hide_input=True),
@@ -179,11 +405,14 @@ def cli_add_collaborateur(
     Ajoute un collaborateur avec mot de passe haché.
     """
 
-    if not verifier_permission("creer", "collaborateur"):
+    if not verifier_permission("creer", "collaborateur", ctx.obj):
         return
 
     email = validate_email(email)
 
+    if not verifier_role_existe(SessionLocal, role_id):
+        return
+
     collab = add_collaborateur(SessionLocal, nom, email, mot_de_passe, role_id)
     console.print(
         f"[bold green]Collaborateur '{collab['nom']}' ajouté avec succès ![/]"
@@ -192,6 +421,7 @@ def cli_add_collaborateur(
 
 @app.command("add-contrat")
 def add_contrat(
+    ctx: typer.Context,
     montant_total: float,
     montant_restant: float,
     statut_contrat: bool,
@@ -208,41 +438,44 @@ def add_contrat(
         contact_commercial_id : ID du collaborateur commercial responsable.
     """
 
-    if not verifier_permission("creer", "contrat"):
+    if not verifier_permission("creer", "contrat", ctx.obj):
         return
     montant_total = validate_positive_float(montant_total)
     montant_restant = validate_montant_restant(montant_total, montant_restant)
 
-    session = SessionLocal()
-    client = session.query(Client).filter(Client.id == client_id).first()
-    if not client:
-        print(f"Client avec l'ID {client_id} introuvable")
-        return
-
-    contact_commercial_id = client.contact_commercial_id
-
-    now = datetime.now()
-
-    collatéral = add_table(
-        Contrat,
-        SessionLocal,
-        {
-            "montant_total": montant_total,
-            "montant_restant": montant_restant,
-            "statut_contrat": statut_contrat,
-            "client_id": client_id,
-            "date_creation": now,
-            "contact_commercial_id": contact_commercial_id,
-        },
-    )
+    # Lecture du client et création du contrat dans la même transaction
+    with unite_de_travail(SessionLocal) as db:
+        client = db.get(Client, client_id)
+        if not client:
+            print(f"Client avec l'ID {client_id} introuvable")
+            return
+
+        contact_commercial_id = client.contact_commercial_id
+
+        now = datetime.now()
+
+        collatéral = add_row(
+            db,
+            Contrat,
+            {
+                "montant_total": montant_total,
+                "montant_restant": montant_restant,
+                "statut_contrat": statut_contrat,
+                "client_id": client_id,
+                "date_creation": now,
+                "contact_commercial_id": contact_commercial_id,
+            },
+        )
+    afficher_ajout(Contrat)
     if statut_contrat:
-        sentry_sdk.capture_message(
+        evenement_metier(
             f"Contrat signé : ID {collatéral['id']} pour client {client_id}"
         )
 
 
 @app.command("add-evenement")
 def add_evenement(
+    ctx: typer.Context,
     date_debut: str,
     date_fin: str,
     lieu: str,
@@ -268,15 +501,10 @@ def add_evenement(
         support_contact_id : ID du collaborateur support (optionnel).
     """
 
-    if not verifier_permission("creer", "evenement"):
+    if not verifier_permission("creer", "evenement", ctx.obj):
         return
 
-    payload = verifier_connexion()
-    db = SessionLocal()
-    contrat = db.query(Contrat).filter(Contrat.id == contrat_id).first()
-    if not can_create_evenement(payload, contrat):
-        db.close()
-        return
+    payload = ctx.obj.payload
 
     if date_debut:
         date_debut = validate_single_date(date_debut)
@@ -287,36 +515,58 @@ def add_evenement(
 
     participants, attendues = validate_participants(participants, attendues)
 
-    add_table(
-        Evenement,
-        SessionLocal,
-        {
-            "date_debut": date_debut,
-            "date_fin": date_fin,
-            "lieu": lieu,
-            "participants": participants,
-            "attendues": attendues,
-            "contrat_id": contrat_id,
-            "client_id": contrat.client_id if contrat else None,
-            "support_contact_id": None,
-        },
-    )
-    db.close()
+    # Création conditionnée au contrat (signé, du commercial connecté) en une requête
+    with unite_de_travail(SessionLocal) as db:
+        evenement = add_evenement_proprietaire(
+            db,
+            {
+                "date_debut": date_debut,
+                "date_fin": date_fin,
+                "lieu": lieu,
+                "participants": participants,
+                "attendues": attendues,
+                "contrat_id": contrat_id,
+                "support_contact_id": None,
+            },
+            payload,
+        )
+        if evenement is None:
+            if contrat_id is None:
+                can_create_evenement(payload, None)
+            else:
+                diagnostiquer_refus(
+                    db,
+                    Contrat,
+                    contrat_id,
+                    payload,
+                    can_create_evenement,
+                    ("statut_contrat",),
+                )
+            return
+    afficher_ajout(Evenement)
 
 
 @app.command("add-role")
-def add_role(role: str):
+def add_role(ctx: typer.Context, role: str):
     """
     Ajoute un nouveau rôle dans la base de données.
 
+    Le rôle reçoit les permissions par défaut de son nom (gestion, commercial,
+    support), aucune pour un autre nom : voir update-role --permissions.
+
     Paramètres :
         role : Nom du rôle à ajouter.
     """
 
-    if not verifier_permission("creer", "role"):
+    if not verifier_permission("creer", "role", ctx.obj):
         return
 
-    add_table(Role, SessionLocal, {"role": role})
+    # Permissions explicites : {} en base signifie "aucun droit"
+    add_table(
+        Role,
+        SessionLocal,
+        {"role": role, "permissions": get_default_permissions(role)},
+    )
 
 
 # ==================== MODIFICATION ====================
@@ -325,6 +575,7 @@ def add_role(role: str):
 
 @app.command("update-client")
 def update_client(
+    ctx: typer.Context,
     client_id: int,
     nom_complet: str = typer.Option(None),
     email: str = typer.Option(None),
@@ -344,46 +595,41 @@ def update_client(
         contact_commercial_id : Nouvel ID du collaborateur référent (optionnel).
     """
 
-    if not verifier_permission("modifier", "client"):
+    if not verifier_permission("modifier", "client", ctx.obj):
         return
 
     if email:
         email = validate_email(email)
 
-    payload = verifier_connexion()
-    db = SessionLocal()
-    client = db.query(Client).filter(Client.id == client_id).first()
-
-    if not can_update_client(payload, client):
-        db.close()
+    # Le nouveau référent doit être un commercial (lu depuis le cache de référence)
+    if not verifier_collaborateur_role(
+        SessionLocal, contact_commercial_id, "commercial"
+    ):
         return
 
-    if not verifier_modifications(
-        nom_complet=nom_complet,
-        email=email,
-        telephone=telephone,
-        entreprise=entreprise,
-        contact_commercial_id=contact_commercial_id,
-    ):
-        db.close()
+    payload = ctx.obj.payload
+    data = {
+        "nom_complet": nom_complet,
+        "email": email,
+        "telephone": telephone,
+        "entreprise": entreprise,
+        "contact_commercial_id": contact_commercial_id,
+    }
+
+    if not verifier_modifications(**data):
         return
 
-    update_table(
-        Client,
-        SessionLocal,
-        client_id,
-        {
-            "nom_complet": nom_complet,
-            "email": email,
-            "telephone": telephone,
-            "entreprise": entreprise,
-            "contact_commercial_id": contact_commercial_id,
-        },
-    )
+    # Une seule requête : UPDATE ... WHERE id = :id AND <commercial connecté> RETURNING
+    with unite_de_travail(SessionLocal) as db:
+        if update_proprietaire(db, Client, client_id, data, payload) is None:
+            diagnostiquer_refus(db, Client, client_id, payload, can_update_client)
+            return
+    afficher_modification(Client, client_id, data)
 
 
 @app.command("update-collaborateur")
 def update_collaborateur(
+    ctx: typer.Context,
     collab_id: int,
     nom: str = typer.Option(None),
     email: str = typer.Option(None),
@@ -403,13 +649,13 @@ def update_collaborateur(
         mot_de_passe: Nouveau mot de passe (optionnel).
     """
 
-    if not verifier_permission("modifier", "collaborateur"):
+    if not verifier_permission("modifier", "collaborateur", ctx.obj):
         return
 
     if email:
         email = validate_email(email)
 
-    mot_de_passe_hache = generate_password_hash(mot_de_passe) if mot_de_passe else None
+    mot_de_passe_hache = hacher_mot_de_passe(mot_de_passe) if mot_de_passe else None
 
     if not verifier_modifications(
         nom=nom,
@@ -419,6 +665,9 @@ def update_collaborateur(
     ):
         return
 
+    if not verifier_role_existe(SessionLocal, role_id):
+        return
+
     update_table(
         Collaborateur,
         SessionLocal,
@@ -430,10 +679,12 @@ def update_collaborateur(
             "mot_de_passe": mot_de_passe_hache,
         },
     )
+    invalider_reference(Collaborateur)
 
 
 @app.command("update-contrat")
 def update_contrat(
+    ctx: typer.Context,
     contrat_id: int,
     montant_total: float = typer.Option(None),
     montant_restant: float = typer.Option(None),
@@ -453,17 +704,10 @@ def update_contrat(
         contact_commercial_id : Nouvel ID du collaborateur commercial (optionnel).
     """
 
-    if not verifier_permission("modifier", "contrat"):
+    if not verifier_permission("modifier", "contrat", ctx.obj):
         return
 
-    payload = verifier_connexion()
-    db = SessionLocal()
-
-    contrat = db.query(Contrat).filter(Contrat.id == contrat_id).first()
-    if not contrat:
-        console.print(f"[red]Erreur : Aucun contrat trouvé avec l'ID {contrat_id}.[/]")
-        db.close()
-        return
+    payload = ctx.obj.payload
 
     # Validation des montants
     if montant_total is not None:
@@ -471,45 +715,68 @@ def update_contrat(
     if montant_restant is not None:
         montant_restant = validate_positive_float(montant_restant)
 
-    # Validation cohérente : montant_restant ≤ montant_total
-    total = montant_total if montant_total is not None else contrat.montant_total
-    restant = (
-        montant_restant if montant_restant is not None else contrat.montant_restant
-    )
-    validate_montant_restant(total, restant)
-
-    # Vérification métier : seul le commercial responsable peut modifier
-    if not can_update_contrat(payload, contrat):
-        db.close()
+    if not verifier_collaborateur_role(
+        SessionLocal, contact_commercial_id, "commercial"
+    ):
         return
 
-    if not verifier_modifications(
-        montant_total=montant_total,
-        montant_restant=montant_restant,
-        statut_contrat=statut_contrat,
-        client_id=client_id,
-        contact_commercial_id=contact_commercial_id,
-    ):
-        db.close()
+    data = {
+        "montant_total": montant_total,
+        "montant_restant": montant_restant,
+        "statut_contrat": statut_contrat,
+        "client_id": client_id,
+        "contact_commercial_id": contact_commercial_id,
+    }
+
+    if not verifier_modifications(**data):
         return
 
-    update_table(
-        Contrat,
-        SessionLocal,
-        contrat_id,
-        {
-            "montant_total": montant_total,
-            "montant_restant": montant_restant,
-            "statut_contrat": statut_contrat,
-            "client_id": client_id,
-            "contact_commercial_id": contact_commercial_id,
-        },
-    )
-    db.close()
+    # Validation cohérente : montant_restant ≤ montant_total. Si un seul des deux
+    # montants est fourni, la règle est vérifiée par la base dans l'UPDATE.
+    conditions = []
+    if montant_total is not None and montant_restant is not None:
+        validate_montant_restant(montant_total, montant_restant)
+    elif montant_restant is not None:
+        conditions.append(Contrat.montant_total >= montant_restant)
+    elif montant_total is not None:
+        conditions.append(Contrat.montant_restant <= montant_total)
+
+    # Une seule requête : UPDATE ... WHERE id = :id AND <commercial connecté>
+    # AND <montants cohérents> RETURNING
+    with unite_de_travail(SessionLocal) as db:
+        resultat = update_proprietaire(
+            db, Contrat, contrat_id, data, payload, *conditions
+        )
+        if resultat is None:
+            contrat = diagnostiquer_refus(
+                db,
+                Contrat,
+                contrat_id,
+                payload,
+                can_update_contrat,
+                ("montant_total", "montant_restant"),
+            )
+            if contrat is not None:
+                # Ligne autorisée : c'est la règle des montants qui a échoué
+                validate_montant_restant(
+                    (
+                        montant_total
+                        if montant_total is not None
+                        else contrat.montant_total
+                    ),
+                    (
+                        montant_restant
+                        if montant_restant is not None
+                        else contrat.montant_restant
+                    ),
+                )
+            return
+    afficher_modification(Contrat, contrat_id, data)
 
 
 @app.command("update-evenement")
 def update_evenement(
+    ctx: typer.Context,
     evenement_id: int,
     date_debut: str = typer.Option(None),
     date_fin: str = typer.Option(None),
@@ -537,7 +804,7 @@ def update_evenement(
         support_contact_id : Nouvel ID du collaborateur support (optionnel).
     """
 
-    if not verifier_permission("modifier", "evenement"):
+    if not verifier_permission("modifier", "evenement", ctx.obj):
         return
 
     if date_debut:
@@ -552,63 +819,80 @@ def update_evenement(
     if participants is not None and attendues is not None:
         participants, attendues = validate_participants(participants, attendues)
 
-    payload = verifier_connexion()
-    db = SessionLocal()
-    evenement = db.query(Evenement).filter(Evenement.id == evenement_id).first()
-
-    if not can_update_evenement(payload, evenement):
-        db.close()
+    # Le support attribué doit avoir le rôle support (lu depuis le cache de référence)
+    if not verifier_collaborateur_role(SessionLocal, support_contact_id, "support"):
         return
 
-    if not verifier_modifications(
-        date_debut=date_debut,
-        date_fin=date_fin,
-        lieu=lieu,
-        participants=participants,
-        attendues=attendues,
-        notes=notes,
-        contrat_id=contrat_id,
-        client_id=client_id,
-        support_contact_id=support_contact_id,
-    ):
-        db.close()
+    payload = ctx.obj.payload
+    data = {
+        "date_debut": date_debut,
+        "date_fin": date_fin,
+        "lieu": lieu,
+        "participants": participants,
+        "attendues": attendues,
+        "notes": notes,
+        "contrat_id": contrat_id,
+        "client_id": client_id,
+        "support_contact_id": support_contact_id,
+    }
+
+    if not verifier_modifications(**data):
         return
 
-    update_table(
-        Evenement,
-        SessionLocal,
-        evenement_id,
-        {
-            "date_debut": date_debut,
-            "date_fin": date_fin,
-            "lieu": lieu,
-            "participants": participants,
-            "attendues": attendues,
-            "notes": notes,
-            "contrat_id": contrat_id,
-            "client_id": client_id,
-            "support_contact_id": support_contact_id,
-        },
-    )
+    # Une seule requête : UPDATE ... WHERE id = :id AND <support connecté> RETURNING
+    with unite_de_travail(SessionLocal) as db:
+        if update_proprietaire(db, Evenement, evenement_id, data, payload) is None:
+            diagnostiquer_refus(
+                db, Evenement, evenement_id, payload, can_update_evenement
+            )
+            return
+    afficher_modification(Evenement, evenement_id, data)
 
 
 @app.command("update-role")
-def update_role(role_id: int, role: str = typer.Option(None)):
+def update_role(
+    ctx: typer.Context,
+    role_id: int,
+    role: str = typer.Option(None),
+    permissions: str = typer.Option(
+        None,
+        help='Permissions en JSON, ex : \'{"client": ["lire", "creer"]}\'',
+    ),
+):
     """
     Modifie un rôle existant dans la base de données.
 
     Paramètres :
         role_id : ID du rôle à modifier.
         role : Nouveau nom du rôle (optionnel).
+        permissions : Nouvelles permissions, ressource -> liste d'actions (optionnel).
+            Les tokens émis avant la modification sont refusés : les
+            collaborateurs de ce rôle doivent se reconnecter.
     """
 
-    if not verifier_permission("modifier", "role"):
+    if not verifier_permission("modifier", "role", ctx.obj):
         return
 
-    if not verifier_modifications(role=role):
+    if permissions is not None:
+        try:
+            permissions = json.loads(permissions)
+        except ValueError:
+            raise typer.BadParameter("Les permissions doivent être un objet JSON")
+        if not permissions_valides(permissions):
+            raise typer.BadParameter(
+                f"Permissions invalides (ressources : {', '.join(RESSOURCES)} ; "
+                f"actions : {', '.join(ACTIONS)})"
+            )
+
+    if not verifier_modifications(role=role, permissions=permissions):
         return
 
-    update_table(Role, SessionLocal, role_id, {"role": role})
+    update_table(
+        Role, SessionLocal, role_id, {"role": role, "permissions": permissions}
+    )
+    invalider_reference(Role)
+    # Le rôle modifié est remis en cache : son empreinte sert à refuser les anciens tokens
+    role_reference(SessionLocal, role_id)
 
 
 # ==================== SUPPRESSION ====================
@@ -616,53 +900,197 @@ def update_role(role_id: int, role: str = typer.Option(None)):
 
 
 @app.command("delete-client")
-def delete_client(client_id: int):
+def delete_client(ctx: typer.Context, client_id: int):
     """Supprime un client de la base de données."""
 
-    if not verifier_permission("supprimer", "client"):
+    if not verifier_permission("supprimer", "client", ctx.obj):
         return
 
-    delete_table(Client, SessionLocal, client_id)
+    delete_table(Client, SessionLocal, client_id, payload=ctx.obj.payload)
 
 
 @app.command("delete-collaborateur")
-def delete_collaborateur(collab_id: int):
+def delete_collaborateur(ctx: typer.Context, collab_id: int):
     """Supprime un collaborateur de la base de données."""
 
-    if not verifier_permission("supprimer", "collaborateur"):
+    if not verifier_permission("supprimer", "collaborateur", ctx.obj):
         return
 
     delete_table(Collaborateur, SessionLocal, collab_id)
+    invalider_reference(Collaborateur)
 
 
 @app.command("delete-contrat")
-def delete_contrat(contrat_id: int):
+def delete_contrat(ctx: typer.Context, contrat_id: int):
     """Supprime un contrat de la base de données."""
 
-    if not verifier_permission("supprimer", "contrat"):
+    if not verifier_permission("supprimer", "contrat", ctx.obj):
         return
 
-    delete_table(Contrat, SessionLocal, contrat_id)
+    delete_table(Contrat, SessionLocal, contrat_id, payload=ctx.obj.payload)
 
 
 @app.command("delete-evenement")
-def delete_evenement(evenement_id: int):
+def delete_evenement(ctx: typer.Context, evenement_id: int):
     """Supprime un événement de la base de données."""
 
-    if not verifier_permission("supprimer", "evenement"):
+    if not verifier_permission("supprimer", "evenement", ctx.obj):
         return
 
-    delete_table(Evenement, SessionLocal, evenement_id)
+    delete_table(Evenement, SessionLocal, evenement_id, payload=ctx.obj.payload)
 
 
 @app.command("delete-role")
-def delete_role(role_id: int):
+def delete_role(ctx: typer.Context, role_id: int):
     """Supprime un rôle de la base de données."""
 
-    if not verifier_permission("supprimer", "role"):
+    if not verifier_permission("supprimer", "role", ctx.obj):
         return
 
     delete_table(Role, SessionLocal, role_id)
+    invalider_reference(Role)
+
+
+# ==================== IMPORT ====================
+# Import en masse depuis un fichier CSV ou JSONL
+
+
+@app.command("import")
+def import_fichier(
+    ctx: typer.Context,
+    table: str = typer.Argument(
+        ..., help="Table cible : clients, collaborateurs, contrats ou evenements"
+    ),
+    fichier: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="Fichier .csv (avec en-tête) ou .jsonl"
+    ),
+    batch_size: int = typer.Option(
+        IMPORT_BATCH_SIZE, "--batch-size", min=1, help="Lignes par lot (et par commit)"
+    ),
+    skip: int = typer.Option(
+        0, "--skip", min=0, help="Reprend l'import après ce numéro de ligne"
+    ),
+    rejets: Path = typer.Option(
+        None, "--rejets", help="Fichier des rejets (défaut : <fichier>.rejets.jsonl)"
+    ),
+    copy: bool = typer.Option(
+        False, "--copy", help="Écrit avec COPY (PostgreSQL) au lieu d'INSERT groupés"
+    ),
+):
+    """
+    Importe en masse des clients, collaborateurs, contrats ou événements depuis
+    un fichier CSV ou JSONL.
+
+    Chaque ligne est validée avec les mêmes règles que add-client, add-collaborateur,
+    add-contrat et add-evenement. Les mots de passe des collaborateurs sont hachés
+    en parallèle (un processus par cœur). Les lignes refusées sont écrites dans le
+    fichier de rejets.
+    Chaque lot est validé par un commit : après une interruption, relancer
+    avec --skip <dernière ligne validée>.
+    """
+    if table not in IMPORTS:
+        raise typer.BadParameter(
+            f"Table inconnue '{table}' (choix : {', '.join(IMPORTS)})"
+        )
+    _, ressource, _, _ = IMPORTS[table]
+    if not verifier_permission("creer", ressource, ctx.obj):
+        return
+
+    try:
+        stats = importer_fichier(
+            table,
+            fichier,
+            SessionLocal,
+            ctx.obj.payload,
+            batch_size=batch_size,
+            skip=skip,
+            chemin_rejets=rejets,
+            copy=copy,
+        )
+    except Exception:
+        console.print(
+            "[bold red]Import interrompu.[/] Les lots déjà validés sont enregistrés : "
+            "relancer avec --skip <dernière ligne validée>."
+        )
+        raise
+
+    console.print(
+        f"[bold green]{stats['importees']} ligne(s) importée(s) dans {table}[/], "
+        f"{stats['rejetees']} rejetée(s)."
+    )
+    if stats["rejetees"]:
+        console.print(
+            f"Rejets : {rejets or fichier.with_name(fichier.name + '.rejets.jsonl')}"
+        )
+
+
+# ==================== EXPORT ====================
+# Export en flux d'une table complète (CSV / JSONL, compressé ou non)
+
+
+@app.command("export")
+def export_table(
+    ctx: typer.Context,
+    table: str = typer.Argument(..., help=f"Table à exporter : {', '.join(EXPORTS)}"),
+    sortie: Path = typer.Option(
+        None, "--output", "-o", help="Fichier de sortie (défaut : sortie standard)"
+    ),
+    format_export: str = typer.Option(
+        "csv", "--format", help=f"Format : {', '.join(FORMATS)}"
+    ),
+    compression: str = typer.Option(
+        None,
+        "--compression",
+        help=f"Compression : {', '.join(COMPRESSIONS)} (défaut : selon l'extension)",
+    ),
+    columns: str = COLUMNS_OPTION,
+    copy: bool = typer.Option(
+        False, "--copy", help="CSV produit par PostgreSQL (COPY ... TO STDOUT)"
+    ),
+    batch_size: int = typer.Option(
+        EXPORT_BATCH_SIZE, "--batch-size", min=1, help="Lignes lues à la fois"
+    ),
+):
+    """
+    Exporte une table en CSV ou JSONL, en flux et à mémoire constante.
+
+    Les lignes sont lues par un curseur côté serveur et écrites au fil de l'eau
+    (gzip ou zstd possibles). Le filtrage par rôle est celui des commandes
+    filter-* : un commercial n'exporte que ses contrats, un support que ses
+    événements.
+    """
+    if table not in EXPORTS:
+        raise typer.BadParameter(
+            f"Table inconnue '{table}' (choix : {', '.join(EXPORTS)})"
+        )
+    if format_export not in FORMATS:
+        raise typer.BadParameter(f"Format inconnu (choix : {', '.join(FORMATS)})")
+    if compression is not None and compression not in COMPRESSIONS:
+        raise typer.BadParameter(
+            f"Compression inconnue (choix : {', '.join(COMPRESSIONS)})"
+        )
+    modele, ressource = EXPORTS[table]
+    if sortie is None or str(sortie) == "-":
+        # Export sur la sortie standard : les messages (connexion) passent sur stderr
+        messages_sur_stderr(ctx, console, console_db)
+    if not verifier_permission("lire", ressource, ctx.obj):
+        return
+
+    total = exporter_table(
+        table,
+        SessionLocal,
+        ctx.obj.payload,
+        sortie=sortie,
+        format_export=format_export,
+        compression=compression,
+        colonnes=parse_colonnes(modele, columns) if columns else None,
+        copy=copy,
+        batch_size=batch_size,
+    )
+    # Bilan sur la sortie d'erreur : la sortie standard peut contenir l'export
+    Console(stderr=True).print(
+        f"[bold green]{total} ligne(s) exportée(s) depuis {table}[/]"
+    )
 
 
 # ====================  COMMANDES DE FILTRAGE ====================
@@ -670,62 +1098,158 @@ def delete_role(role_id: int):
 
 
 @app.command("filter-evenements")
-def filter_evenements(sans_support: bool = False, support_contact_id: int = None):
+def filter_evenements(
+    ctx: typer.Context,
+    sans_support: bool = False,
+    support_contact_id: int = None,
+    columns: str = COLUMNS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+):
     """
     Filtre les événements selon :
       - --sans-support : événements sans support associé
       - (automatique) support : uniquement ses propres événements
+      - --columns : colonnes à afficher (ex : id,lieu,date_debut)
+      - --format : affichage (rich, plain, tsv, json ou jsonl)
     """
-    if not verifier_permission("lire", "evenement"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "evenement", ctx.obj):
         return
 
-    payload = verifier_connexion()
+    colonnes = parse_colonnes(Evenement, columns)
     db = SessionLocal()
-    query = db.query(Evenement)
-
     # Les supports ne voient que leurs événements
-    if payload["role"] == "support":
-        query = query.filter(Evenement.support_contact_id == payload["id"])
-    elif sans_support:
-        query = query.filter(Evenement.support_contact_id.is_(None))
+    query = requete_filter_evenements(ctx.obj.payload, colonnes, sans_support)
 
-    resultats = [
-        {
-            col.key: getattr(ev, col.key)
-            for col in inspect(Evenement).mapper.column_attrs
-        }
-        for ev in query.all()
-    ]
-    afficher_table(Evenement, resultats)
+    afficher_resultat(Evenement, colonnes, db.execute(query), format_sortie)
     db.close()
 
 
 @app.command("filter-contrats")
-def filter_contrats(non_signe: bool = False, non_payes: bool = False):
+def filter_contrats(
+    ctx: typer.Context,
+    non_signe: bool = False,
+    non_payes: bool = False,
+    columns: str = COLUMNS_OPTION,
+    format_sortie: str = FORMAT_OPTION,
+):
     """
     Filtre les contrats selon le statut.
     Exemple :
       - --non-signe  : contrats non signés
       - --non-payes  : contrats avec montant restant > 0
+      - --columns    : colonnes à afficher (ex : id,montant_restant)
+      - --format     : affichage (rich, plain, tsv, json ou jsonl)
     """
-    if not verifier_permission("lire", "contrat"):
+    format_sortie = format_lecture(ctx, format_sortie)
+    if not verifier_permission("lire", "contrat", ctx.obj):
         return
 
-    payload = verifier_connexion()
+    colonnes = parse_colonnes(Contrat, columns)
     db = SessionLocal()
-    query = db.query(Contrat)
+    # Les commerciaux ne voient que leurs contrats
+    query = requete_filter_contrats(ctx.obj.payload, colonnes, non_signe, non_payes)
 
-    if payload["role"] == "commercial":
-        query = db.query(Contrat).filter(Contrat.contact_commercial_id == payload["id"])
+    afficher_resultat(Contrat, colonnes, db.execute(query), format_sortie)
+    db.close()
 
-    if non_signe:
-        query = query.filter(~Contrat.statut_contrat)
-    if non_payes:
-        query = query.filter(Contrat.montant_restant > 0)
 
-    resultats = [
-        {col.key: getattr(c, col.key) for col in inspect(Contrat).mapper.column_attrs}
-        for c in query.all()
-    ]
-    afficher_table(Contrat, resultats)
-    db.close()
+# ==================== SCHÉMA ====================
+
+
+@app.command("migrate")
+def migrate(
+    dry_run: bool = typer.Option(
+        False, "--dry-run", help="Affiche le SQL sans rien exécuter"
+    ),
+    cible: int = typer.Option(
+        None, "--target", min=1, help="Version à atteindre (défaut : la dernière)"
+    ),
+):
+    """
+    Met à jour le schéma de la base (migrations versionnées de `app.migrations`).
+
+    Les index sont construits avec CREATE INDEX CONCURRENTLY sur PostgreSQL
+    (sans bloquer les écritures) et les rattrapages de données se font par lots.
+    Comme `init_db_full`, la commande utilise les identifiants du .env et ne
+    demande pas de connexion.
+    """
+    from app.database import get_engine
+    from app.migrations.moteur import migrer
+
+    appliquees = migrer(get_engine(), cible, dry_run, afficher=typer.echo)
+    if appliquees and not dry_run:
+        console.print(
+            f"[bold green]Schéma mis à jour : version {appliquees[-1]}.[/]",
+            highlight=False,
+        )
+
+
+# ==================== DIAGNOSTIC ====================
+
+
+@app.command("explain")
+def explain(
+    ctx: typer.Context,
+    analyze: bool = typer.Option(
+        False, "--analyze", help="Exécute les requêtes (PostgreSQL : EXPLAIN ANALYZE)"
+    ),
+):
+    """
+    Affiche le plan d'exécution (EXPLAIN) de chaque requête des commandes CLI.
+
+    Les requêtes sont construites comme par les commandes (lecture paginée,
+    filter-*, contrôles de droits, import) ; chaque plan indique si un index
+    est utilisé ou si la table est parcourue entièrement.
+    """
+    from rich.panel import Panel
+
+    payload = ctx.obj.payload
+    avec_index = 0
+    requetes = requetes_cli(payload)
+    with SessionLocal() as db:
+        for libelle, requete in requetes.items():
+            plan = plan_execution(db, requete, analyze)
+            if utilise_index(plan):
+                avec_index += 1
+                statut, couleur = "index utilisé", "green"
+            else:
+                statut, couleur = "parcours complet", "yellow"
+            console.print(
+                Panel(
+                    "\n".join(plan),
+                    title=f"{libelle} — {statut}",
+                    title_align="left",
+                    border_style=couleur,
+                )
+            )
+    console.print(
+        f"[bold]{avec_index}/{len(requetes)} requête(s) utilisent un index.[/] "
+        "Sur une table presque vide, le planificateur peut préférer un parcours complet."
+    )
+
+
+# ==================== CACHE DE RÉFÉRENCE ====================
+
+
+@app.command("cache-stats")
+def cache_stats():
+    """
+    Affiche les compteurs du cache des rôles et collaborateurs (hits, misses, entrées).
+    """
+    stats = get_cache().stats()
+    console.print(
+        f"[bold]Cache de référence :[/] {stats['hits']} hit(s), "
+        f"{stats['misses']} miss(es), taux de succès {stats['taux']:.0%}, "
+        f"{stats['entrees']} entrée(s)",
+        highlight=False,
+    )
+
+
+@app.command("cache-clear")
+def cache_clear():
+    """
+    Vide le cache des rôles et collaborateurs et remet ses compteurs à zéro.
+    """
+    get_cache().vider()
+    console.print("[bold green]Cache de référence vidé.[/]")
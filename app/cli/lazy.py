@@ -0,0 +1,52 @@
+import importlib
+import click
+import typer
+from typer.core import TyperGroup
+
+# Sous-CLI chargés à la demande : nom -> (module Python, aide affichée dans --help)
+SOUS_CLI = {
+    "auth": ("app.cli.auth_cli", "Commandes pour l'authentification"),
+    "db": ("app.cli.db_cli", "Commandes pour gérer les données"),
+}
+
+
+class GroupeParesseux(TyperGroup):
+    """
+    Groupe Typer dont les sous-CLI (`auth`, `db`) ne sont importés qu'à leur première exécution.
+
+    `--help` n'affiche que le nom et l'aide déclarés dans `SOUS_CLI` : il n'importe
+    ni les modèles, ni SQLAlchemy, ni Sentry. Le module d'un sous-CLI n'est importé
+    que lorsque l'une de ses commandes est réellement invoquée.
+    """
+
+    def list_commands(self, ctx):
+        """Liste les commandes déjà chargées et les sous-CLI déclarés."""
+        return sorted(set(super().list_commands(ctx)) | set(SOUS_CLI))
+
+    def get_command(self, ctx, name):
+        """
+        Retourne une commande pour l'affichage de l'aide.
+
+        Un sous-CLI non encore chargé est représenté par un groupe vide
+        portant seulement son aide.
+        """
+        commande = super().get_command(ctx, name)
+        if commande is None and name in SOUS_CLI:
+            return TyperGroup(name=name, help=SOUS_CLI[name][1])
+        return commande
+
+    def resolve_command(self, ctx, args):
+        """Importe le sous-CLI demandé (si besoin) avant de lui transmettre les arguments."""
+        if args and args[0] in SOUS_CLI:
+            self.charger(args[0])
+        return super().resolve_command(ctx, args)
+
+    def charger(self, name: str) -> click.Command:
+        """Importe le module d'un sous-CLI et enregistre sa commande dans le groupe."""
+        if name not in self.commands:
+            module, aide = SOUS_CLI[name]
+            commande = typer.main.get_group(importlib.import_module(module).app)
+            commande.name = name
+            commande.help = aide
+            self.add_command(commande, name)
+        return self.commands[name]
@@ -0,0 +1,102 @@
+import shlex
+import click
+import typer
+from rich.console import Console  # Pour afficher du texte stylisé dans la console
+from rich.panel import Panel  # Pour afficher des messages dans des encadrés colorés
+
+# Initialise la console Rich pour un affichage stylisé
+console = Console()
+
+# Mots-clés qui ferment le shell
+COMMANDES_SORTIE = ("exit", "quit")
+
+
+def executer_ligne(commande: click.Command, ligne: str, contexte) -> bool:
+    """
+    Exécute une ligne saisie dans le shell avec la CLI déjà construite.
+
+    Paramètres :
+        commande : Commande Click racine (construite une seule fois).
+        ligne : Ligne saisie par l'utilisateur (ex : "db read-clients --limit 10").
+        contexte : Contexte d'authentification partagé entre les commandes.
+
+    Retour :
+        bool : False si l'utilisateur demande à quitter le shell, True sinon.
+    """
+    ligne = ligne.strip()
+    if not ligne:
+        return True
+    if ligne in COMMANDES_SORTIE:
+        return False
+
+    try:
+        args = shlex.split(ligne)
+    except ValueError as e:
+        console.print(f"[bold red]Commande invalide :[/] {e}")
+        return True
+
+    if args[0] == "shell":
+        console.print("[yellow]Vous êtes déjà dans le shell.[/]")
+        return True
+
+    try:
+        commande.main(args, prog_name="crm", standalone_mode=False, obj=contexte)
+    except click.ClickException as e:
+        # Erreur d'usage (option inconnue, paramètre invalide...)
+        e.show()
+    except click.exceptions.Abort:
+        console.print("[yellow]Commande annulée.[/]")
+    except Exception as e:
+        # Une commande en échec ne doit pas fermer le shell
+        from sentry_init import sentry_sdk
+
+        sentry_sdk.capture_exception(e)
+        console.print(
+            Panel.fit(f"[bold red]Erreur inattendue :[/] {e}", border_style="red")
+        )
+    finally:
+        # Une connexion ou une déconnexion change l'utilisateur courant
+        if args[0] == "auth":
+            contexte.invalider()
+    return True
+
+
+def lancer_shell(app: typer.Typer, lire_ligne=input):
+    """
+    Ouvre un shell interactif qui exécute les commandes `auth` et `db` dans le même processus.
+
+    Les imports, le moteur SQLAlchemy, son pool de connexions, la configuration
+    des mappers et le token vérifié restent en mémoire entre deux commandes :
+    seule la requête est payée à chaque commande.
+
+    Paramètres :
+        app : Application Typer principale.
+        lire_ligne : Fonction de lecture d'une ligne (input par défaut).
+    """
+    # Import local : le contexte d'authentification dépend de la couche base de données
+    from app.utils.db_utils import ContexteAuth
+
+    commande = typer.main.get_command(app)
+    contexte = ContexteAuth()
+    console.print(
+        Panel.fit(
+            "[bold cyan]Shell du CRM[/]\n"
+            "Tapez une commande sans préfixe (ex : [green]db read-clients --limit 10[/]).\n"
+            "[dim]exit ou Ctrl-D pour quitter.[/]",
+            border_style="blue",
+        )
+    )
+
+    while True:
+        try:
+            ligne = lire_ligne("crm> ")
+        except (EOFError, KeyboardInterrupt):
+            console.print()
+            break
+        if not executer_ligne(commande, ligne, contexte):
+            break
+
+    # Fin de session : les événements métier restants partent en un seul lot
+    from app import telemetrie
+
+    telemetrie.expedier(forcer=True)
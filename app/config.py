@@ -0,0 +1,104 @@
+import os
+from dotenv import load_dotenv
+
+# Charge les variables d'environnement depuis le fichier .env (une seule fois par processus)
+# Tous les modules lisent leur configuration ici plutôt que d'appeler load_dotenv().
+load_dotenv()
+
+
+def env_int(nom: str, defaut: int) -> int:
+    """Lit une variable d'environnement entière (valeur par défaut si absente)."""
+    valeur = os.getenv(nom)
+    return int(valeur) if valeur not in (None, "") else defaut
+
+
+def env_float(nom: str, defaut: float) -> float:
+    """Lit une variable d'environnement décimale (valeur par défaut si absente)."""
+    valeur = os.getenv(nom)
+    return float(valeur) if valeur not in (None, "") else defaut
+
+
+def env_bool(nom: str, defaut: bool) -> bool:
+    """Lit une variable d'environnement booléenne ("1", "true", "oui"...)."""
+    valeur = os.getenv(nom)
+    if valeur in (None, ""):
+        return defaut
+    return valeur.strip().lower() in ("1", "true", "yes", "oui", "on")
+
+
+# ==================== BASE DE DONNÉES ====================
+
+DB_USER = os.getenv("DB_USER")  # Nom d’utilisateur PostgreSQL
+DB_PASSWORD = os.getenv("DB_PASSWORD")  # Mot de passe de connexion
+DB_HOST = os.getenv("DB_HOST", "localhost")  # Hôte du serveur PostgreSQL
+DB_PORT = os.getenv("DB_PORT", "5432")  # Port d’écoute de PostgreSQL
+DB_NAME = os.getenv("DB_NAME", "epic_events")  # Nom de la base de données
+
+# Affiche les requêtes SQL dans la console (débogage)
+DB_ECHO = env_bool("DB_ECHO", False)
+
+# Pool de connexions
+DB_POOL_SIZE = env_int("DB_POOL_SIZE", 5)  # Connexions gardées ouvertes
+DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 5)  # Connexions en plus en cas de pic
+DB_POOL_TIMEOUT = env_int("DB_POOL_TIMEOUT", 30)  # Attente max d'une connexion (s)
+DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)  # Renouvelle après N secondes
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)  # Teste avant réutilisation
+
+# Durée maximale d'une requête côté PostgreSQL (ms, 0 = illimitée)
+DB_STATEMENT_TIMEOUT_MS = env_int("DB_STATEMENT_TIMEOUT_MS", 30000)
+
+# Insertions multiples : lignes par INSERT ... VALUES groupé
+DB_INSERTMANYVALUES_PAGE_SIZE = env_int("DB_INSERTMANYVALUES_PAGE_SIZE", 1000)
+# Mode executemany de psycopg2 ("values_only" ou "values_plus_batch")
+DB_EXECUTEMANY_MODE = os.getenv("DB_EXECUTEMANY_MODE", "values_plus_batch")
+DB_EXECUTEMANY_BATCH_PAGE_SIZE = env_int("DB_EXECUTEMANY_BATCH_PAGE_SIZE", 500)
+
+# Driver de la couche asynchrone (optionnelle) : "asyncpg" ou "psycopg" (psycopg 3)
+DB_ASYNC_DRIVER = os.getenv("DB_ASYNC_DRIVER", "asyncpg")
+
+# Cache des données de référence (rôles, collaborateurs)
+# Fichier partagé entre les invocations de la CLI (vide = cache en mémoire seulement)
+CACHE_REFERENCE_FICHIER = os.getenv("CACHE_REFERENCE_FICHIER", ".cache_reference.json")
+CACHE_REFERENCE_TTL = env_int("CACHE_REFERENCE_TTL", 300)  # Durée de vie (s)
+
+# ==================== SÉCURITÉ ====================
+
+# Clé secrète pour signer et vérifier les JWT
+SECRET_KEY = os.getenv("SECRET_KEY")
+
+# Durées de vie des tokens : token d'accès (minutes) et refresh token (jours)
+ACCESS_TOKEN_MINUTES = env_int("ACCESS_TOKEN_MINUTES", 60)
+REFRESH_TOKEN_JOURS = env_int("REFRESH_TOKEN_JOURS", 7)
+# Le token d'accès est renouvelé sans message quand il expire dans moins de N secondes
+TOKEN_REFRESH_AVANCE = env_int("TOKEN_REFRESH_AVANCE", 300)
+
+# Hachage des mots de passe (méthode werkzeug, ex : "scrypt:16384:8:1", "pbkdf2:sha256:600000")
+PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+PASSWORD_SALT_LENGTH = env_int("PASSWORD_SALT_LENGTH", 16)
+# Processus de hachage pour les imports de collaborateurs (0 = nombre de cœurs)
+PASSWORD_HASH_WORKERS = env_int("PASSWORD_HASH_WORKERS", 0)
+# Rehache à la connexion les mots de passe hachés avec d'autres paramètres
+PASSWORD_REHASH = env_bool("PASSWORD_REHASH", True)
+PASSWORD_REHASH_ARRIERE_PLAN = env_bool("PASSWORD_REHASH_ARRIERE_PLAN", True)
+
+# ==================== AFFICHAGE ====================
+
+# Pager des lectures (--pager) : lignes échantillonnées pour mesurer les colonnes
+PAGER_ECHANTILLON = env_int("PAGER_ECHANTILLON", 200)
+PAGER_LARGEUR_MAX_COLONNE = env_int("PAGER_LARGEUR_MAX_COLONNE", 40)  # Caractères
+
+# ==================== OBSERVABILITÉ ====================
+
+SENTRY_DSN = os.getenv("SENTRY_DSN")
+# Part des commandes tracées par Sentry (0 = pas de tracing pour la CLI)
+SENTRY_TRACES_SAMPLE_RATE = env_float("SENTRY_TRACES_SAMPLE_RATE", 0.0)
+
+# Événements métier (voir `app.telemetrie`) : mis en file locale puis envoyés par lots
+TELEMETRIE_SPOOL = os.getenv("TELEMETRIE_SPOOL", ".telemetrie.jsonl")
+TELEMETRIE_SAMPLE_RATE = env_float("TELEMETRIE_SAMPLE_RATE", 1.0)  # Part conservée
+TELEMETRIE_BATCH_SIZE = env_int("TELEMETRIE_BATCH_SIZE", 50)  # Envoi à N événements
+TELEMETRIE_DELAI_MAX = env_int("TELEMETRIE_DELAI_MAX", 300)  # ... ou après N secondes
+TELEMETRIE_FLUSH_TIMEOUT = env_float("TELEMETRIE_FLUSH_TIMEOUT", 2.0)  # Attente max (s)
+
+# Fichier recevant une ligne JSON de profil SQL par commande (vide = désactivé)
+DB_PROFILE_LOG = os.getenv("DB_PROFILE_LOG", "")
@@ -1,26 +1,17 @@
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
-import os
-
+from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
+from app import config
 
 #  Chargement de la configuration depuis le fichier .env
-# Charge les variables d’environnement définies dans le fichier .env
+# La lecture du .env est centralisée dans `app.config`
 # (utile pour garder les identifiants de connexion hors du code source)
-load_dotenv()
 
 # Variables de configuration pour la base PostgreSQL
-DB_USER = os.getenv("DB_USER")  # Nom d’utilisateur PostgreSQL
-DB_PASSWORD = os.getenv("DB_PASSWORD")  # Mot de passe de connexion
-DB_HOST = os.getenv("DB_HOST", "localhost")  # Hôte du serveur PostgreSQL
-DB_PORT = os.getenv("DB_PORT", "5432")  # Port d’écoute de PostgreSQL
-DB_NAME = os.getenv("DB_NAME", "epic_events")  # Nom de la base de données
-
-
-# Vérification de la configuration
-# Vérifie que toutes les variables nécessaires sont présentes
-if not all([DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]):
-    raise ValueError("⚠️ Configuration de la base incomplète. Vérifie ton fichier .env.")
+DB_USER = config.DB_USER  # Nom d’utilisateur PostgreSQL
+DB_PASSWORD = config.DB_PASSWORD  # Mot de passe de connexion
+DB_HOST = config.DB_HOST  # Hôte du serveur PostgreSQL
+DB_PORT = config.DB_PORT  # Port d’écoute de PostgreSQL
+DB_NAME = config.DB_NAME  # Nom de la base de données
 
 
 # Construction de l’URL de connexion PostgreSQL
@@ -30,15 +21,87 @@ DATABASE_URL = (
     f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 )
 
+# Moteur SQLAlchemy, créé à la première utilisation (voir `get_engine`)
+_engine = None
 
-# Initialisation du moteur SQLAlchemy
-# Le moteur gère la connexion à la base et la communication avec PostgreSQL.
-# Le paramètre `echo=True` permet d’afficher les requêtes SQL dans la console (utile en développement).
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,  # À mettre sur True pour le débogage
-    future=True,  # Utilise la syntaxe moderne de SQLAlchemy
-)
+
+def creer_engine(url: str = None, **options):
+    """
+    Fabrique l'unique moteur SQLAlchemy de l'application à partir de la configuration.
+
+    Pour PostgreSQL, le moteur est réglé depuis le .env (voir `app.config`) :
+        - pool : DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+          DB_POOL_PRE_PING (pool LIFO pour réutiliser la même connexion) ;
+        - délai maximal par requête : DB_STATEMENT_TIMEOUT_MS ;
+        - insertions multiples : DB_INSERTMANYVALUES_PAGE_SIZE, DB_EXECUTEMANY_MODE
+          et DB_EXECUTEMANY_BATCH_PAGE_SIZE (exécution rapide psycopg2).
+
+    Paramètres :
+        url (str, optionnel): URL de connexion (par défaut `DATABASE_URL`).
+        options : Paramètres de `create_engine` qui remplacent la configuration.
+
+    Retour :
+        Engine : Moteur SQLAlchemy.
+    """
+    url = url or DATABASE_URL
+    parametres = {
+        "echo": config.DB_ECHO,  # DB_ECHO=true pour afficher les requêtes SQL
+        "future": True,  # Utilise la syntaxe moderne de SQLAlchemy
+    }
+    if url.startswith("postgresql"):
+        connect_args = {}
+        if config.DB_STATEMENT_TIMEOUT_MS:
+            connect_args["options"] = (
+                f"-c statement_timeout={config.DB_STATEMENT_TIMEOUT_MS}"
+            )
+        parametres.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            pool_use_lifo=True,
+            insertmanyvalues_page_size=config.DB_INSERTMANYVALUES_PAGE_SIZE,
+            connect_args=connect_args,
+        )
+        if url.startswith("postgresql+psycopg2"):
+            parametres.update(
+                executemany_mode=config.DB_EXECUTEMANY_MODE,
+                executemany_batch_page_size=config.DB_EXECUTEMANY_BATCH_PAGE_SIZE,
+            )
+    parametres.update(options)
+    return create_engine(url, **parametres)
+
+
+def get_engine():
+    """
+    Retourne le moteur SQLAlchemy, en le créant au premier appel.
+
+    Le moteur (et le driver psycopg2) n'est construit que lorsqu'une commande
+    accède réellement à la base : `--help` ou `auth logout` n'en créent pas.
+
+    Exceptions :
+        ValueError: Si la configuration de la base est incomplète dans le .env.
+    """
+    global _engine
+    if _engine is None:
+        # Vérification de la configuration
+        # Vérifie que toutes les variables nécessaires sont présentes
+        if not all([DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]):
+            raise ValueError(
+                "⚠️ Configuration de la base incomplète. Vérifie ton fichier .env."
+            )
+        _engine = creer_engine()
+    return _engine
+
+
+def __getattr__(name):
+    """
+    Donne accès à `app.database.engine` sans créer le moteur à l'import du module.
+    """
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Création de la classe de base pour les modèles ORM
@@ -47,10 +110,24 @@ engine = create_engine(
 Base = declarative_base()
 
 
+class _SessionMakerParesseux(sessionmaker):
+    """
+    Fabrique de sessions qui ne lie le moteur qu'à la création de la première session.
+    """
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
 # Configuration du gestionnaire de sessions
 # `sessionmaker` crée une fabrique de sessions de base de données.
 # Chaque session correspond à une transaction logique (lecture/écriture).
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# `scoped_session` renvoie la même session à tous les appels d'une même commande
+# (même thread) : une commande n'utilise qu'une session, donc une seule connexion
+# du pool. La session est libérée par `SessionLocal.remove()` en fin de commande.
+SessionLocal = scoped_session(_SessionMakerParesseux(autoflush=False, autocommit=False))
 
 
 # Fonction utilitaire pour la gestion sécurisée des sessions
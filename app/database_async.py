@@ -0,0 +1,93 @@
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app import config
+from app.database import DB_HOST, DB_NAME, DB_PASSWORD, DB_PORT, DB_USER
+
+# Couche d'accès asynchrone (optionnelle) : même base, même configuration du pool
+# que `app.database`, mais avec un driver asyncio (asyncpg ou psycopg 3).
+# Le driver n'est importé qu'à la création du moteur.
+
+# Modules Python des drivers asynchrones acceptés (pour le message d'installation)
+DRIVERS_ASYNC = {"asyncpg": "asyncpg", "psycopg": "psycopg"}
+
+# Format attendu par SQLAlchemy :
+# postgresql+<driver>://<utilisateur>:<motdepasse>@<hôte>:<port>/<nom_base>
+ASYNC_DATABASE_URL = (
+    f"postgresql+{config.DB_ASYNC_DRIVER}://"
+    f"{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+# Moteur asynchrone, créé à la première utilisation (voir `get_async_engine`)
+_async_engine = None
+
+
+def creer_engine_async(url: str = None, **options):
+    """
+    Fabrique le moteur SQLAlchemy asynchrone (`AsyncEngine`) à partir de la configuration.
+
+    Paramètres :
+        url (str, optionnel): URL de connexion (par défaut `ASYNC_DATABASE_URL`).
+        options : Paramètres de `create_async_engine` qui remplacent la configuration.
+
+    Retour :
+        AsyncEngine : Moteur SQLAlchemy asynchrone.
+
+    Exceptions :
+        ImportError : Si le driver asynchrone n'est pas installé.
+    """
+    url = url or ASYNC_DATABASE_URL
+    parametres = {"echo": config.DB_ECHO}
+    if url.startswith("postgresql"):
+        parametres.update(
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            pool_use_lifo=True,
+        )
+    parametres.update(options)
+    try:
+        return create_async_engine(url, **parametres)
+    except ImportError as e:
+        driver = url.split("://", 1)[0].partition("+")[2]
+        module = DRIVERS_ASYNC.get(driver, driver)
+        raise ImportError(
+            f"La couche asynchrone nécessite le module '{module}' "
+            f"(pip install {module})"
+        ) from e
+
+
+def get_async_engine():
+    """
+    Retourne le moteur asynchrone, en le créant au premier appel.
+
+    Exceptions :
+        ValueError: Si la configuration de la base est incomplète dans le .env.
+    """
+    global _async_engine
+    if _async_engine is None:
+        if not all([DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_NAME]):
+            raise ValueError(
+                "⚠️ Configuration de la base incomplète. Vérifie ton fichier .env."
+            )
+        _async_engine = creer_engine_async()
+    return _async_engine
+
+
+class _AsyncSessionMakerParesseux(async_sessionmaker):
+    """
+    Fabrique de sessions asynchrones qui ne lie le moteur qu'à la création de la première session.
+    """
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_async_engine())
+        return super().__call__(**local_kw)
+
+
+# Une session asynchrone n'exécute qu'une requête à la fois : les lectures
+# concurrentes (voir `app.utils.async_utils.charger_ensemble`) ouvrent chacune
+# leur session, donc leur connexion du pool.
+# `expire_on_commit=False` : les instances restent lisibles après le commit
+# sans nouvelle requête (pas de chargement implicite en asyncio).
+AsyncSessionLocal = _AsyncSessionMakerParesseux(autoflush=False, expire_on_commit=False)
@@ -1,28 +1,26 @@
-import os
 import psycopg2
 from psycopg2 import sql
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.database import Base, engine, get_db
+from app.database import get_engine, get_db
 from app.models.client import Client
 from app.models.contrat import Contrat
 from app.models.evenement import Evenement
 from app.models.collaborateur import Collaborateur, Role
 from app.auth.permissions import get_default_permissions
-from dotenv import load_dotenv
+from app.migrations.moteur import migrer
+from app import config
 
 # Liste de tous les modèles pour d'éventuelles opérations globales
 all_models = [Client, Contrat, Evenement, Collaborateur, Role]
 
 
-# Chargement des variables d'environnement depuis .env
-
-load_dotenv()
-DB_USER = os.getenv("DB_USER")
-DB_PASSWORD = os.getenv("DB_PASSWORD")
-DB_HOST = os.getenv("DB_HOST", "localhost")
-DB_PORT = os.getenv("DB_PORT", "5432")
-DB_NAME = os.getenv("DB_NAME", "epic_events")
+# Variables de connexion (lues depuis le .env par app.config)
+DB_USER = config.DB_USER
+DB_PASSWORD = config.DB_PASSWORD
+DB_HOST = config.DB_HOST
+DB_PORT = config.DB_PORT
+DB_NAME = config.DB_NAME
 
 
 # Création de la base PostgreSQL si elle n'existe pas
@@ -69,10 +67,11 @@ def create_database():
 # Initialisation des tables et insertion des rôles par défaut
 def init_tables_and_roles():
     """
-    Crée les tables de la base de données et insère les rôles par défaut.
+    Crée ou met à jour les tables de la base de données et insère les rôles par défaut.
 
     Étapes :
-        1. Création de toutes les tables définies dans les modèles SQLAlchemy.
+        1. Application des migrations (voir `app.migrations`) : création des tables
+           sur une base neuve, ajout des index et colonnes sur une base existante.
         2. Insertion des rôles par défaut ('gestion', 'commercial', 'support')
            avec leurs permissions initiales.
         3. Gestion des erreurs pour éviter les doublons ou rollback en cas de problème.
@@ -82,9 +81,9 @@ def init_tables_and_roles():
         - `get_default_permissions(role_name)` fournit un dictionnaire JSON
           des permissions associées à chaque rôle.
     """
-    print("Création des tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Tables créées avec succès !")
+    print("Création et mise à jour des tables...")
+    migrer(get_engine())
+    print("Tables à jour !")
 
     roles = ["gestion", "commercial", "support"]
     db: Session = next(get_db())  # Générateur de session
@@ -0,0 +1,150 @@
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+
+from app.migrations.versions import MIGRATIONS, Migration
+
+# Clé du verrou consultatif PostgreSQL pris pendant `db migrate` ("EPIC")
+CLE_VERROU_MIGRATIONS = 0x45504943
+
+# Table des versions appliquées, hors des modèles métier
+metadata_migrations = MetaData()
+schema_version = Table(
+    "schema_version",
+    metadata_migrations,
+    Column("version", Integer, primary_key=True),
+    Column("nom", String, nullable=False),
+    Column("appliquee_le", DateTime, nullable=False),
+)
+
+
+def version_actuelle(connexion: Connection) -> int:
+    """Retourne la dernière version appliquée (0 si aucune migration n'a été appliquée)."""
+    if not inspect(connexion).has_table(schema_version.name):
+        return 0
+    versions = connexion.execute(select(schema_version.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+@contextmanager
+def verrou_migrations(engine: Engine):
+    """
+    Empêche deux `db migrate` simultanés d'appliquer la même version.
+
+    Sur PostgreSQL, un verrou consultatif de session est pris sur une connexion
+    dédiée, hors transaction : il couvre aussi les opérations exécutées en
+    AUTOCOMMIT (CREATE INDEX CONCURRENTLY), qu'un verrou de transaction
+    (`pg_advisory_xact_lock`) ne couvrirait pas. Un second `db migrate` attend
+    la fin du premier, puis relit la version du schéma. Les autres bases
+    (SQLite de test) n'ont pas de verrou.
+    """
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connexion:
+        connexion.execute(
+            text("SELECT pg_advisory_lock(:cle)"), {"cle": CLE_VERROU_MIGRATIONS}
+        )
+        try:
+            yield
+        finally:
+            connexion.execute(
+                text("SELECT pg_advisory_unlock(:cle)"), {"cle": CLE_VERROU_MIGRATIONS}
+            )
+
+
+def migrations_a_appliquer(version: int, cible: int = None) -> list[Migration]:
+    """Retourne les migrations postérieures à `version`, jusqu'à `cible` incluse."""
+    return [
+        migration
+        for migration in MIGRATIONS
+        if version < migration.version and (cible is None or migration.version <= cible)
+    ]
+
+
+def _enregistrer(connexion: Connection, migration: Migration):
+    """Inscrit une migration comme appliquée dans `schema_version`."""
+    connexion.execute(
+        insert(schema_version).values(
+            version=migration.version, nom=migration.nom, appliquee_le=datetime.now()
+        )
+    )
+
+
+def appliquer(engine: Engine, migration: Migration):
+    """
+    Applique une migration.
+
+    Si toutes ses opérations sont transactionnelles, la migration et son
+    enregistrement forment une seule transaction. Sinon (CREATE INDEX
+    CONCURRENTLY, rattrapage par lots), chaque instruction est validée
+    immédiatement : les opérations étant idempotentes, une migration
+    interrompue se relance simplement.
+    """
+    with engine.connect() as connexion:
+        transactionnelle = all(
+            operation.transactionnelle(connexion) for operation in migration.operations
+        )
+    if transactionnelle:
+        with engine.begin() as connexion:
+            for operation in migration.operations:
+                operation.executer(connexion)
+            _enregistrer(connexion, migration)
+        return
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connexion:
+        for operation in migration.operations:
+            operation.executer(connexion)
+        _enregistrer(connexion, migration)
+
+
+def migrer(
+    engine: Engine, cible: int = None, dry_run: bool = False, afficher=print
+) -> list[int]:
+    """
+    Met le schéma de la base à jour jusqu'à la version `cible` (la dernière par défaut).
+
+    Paramètres :
+        engine : Moteur SQLAlchemy de la base à migrer.
+        cible : Version à atteindre (None = dernière version).
+        dry_run : N'exécute rien et affiche le SQL qui serait exécuté.
+        afficher : Fonction d'affichage des messages et du SQL.
+
+    Retour :
+        list[int] : Versions appliquées (ou qui le seraient, en dry-run).
+    """
+    with nullcontext() if dry_run else verrou_migrations(engine):
+        with engine.connect() as connexion:
+            version = version_actuelle(connexion)
+        a_appliquer = migrations_a_appliquer(version, cible)
+        afficher(f"-- Version actuelle du schéma : {version}")
+        if not a_appliquer:
+            afficher("-- Schéma à jour, aucune migration à appliquer.")
+            return []
+
+        if not dry_run:
+            metadata_migrations.create_all(engine)
+
+        for migration in a_appliquer:
+            afficher(f"-- Migration {migration.version:04d} : {migration.nom}")
+            if dry_run:
+                with engine.connect() as connexion:
+                    for operation in migration.operations:
+                        for instruction in operation.instructions(connexion):
+                            afficher(f"{instruction};")
+                continue
+            appliquer(engine, migration)
+        return [migration.version for migration in a_appliquer]
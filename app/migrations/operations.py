@@ -0,0 +1,223 @@
+import json
+from abc import ABC, abstractmethod
+
+from sqlalchemy import inspect, select, text, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.auth.permissions import (
+    DEFAULT_PERMISSIONS,
+    get_default_permissions,
+    permissions_valides,
+)
+from app.database import Base
+
+# Attente maximale d'un verrou avant d'abandonner une construction d'index (PostgreSQL) :
+# la migration échoue vite au lieu de bloquer les commandes derrière elle.
+LOCK_TIMEOUT = "5s"
+
+# Lignes mises à jour par transaction lors d'un rattrapage de données
+BACKFILL_BATCH_SIZE = 5000
+
+
+class Operation(ABC):
+    """
+    Étape d'une migration.
+
+    `instructions` retourne le SQL de l'étape (affiché par --dry-run) et
+    `executer` l'applique. Toutes les opérations sont idempotentes : une
+    migration interrompue peut être relancée sans erreur.
+    """
+
+    def transactionnelle(self, connexion: Connection) -> bool:
+        """Indique si l'opération peut s'exécuter dans la transaction de la migration."""
+        return True
+
+    @abstractmethod
+    def instructions(self, connexion: Connection) -> list[str]:
+        """Retourne les instructions SQL de l'opération, dans l'ordre d'exécution."""
+
+    def executer(self, connexion: Connection):
+        for instruction in self.instructions(connexion):
+            connexion.exec_driver_sql(instruction)
+
+
+class CreerTables(Operation):
+    """Crée les tables des modèles qui n'existent pas encore (avec leurs index)."""
+
+    def instructions(self, connexion: Connection) -> list[str]:
+        existantes = set(inspect(connexion).get_table_names())
+        instructions = []
+        for table in Base.metadata.sorted_tables:
+            if table.name in existantes:
+                continue
+            instructions.append(
+                str(CreateTable(table).compile(dialect=connexion.dialect))
+            )
+            instructions.extend(
+                str(CreateIndex(index).compile(dialect=connexion.dialect))
+                for index in sorted(table.indexes, key=lambda i: i.name)
+            )
+        return [instruction.strip() for instruction in instructions]
+
+
+class CreerIndex(Operation):
+    """
+    Crée un index sans bloquer les écritures.
+
+    Sur PostgreSQL, l'index est construit avec `CREATE INDEX CONCURRENTLY`
+    (hors transaction) et un `lock_timeout` court ; un index laissé invalide
+    par une construction interrompue est supprimé puis reconstruit. Avec
+    `contrainte=True`, l'index unique devient ensuite une contrainte UNIQUE.
+    """
+
+    def __init__(
+        self,
+        nom: str,
+        table: str,
+        colonnes: list[str],
+        where: str = None,
+        unique: bool = False,
+        contrainte: bool = False,
+    ):
+        self.nom = nom
+        self.table = table
+        self.colonnes = colonnes
+        self.where = where
+        self.unique = unique
+        self.contrainte = contrainte
+
+    def transactionnelle(self, connexion: Connection) -> bool:
+        return connexion.dialect.name != "postgresql"
+
+    def instructions(self, connexion: Connection) -> list[str]:
+        postgresql = connexion.dialect.name == "postgresql"
+        creation = (
+            f"CREATE {'UNIQUE ' if self.unique else ''}INDEX "
+            f"{'CONCURRENTLY ' if postgresql else ''}IF NOT EXISTS {self.nom} "
+            f"ON {self.table} ({', '.join(self.colonnes)})"
+        )
+        if self.where:
+            creation += f" WHERE {self.where}"
+        if not postgresql:
+            return [creation]
+        instructions = [f"SET lock_timeout = '{LOCK_TIMEOUT}'", creation]
+        if self.contrainte:
+            instructions.append(
+                f"ALTER TABLE {self.table} ADD CONSTRAINT {self.nom} "
+                f"UNIQUE USING INDEX {self.nom}"
+            )
+        instructions.append("RESET lock_timeout")
+        return instructions
+
+    def executer(self, connexion: Connection):
+        if connexion.dialect.name != "postgresql":
+            if self.contrainte and self._contrainte_sqlite(connexion):
+                return
+            return super().executer(connexion)
+        # Une construction CONCURRENTLY interrompue laisse un index invalide
+        invalide = connexion.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :nom AND NOT i.indisvalid"
+            ),
+            {"nom": self.nom},
+        ).first()
+        if invalide:
+            connexion.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {self.nom}")
+        contrainte_existante = connexion.execute(
+            text("SELECT 1 FROM pg_constraint WHERE conname = :nom"), {"nom": self.nom}
+        ).first()
+        for instruction in self.instructions(connexion):
+            if instruction.startswith("ALTER TABLE") and contrainte_existante:
+                continue
+            connexion.exec_driver_sql(instruction)
+
+    def _contrainte_sqlite(self, connexion: Connection) -> bool:
+        """Indique si la table porte déjà une contrainte UNIQUE sur ces colonnes."""
+        return any(
+            contrainte["column_names"] == self.colonnes
+            for contrainte in inspect(connexion).get_unique_constraints(self.table)
+        )
+
+
+class Backfill(Operation):
+    """
+    Rattrapage de données par lots : `UPDATE ... WHERE id IN (SELECT ... LIMIT n)`
+    répété jusqu'à ce qu'aucune ligne ne reste à traiter.
+
+    Chaque lot est une transaction courte : les verrous de ligne sont relâchés
+    entre deux lots et un rattrapage interrompu reprend là où il s'était arrêté.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        affectation: str,
+        condition: str,
+        taille_lot: int = BACKFILL_BATCH_SIZE,
+    ):
+        self.table = table
+        self.affectation = affectation
+        self.condition = condition
+        self.taille_lot = taille_lot
+
+    def transactionnelle(self, connexion: Connection) -> bool:
+        return False
+
+    def instructions(self, connexion: Connection) -> list[str]:
+        return [
+            f"UPDATE {self.table} SET {self.affectation} WHERE id IN "
+            f"(SELECT id FROM {self.table} WHERE {self.condition} "
+            f"LIMIT {self.taille_lot})"
+        ]
+
+    def executer(self, connexion: Connection):
+        (instruction,) = self.instructions(connexion)
+        while True:
+            resultat = connexion.exec_driver_sql(instruction)
+            if connexion.in_transaction():
+                connexion.commit()
+            if resultat.rowcount < self.taille_lot:
+                return
+
+
+class PermissionsParDefaut(Operation):
+    """
+    Remplace les permissions des rôles par défaut (gestion, commercial, support)
+    qui ne sont pas au format ressource -> actions (ex : l'ancienne valeur
+    {"read": true, "write": false}) par celles de `DEFAULT_PERMISSIONS`.
+    Les permissions déjà au bon format (éventuellement personnalisées) sont conservées.
+    """
+
+    def _a_corriger(self, connexion: Connection) -> list[str]:
+        """Retourne les noms des rôles par défaut dont les permissions sont à remplacer."""
+        if not inspect(connexion).has_table("roles"):
+            return []
+        roles = Base.metadata.tables["roles"]
+        lignes = connexion.execute(
+            select(roles.c.role, roles.c.permissions).where(
+                roles.c.role.in_(DEFAULT_PERMISSIONS)
+            )
+        )
+        return [
+            role
+            for role, permissions in lignes
+            if not permissions or not permissions_valides(permissions)
+        ]
+
+    def instructions(self, connexion: Connection) -> list[str]:
+        return [
+            f"UPDATE roles SET permissions = "
+            f"'{json.dumps(get_default_permissions(role))}' WHERE role = '{role}'"
+            for role in self._a_corriger(connexion)
+        ]
+
+    def executer(self, connexion: Connection):
+        roles = Base.metadata.tables["roles"]
+        for role in self._a_corriger(connexion):
+            connexion.execute(
+                update(roles)
+                .where(roles.c.role == role)
+                .values(permissions=get_default_permissions(role))
+            )
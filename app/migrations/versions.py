@@ -0,0 +1,66 @@
+from app.migrations.operations import CreerIndex, CreerTables, PermissionsParDefaut
+
+# Enregistre tous les modèles dans Base.metadata (utilisé par CreerTables)
+from app.models import client, collaborateur, contrat, evenement  # noqa: F401
+
+
+class Migration:
+    """
+    Version du schéma : un numéro, un libellé et la liste des opérations à appliquer.
+
+    Une migration publiée ne se modifie plus : un changement de schéma
+    s'ajoute en nouvelle version à la fin de `MIGRATIONS`.
+    """
+
+    __slots__ = ("version", "nom", "operations")
+
+    def __init__(self, version: int, nom: str, operations: list):
+        self.version = version
+        self.nom = nom
+        self.operations = operations
+
+
+MIGRATIONS = [
+    Migration(1, "Tables initiales", [CreerTables()]),
+    Migration(
+        2,
+        "Index des filtres et des propriétaires, email client unique",
+        [
+            CreerIndex("ix_collaborateurs_role_id", "collaborateurs", ["role_id"]),
+            CreerIndex(
+                "ix_clients_contact_commercial_id", "clients", ["contact_commercial_id"]
+            ),
+            CreerIndex(
+                "clients_email_key",
+                "clients",
+                ["email"],
+                unique=True,
+                contrainte=True,
+            ),
+            CreerIndex("ix_contrats_client_id", "contrats", ["client_id"]),
+            CreerIndex(
+                "ix_contrats_commercial_statut",
+                "contrats",
+                ["contact_commercial_id", "statut_contrat"],
+            ),
+            CreerIndex(
+                "ix_contrats_non_payes",
+                "contrats",
+                ["contact_commercial_id", "montant_restant"],
+                where="montant_restant > 0",
+            ),
+            CreerIndex("ix_evenements_contrat_id", "evenements", ["contrat_id"]),
+            CreerIndex("ix_evenements_client_id", "evenements", ["client_id"]),
+            CreerIndex(
+                "ix_evenements_support_contact_id", "evenements", ["support_contact_id"]
+            ),
+            CreerIndex(
+                "ix_evenements_sans_support",
+                "evenements",
+                ["id"],
+                where="support_contact_id IS NULL",
+            ),
+        ],
+    ),
+    Migration(3, "Permissions des rôles par défaut", [PermissionsParDefaut()]),
+]
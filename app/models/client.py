@@ -31,6 +31,8 @@ class Client(Base):
         nullable=False → le champ doit avoir une valeur (non vide en base).
         nullable=True → le champ peut être vide (valeur NULL autorisée).
         back_populates → établit une relation bidirectionnelle entre deux modèles (par ex. un client ↔ un collaborateur).
+        unique=True sur l'email → un client ne peut pas être enregistré deux fois.
+        index=True sur contact_commercial_id → clients d'un commercial (droits de modification).
     """
 
     __tablename__ = "clients"  # Nom de la table dans la base de données
@@ -38,14 +40,14 @@ class Client(Base):
     # Colonnes principales
     id = Column(Integer, primary_key=True)
     nom_complet = Column(String, nullable=False)
-    email = Column(String, nullable=False)
+    email = Column(String, unique=True, nullable=False)
     telephone = Column(String, nullable=False)
     entreprise = Column(String, nullable=False)
     date_creation = Column(Date, nullable=False)
     derniere_mise_a_jour = Column(Date, nullable=True)
 
     # Relation avec le collaborateur commercial (clé étrangère vers "collaborateurs.id")
-    contact_commercial_id = Column(Integer, ForeignKey("collaborateurs.id"))
+    contact_commercial_id = Column(Integer, ForeignKey("collaborateurs.id"), index=True)
     contact_commercial = relationship("Collaborateur", back_populates="clients")
 
     # Relations avec d'autres tables
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, JSON, inspect
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -77,7 +77,7 @@ class Collaborateur(Base):
     mot_de_passe = Column(String, nullable=False)
 
     # Relation avec le rôle (clé étrangère vers "roles.id")
-    role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
+    role_id = Column(Integer, ForeignKey("roles.id"), nullable=False, index=True)
     role = relationship("Role", back_populates="collaborateurs")
 
     # Relations avec les entités métiers
@@ -88,5 +88,12 @@ class Collaborateur(Base):
     def __repr__(self):
         """
         Retourne une représentation textuelle du collaborateur, utile pour le débogage.
+
+        Le nom du rôle n'est affiché que s'il est déjà chargé (sinon son id) :
+        afficher un collaborateur ne déclenche jamais de requête SQL.
         """
-        return f"<Collaborateur(nom={self.nom}, role={self.role.role})>"
+        if "role" in inspect(self).unloaded or self.role is None:
+            role = self.role_id
+        else:
+            role = self.role.role
+        return f"<Collaborateur(nom={self.nom}, role={role})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, Date, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Float, Date, Boolean, ForeignKey, Index, inspect
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -31,6 +31,10 @@ class Contrat(Base):
             - Client ↔ Contrat
             - Collaborateur ↔ Contrat
             - Contrat ↔ Evenement
+        - Index (voir `__table_args__`) pour les commandes filter-contrats et les droits :
+            - clé étrangère `client_id` ;
+            - `(contact_commercial_id, statut_contrat)` : contrats d'un commercial par statut ;
+            - index partiel `montant_restant > 0` : contrats non soldés.
     """
 
     __tablename__ = "contrats"  # Nom de la table dans la base de données
@@ -43,7 +47,7 @@ class Contrat(Base):
     statut_contrat = Column(Boolean, default=False)
 
     # Relation avec le client (clé étrangère vers "clients.id")
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     client = relationship("Client", back_populates="contrats")
 
     # Relation avec le collaborateur commercial (clé étrangère vers "collaborateurs.id")
@@ -55,8 +59,28 @@ class Contrat(Base):
     # Relation avec les événements liés à ce contrat
     evenements = relationship("Evenement", back_populates="contrat")
 
+    __table_args__ = (
+        # Contrats d'un commercial, éventuellement filtrés par statut (--non-signe)
+        Index("ix_contrats_commercial_statut", contact_commercial_id, statut_contrat),
+        # Contrats non soldés (--non-payes) : seules ces lignes sont indexées
+        Index(
+            "ix_contrats_non_payes",
+            contact_commercial_id,
+            montant_restant,
+            postgresql_where=montant_restant > 0,
+            sqlite_where=montant_restant > 0,
+        ),
+    )
+
     def __repr__(self):
         """
         Retourne une représentation textuelle du contrat, utile pour le débogage.
+
+        Le nom du client n'est affiché que s'il est déjà chargé (sinon son id) :
+        afficher un contrat ne déclenche jamais de requête SQL.
         """
-        return f"<Contrat(id={self.id}, client={self.client.nom_complet}, signe={self.statut_contrat})>"
+        if "client" in inspect(self).unloaded or self.client is None:
+            client = self.client_id
+        else:
+            client = self.client.nom_complet
+        return f"<Contrat(id={self.id}, client={client}, signe={self.statut_contrat})>"
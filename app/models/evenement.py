@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -33,6 +33,9 @@ class Evenement(Base):
             - Contrat ↔ Evenement
             - Client ↔ Evenement
             - Collaborateur ↔ Evenement
+        - Index (voir `__table_args__`) pour les commandes filter-evenements et les droits :
+            - clés étrangères `contrat_id`, `client_id` et `support_contact_id` ;
+            - index partiel `support_contact_id IS NULL` : événements sans support.
     """
 
     __tablename__ = "evenements"  # Nom de la table dans la base de données
@@ -47,17 +50,29 @@ class Evenement(Base):
     notes = Column(String, nullable=True)
 
     # Relation avec le contrat (clé étrangère vers "contrats.id")
-    contrat_id = Column(Integer, ForeignKey("contrats.id"), nullable=False)
+    contrat_id = Column(Integer, ForeignKey("contrats.id"), nullable=False, index=True)
     contrat = relationship("Contrat", back_populates="evenements")
 
     # Relation avec le client (clé étrangère vers "clients.id")
-    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
+    client_id = Column(Integer, ForeignKey("clients.id"), nullable=False, index=True)
     client = relationship("Client", back_populates="evenements")
 
     # Relation avec le collaborateur du support (clé étrangère vers "collaborateurs.id")
-    support_contact_id = Column(Integer, ForeignKey("collaborateurs.id"), nullable=True)
+    support_contact_id = Column(
+        Integer, ForeignKey("collaborateurs.id"), nullable=True, index=True
+    )
     support_contact = relationship("Collaborateur", back_populates="evenements")
 
+    __table_args__ = (
+        # Événements à attribuer (--sans-support) : seules ces lignes sont indexées
+        Index(
+            "ix_evenements_sans_support",
+            "id",
+            postgresql_where=support_contact_id.is_(None),
+            sqlite_where=support_contact_id.is_(None),
+        ),
+    )
+
     def __repr__(self):
         """
         Retourne une représentation textuelle de l’événement, utile pour le débogage.
@@ -0,0 +1,153 @@
+import json
+import os
+import random
+import time
+from app import config
+
+# Événements métier envoyés à Sentry par lots
+#
+# Une commande CLI est un processus court : envoyer chaque événement obligerait
+# chaque sortie à attendre le transport réseau. Les événements sont donc écrits
+# dans un fichier local (spool), puis envoyés en un seul message Sentry par lot
+# quand le spool contient TELEMETRIE_BATCH_SIZE événements ou que le plus ancien
+# a plus de TELEMETRIE_DELAI_MAX secondes. Sans SENTRY_DSN, rien n'est écrit ni
+# importé.
+
+# Nombre maximal d'événements regroupés dans un même message Sentry
+EVENEMENTS_PAR_MESSAGE = 100
+
+
+def actif() -> bool:
+    """Indique si la télémétrie est configurée (SENTRY_DSN renseigné)."""
+    return bool(config.SENTRY_DSN)
+
+
+def evenement_metier(message: str, **contexte) -> bool:
+    """
+    Enregistre un événement métier dans le spool local (sans accès réseau).
+
+    Paramètres :
+        message : Description de l'événement (ex : "Contrat signé : ID 12").
+        contexte : Données associées, sérialisables en JSON.
+
+    Retour :
+        bool : True si l'événement a été gardé (DSN configuré et échantillonné).
+    """
+    if not actif():
+        return False
+    if random.random() >= config.TELEMETRIE_SAMPLE_RATE:
+        return False
+    ligne = json.dumps(
+        {"horodatage": time.time(), "message": message, "contexte": contexte},
+        ensure_ascii=False,
+        default=str,
+    )
+    # Une ligne par écriture en mode ajout : plusieurs processus peuvent écrire
+    with open(config.TELEMETRIE_SPOOL, "a", encoding="utf-8") as spool:
+        spool.write(ligne + "\n")
+    return True
+
+
+def lire_spool(chemin: str) -> list[dict]:
+    """Lit les événements d'un fichier spool (les lignes illisibles sont ignorées)."""
+    evenements = []
+    with open(chemin, "r", encoding="utf-8") as f:
+        for ligne in f:
+            try:
+                evenements.append(json.loads(ligne))
+            except ValueError:
+                continue
+    return evenements
+
+
+def lot_pret(evenements: list[dict], maintenant: float = None) -> bool:
+    """Indique si le spool doit être envoyé (taille du lot ou ancienneté atteinte)."""
+    if not evenements:
+        return False
+    maintenant = maintenant or time.time()
+    plus_ancien = min(e.get("horodatage", maintenant) for e in evenements)
+    return (
+        len(evenements) >= config.TELEMETRIE_BATCH_SIZE
+        or maintenant - plus_ancien >= config.TELEMETRIE_DELAI_MAX
+    )
+
+
+def envoyer(evenements: list[dict], timeout: float, transport=None) -> bool:
+    """
+    Envoie les événements à Sentry, un message par tranche de `EVENEMENTS_PAR_MESSAGE`.
+
+    `capture_message` et `flush` ne signalent pas un échec réseau : les lots
+    passent donc par un client dédié dont le transport (`TransportLots`)
+    envoie chaque message de façon synchrone et compte les réponses de Sentry.
+
+    Paramètres :
+        evenements : Événements lus dans le spool.
+        timeout : Attente maximale (secondes) de chaque envoi.
+        transport : Transport à utiliser (TransportLots vers SENTRY_DSN si absent).
+
+    Retour :
+        bool : True si chaque message a été accepté par Sentry.
+    """
+    from sentry_init import TransportLots, sentry_sdk
+
+    transport = transport or TransportLots(config.SENTRY_DSN, timeout)
+    client = sentry_sdk.Client(
+        config.SENTRY_DSN, transport=transport, default_integrations=False
+    )
+    messages = 0
+    acceptes = True
+    try:
+        with sentry_sdk.isolation_scope() as scope:
+            scope.set_client(client)
+            for debut in range(0, len(evenements), EVENEMENTS_PAR_MESSAGE):
+                lot = evenements[debut : debut + EVENEMENTS_PAR_MESSAGE]
+                with sentry_sdk.new_scope() as scope_lot:
+                    scope_lot.set_extra("evenements", lot)
+                    identifiant = sentry_sdk.capture_message(
+                        f"{len(lot)} événement(s) métier", level="info"
+                    )
+                messages += 1
+                acceptes = acceptes and identifiant is not None
+    finally:
+        client.close(timeout=timeout)
+    return acceptes and transport.refusees == 0 and transport.acceptees == messages
+
+
+def expedier(forcer: bool = False, timeout: float = None) -> int:
+    """
+    Envoie le spool à Sentry si un lot est prêt (ou si `forcer`), avec une
+    attente bornée. Appelée à la fin de chaque commande CLI.
+
+    Le spool est d'abord renommé : les événements écrits pendant l'envoi vont
+    dans un nouveau spool, et un envoi non confirmé (voir `envoyer`) est remis
+    dans la file. Un événement peut donc être envoyé deux fois, jamais perdu.
+
+    Retour :
+        int : Nombre d'événements envoyés.
+    """
+    chemin = config.TELEMETRIE_SPOOL
+    if not actif():
+        return 0
+    envoi = f"{chemin}.{os.getpid()}.envoi"
+    try:
+        evenements = lire_spool(chemin)
+        if not forcer and not lot_pret(evenements):
+            return 0
+        os.replace(chemin, envoi)
+    except FileNotFoundError:
+        # Pas de spool, ou un autre processus vient de le prendre pour l'envoyer
+        return 0
+
+    evenements = lire_spool(envoi)
+    timeout = config.TELEMETRIE_FLUSH_TIMEOUT if timeout is None else timeout
+    try:
+        envoye = envoyer(evenements, timeout)
+    except Exception:
+        envoye = False
+    if not envoye:
+        # Remet les événements dans la file pour la prochaine commande
+        with open(chemin, "a", encoding="utf-8") as spool:
+            for e in evenements:
+                spool.write(json.dumps(e, ensure_ascii=False, default=str) + "\n")
+    os.remove(envoi)
+    return len(evenements) if envoye else 0
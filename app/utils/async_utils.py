@@ -0,0 +1,230 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import AsyncIterator, Type
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from rich.panel import Panel
+
+from app.utils.db_utils import (
+    DEFAULT_PAGE_SIZE,
+    afficher_ajout,
+    afficher_introuvable,
+    afficher_modification,
+    add_row,
+    console,
+    get_for_update,
+    get_meta,
+    relations_lecture,
+    requete_page,
+    update_row,
+)
+from app.utils.rendu_utils import creer_rendu
+
+# Équivalents asynchrones de read_table / add_table / update_table / delete_table.
+# Les requêtes et les écritures réutilisent les fonctions synchrones de db_utils
+# (`requete_page`, `add_row`, `update_row`...) : seule l'exécution change.
+
+
+@asynccontextmanager
+async def unite_de_travail_async(AsyncSessionLocal) -> AsyncIterator[AsyncSession]:
+    """
+    Version asynchrone de `unite_de_travail` : une session et une transaction,
+    commit à la sortie du bloc, rollback si une exception est levée.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except BaseException:
+            await db.rollback()
+            raise
+
+
+async def charger(AsyncSessionLocal, modele: Type, record_id: int):
+    """Charge un enregistrement par sa clé primaire dans sa propre session (None si absent)."""
+    if record_id is None:
+        return None
+    async with AsyncSessionLocal() as db:
+        return await db.get(modele, record_id)
+
+
+async def charger_ensemble(AsyncSessionLocal, **recherches) -> dict:
+    """
+    Charge plusieurs enregistrements indépendants en parallèle.
+
+    Chaque recherche ouvre sa session (donc sa connexion) : les requêtes partent
+    ensemble et la durée totale est celle de la plus lente, au lieu de leur somme.
+
+    Exemple d'utilisation :
+        trouves = await charger_ensemble(
+            AsyncSessionLocal,
+            client=(Client, 3),
+            contrat=(Contrat, 12),
+            support=(Collaborateur, 7),
+        )
+
+    Paramètres :
+        AsyncSessionLocal : Fabrique de sessions asynchrones.
+        recherches : Nom -> (modèle, identifiant).
+
+    Retour :
+        dict : Nom -> instance trouvée (ou None).
+    """
+    instances = await asyncio.gather(
+        *(
+            charger(AsyncSessionLocal, modele, record_id)
+            for modele, record_id in recherches.values()
+        )
+    )
+    return dict(zip(recherches, instances))
+
+
+async def read_table_async(
+    modele: Type,
+    AsyncSessionLocal,
+    limit: int = None,
+    after_id: int = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    colonnes: list[str] = None,
+    avec_relations: bool = False,
+    format_sortie: str = "rich",
+) -> int:
+    """
+    Version asynchrone de `read_table` : lit et affiche une table page par page
+    (pagination keyset, mêmes requêtes que `iter_pages`, mêmes formats d'affichage).
+
+    Retour :
+        int : Nombre total d'enregistrements affichés.
+    """
+    meta = get_meta(modele)
+    colonnes = colonnes or list(meta.colonnes)
+    selection = colonnes if meta.pk in colonnes else colonnes + [meta.pk]
+    libelles = relations_lecture(modele) if avec_relations else []
+    rendu = creer_rendu(modele, format_sortie)
+    total = 0
+    numero = 0
+    dernier_id = after_id
+
+    async with AsyncSessionLocal() as db:
+        while limit is None or total < limit:
+            taille = page_size if limit is None else min(page_size, limit - total)
+            resultat = await db.execute(
+                requete_page(modele, selection, dernier_id, taille, avec_relations)
+            )
+            lignes = resultat.all()
+            if not lignes:
+                break
+            page = [
+                {
+                    **dict(zip(colonnes, ligne)),
+                    **dict(zip(libelles, ligne[len(selection) :])),
+                }
+                for ligne in lignes
+            ]
+            total += len(page)
+            numero += 1
+            rendu.page(page, titre=f"{modele.__name__} (page {numero})")
+            dernier_id = lignes[-1][selection.index(meta.pk)]
+            if len(lignes) < taille:
+                break
+
+    rendu.terminer()
+    return total
+
+
+async def add_table_async(modele: Type, AsyncSessionLocal, data: dict):
+    """Version asynchrone de `add_table` (un seul INSERT ... RETURNING)."""
+    async with unite_de_travail_async(AsyncSessionLocal) as db:
+        resultat = await db.run_sync(add_row, modele, data)
+    afficher_ajout(modele)
+    return resultat
+
+
+async def update_table_async(
+    modele: Type, AsyncSessionLocal, record_id: int, data: dict, id_field: str = "id"
+):
+    """Version asynchrone de `update_table` (SELECT ... FOR UPDATE puis UPDATE)."""
+    async with unite_de_travail_async(AsyncSessionLocal) as db:
+        instance = await db.run_sync(get_for_update, modele, record_id, id_field)
+        if not instance:
+            afficher_introuvable(modele, record_id)
+            return
+        resultat = await db.run_sync(update_row, modele, instance, data)
+    afficher_modification(modele, record_id, data)
+    return resultat
+
+
+async def delete_table_async(
+    modele: Type, AsyncSessionLocal, record_id: int, id_field: str = "id"
+):
+    """Version asynchrone de `delete_table`."""
+    async with unite_de_travail_async(AsyncSessionLocal) as db:
+        instance = await db.run_sync(get_for_update, modele, record_id, id_field)
+        if not instance:
+            afficher_introuvable(modele, record_id)
+            return
+        await db.delete(instance)
+    console.print(
+        Panel.fit(
+            f"[bold red]{modele.__name__} {record_id} supprimé avec succès ![/]",
+            border_style="red",
+        )
+    )
+
+
+# ==================== ADAPTATEUR SYNCHRONE ====================
+
+
+# Boucle d'événements unique de l'adaptateur synchrone (créée au premier appel)
+_boucle = None
+_verrou_boucle = threading.Lock()
+
+
+def boucle_adaptateur() -> asyncio.AbstractEventLoop:
+    """
+    Retourne la boucle d'événements de l'adaptateur synchrone, qui tourne dans
+    un thread dédié pendant toute la vie du processus.
+
+    Les connexions asyncpg sont liées à la boucle qui les a ouvertes : une
+    boucle unique permet au pool du moteur asynchrone de les réutiliser d'une
+    commande à l'autre (shell interactif), ce qu'`asyncio.run` empêcherait.
+    """
+    global _boucle
+    with _verrou_boucle:
+        if _boucle is None:
+            _boucle = asyncio.new_event_loop()
+            threading.Thread(
+                target=_boucle.run_forever, name="crm-async", daemon=True
+            ).start()
+    return _boucle
+
+
+def en_synchrone(fonction_async):
+    """
+    Décorateur qui expose une fonction asynchrone comme une fonction synchrone.
+
+    L'appel soumet la coroutine à la boucle de l'adaptateur (`boucle_adaptateur`)
+    et attend son résultat : les commandes Typer synchrones peuvent utiliser la
+    couche asynchrone sans changer de signature.
+
+    Exemple d'utilisation :
+        read_table = en_synchrone(read_table_async)
+        read_table(Client, AsyncSessionLocal, limit=10)
+    """
+
+    @wraps(fonction_async)
+    def wrapper(*args, **kwargs):
+        return asyncio.run_coroutine_threadsafe(
+            fonction_async(*args, **kwargs), boucle_adaptateur()
+        ).result()
+
+    return wrapper
+
+
+read_table_sync = en_synchrone(read_table_async)
+add_table_sync = en_synchrone(add_table_async)
+update_table_sync = en_synchrone(update_table_async)
+delete_table_sync = en_synchrone(delete_table_async)
+charger_ensemble_sync = en_synchrone(charger_ensemble)
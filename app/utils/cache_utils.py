@@ -0,0 +1,399 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from rich.panel import Panel
+from sqlalchemy import select
+
+from app import config
+from app.auth.permissions import empreinte_permissions, permissions_effectives
+from app.models.collaborateur import Collaborateur, Role
+from app.utils.db_utils import console
+
+# Tables de référence en cache et tables dont elles dépendent : modifier un rôle
+# invalide aussi les collaborateurs (qui portent le nom de leur rôle).
+INVALIDATIONS = {
+    "roles": ("roles", "collaborateurs"),
+    "collaborateurs": ("collaborateurs",),
+}
+
+
+@contextmanager
+def verrou_fichier(chemin: str):
+    """Verrou exclusif entre processus, posé sur le fichier `chemin` (créé si besoin)."""
+    with open(chemin, "a+") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CacheReference:
+    """
+    Cache en lecture (read-through) des données de référence : rôles et collaborateurs.
+
+    Chaque entrée expire après `ttl` secondes. Le cache vit dans le processus
+    (partagé par les commandes d'un même shell) et, si `fichier` est renseigné,
+    est enregistré dans un petit fichier JSON relu par les invocations suivantes
+    de la CLI. Les compteurs de succès (hits) et d'échecs (misses) sont cumulés
+    dans le même fichier.
+
+    Le fichier n'est réécrit qu'après un échec (entrée chargée) ou une
+    invalidation : un succès ne fait aucune écriture, ses compteurs sont
+    enregistrés une fois en fin de commande (voir `enregistrer_cache`).
+
+    Plusieurs processus partagent le fichier : chaque écriture le relit sous
+    verrou et y fusionne les changements du processus. Une invalidation
+    incrémente la génération du fichier ; un processus qui a lu une génération
+    plus ancienne n'y réécrit pas ses entrées, qui peuvent être périmées.
+    """
+
+    def __init__(self, fichier: str = None, ttl: int = 300):
+        self.fichier = fichier
+        self.ttl = ttl
+        self.entrees = {}  # clé -> [expiration (timestamp), valeur JSON]
+        self.generation = 0  # Génération du fichier lue par ce processus
+        self.hits = 0
+        self.misses = 0
+        self._charge = False
+        # Changements pas encore enregistrés : entrées (None = supprimée) et compteurs
+        self._modifications = {}
+        self._hits_en_attente = 0
+        self._misses_en_attente = 0
+
+    def _lire_fichier(self) -> dict:
+        """Lit le fichier du cache (un fichier absent ou illisible est un cache vide)."""
+        if not self.fichier or not os.path.exists(self.fichier):
+            return {}
+        try:
+            with open(self.fichier, "r", encoding="utf-8") as f:
+                contenu = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return contenu if isinstance(contenu, dict) else {}
+
+    def _adopter(self, contenu: dict):
+        """Reprend l'état lu dans le fichier, plus les compteurs pas encore enregistrés."""
+        self.entrees = contenu.get("entrees", {})
+        self.generation = contenu.get("generation", 0)
+        self.hits = contenu.get("hits", 0) + self._hits_en_attente
+        self.misses = contenu.get("misses", 0) + self._misses_en_attente
+
+    def _charger(self):
+        """Lit le fichier du cache au premier accès."""
+        if self._charge:
+            return
+        self._charge = True
+        self._adopter(self._lire_fichier())
+
+    def _ecrire(self, contenu: dict):
+        """Écrit le fichier de façon atomique (fichier temporaire propre au processus)."""
+        descripteur, temporaire = tempfile.mkstemp(
+            dir=os.path.dirname(self.fichier) or ".",
+            prefix=f"{os.path.basename(self.fichier)}.",
+            suffix=".tmp",
+        )
+        try:
+            with os.fdopen(descripteur, "w", encoding="utf-8") as f:
+                json.dump(contenu, f, ensure_ascii=False, default=str)
+            os.replace(temporaire, self.fichier)
+        except BaseException:
+            if os.path.exists(temporaire):
+                os.remove(temporaire)
+            raise
+
+    def _enregistrer(
+        self, prefixes_invalides: tuple = None, remise_a_zero: bool = False
+    ):
+        """
+        Fusionne les changements du processus dans le fichier, sous verrou.
+
+        Paramètres :
+            prefixes_invalides : Préfixes des clés à supprimer ; une invalidation
+                incrémente la génération du fichier.
+            remise_a_zero : Vide toutes les entrées et remet les compteurs à zéro.
+        """
+        with verrou_fichier(f"{self.fichier}.lock"):
+            contenu = self._lire_fichier()
+            generation = contenu.get("generation", 0)
+            entrees = contenu.get("entrees", {})
+            if generation != self.generation:
+                # Invalidation faite ailleurs depuis notre lecture : nos entrées
+                # ont pu être chargées avant elle, seules celles du fichier restent
+                self._modifications = {}
+            for cle, entree in self._modifications.items():
+                if entree is None:
+                    entrees.pop(cle, None)
+                else:
+                    entrees[cle] = entree
+            if remise_a_zero:
+                generation += 1
+                entrees = {}
+            elif prefixes_invalides is not None:
+                generation += 1
+                entrees = {
+                    cle: entree
+                    for cle, entree in entrees.items()
+                    if not cle.startswith(prefixes_invalides)
+                }
+            maintenant = time.time()
+            contenu = {
+                "generation": generation,
+                "hits": (
+                    0
+                    if remise_a_zero
+                    else contenu.get("hits", 0) + self._hits_en_attente
+                ),
+                "misses": (
+                    0
+                    if remise_a_zero
+                    else contenu.get("misses", 0) + self._misses_en_attente
+                ),
+                "entrees": {
+                    cle: entree
+                    for cle, entree in entrees.items()
+                    if entree[0] > maintenant
+                },
+            }
+            self._ecrire(contenu)
+        self._modifications = {}
+        self._hits_en_attente = self._misses_en_attente = 0
+        self._adopter(contenu)
+
+    def sauvegarder(
+        self, prefixes_invalides: tuple = None, remise_a_zero: bool = False
+    ):
+        """
+        Enregistre les changements du processus (entrées, compteurs, invalidation).
+
+        Une erreur d'écriture (répertoire en lecture seule, disque plein) est
+        ignorée : le cache reste en mémoire et sera enregistré à la prochaine
+        écriture réussie.
+        """
+        if not self.fichier:
+            maintenant = time.time()
+            self.entrees = {
+                cle: entree
+                for cle, entree in self.entrees.items()
+                if entree[0] > maintenant
+            }
+            self._modifications = {}
+            self._hits_en_attente = self._misses_en_attente = 0
+            return
+        try:
+            self._enregistrer(prefixes_invalides, remise_a_zero)
+        except OSError:
+            pass
+
+    def enregistrer_compteurs(self):
+        """Enregistre le fichier si des succès ont été comptés depuis la dernière écriture."""
+        if self._hits_en_attente:
+            self.sauvegarder()
+
+    def obtenir(self, cle: str, charger: Callable[[], dict]):
+        """
+        Retourne la valeur en cache de `cle`, ou la charge avec `charger()` si
+        elle est absente ou expirée. Une valeur None (introuvable) n'est pas gardée.
+        """
+        self._charger()
+        maintenant = time.time()
+        entree = self.entrees.get(cle)
+        if entree and entree[0] > maintenant:
+            # Succès : aucune écriture, le compteur part avec la prochaine sauvegarde
+            self.hits += 1
+            self._hits_en_attente += 1
+            return entree[1]
+        self.misses += 1
+        self._misses_en_attente += 1
+        valeur = charger()
+        if valeur is not None:
+            self.entrees[cle] = [maintenant + self.ttl, valeur]
+        else:
+            self.entrees.pop(cle, None)
+        self._modifications[cle] = self.entrees.get(cle)
+        self.sauvegarder()
+        return valeur
+
+    def consulter(self, cle: str):
+        """Retourne la valeur en cache de `cle` si elle est valide, sans la charger ni compter."""
+        self._charger()
+        entree = self.entrees.get(cle)
+        return entree[1] if entree and entree[0] > time.time() else None
+
+    def invalider(self, table: str):
+        """Supprime les entrées de la table modifiée et des tables qui en dépendent."""
+        self._charger()
+        prefixes = tuple(f"{t}:" for t in INVALIDATIONS.get(table, (table,)))
+        self.entrees = {
+            cle: entree
+            for cle, entree in self.entrees.items()
+            if not cle.startswith(prefixes)
+        }
+        self._modifications = {
+            cle: entree
+            for cle, entree in self._modifications.items()
+            if not cle.startswith(prefixes)
+        }
+        self.sauvegarder(prefixes_invalides=prefixes)
+
+    def vider(self):
+        """Supprime toutes les entrées et remet les compteurs à zéro."""
+        self._charge = True
+        self.entrees = {}
+        self.hits = self.misses = 0
+        self._modifications = {}
+        self._hits_en_attente = self._misses_en_attente = 0
+        self.sauvegarder(remise_a_zero=True)
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache : hits, misses, taux de succès et nombre d'entrées."""
+        self._charger()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "taux": round(self.hits / total, 3) if total else 0.0,
+            "entrees": len(self.entrees),
+        }
+
+
+# Cache de la CLI, créé au premier accès (voir `get_cache`)
+_cache = None
+
+
+def get_cache() -> CacheReference:
+    """Retourne le cache de référence de la CLI (CACHE_REFERENCE_FICHIER, CACHE_REFERENCE_TTL)."""
+    global _cache
+    if _cache is None:
+        _cache = CacheReference(
+            config.CACHE_REFERENCE_FICHIER or None, config.CACHE_REFERENCE_TTL
+        )
+    return _cache
+
+
+def enregistrer_cache():
+    """Enregistre les compteurs du cache de la CLI en fin de commande (s'il a servi)."""
+    if _cache is not None:
+        _cache.enregistrer_compteurs()
+
+
+def invalider_reference(modele):
+    """Invalide le cache après la modification ou la suppression d'une ligne de `modele`."""
+    if modele.__tablename__ in INVALIDATIONS:
+        get_cache().invalider(modele.__tablename__)
+
+
+# ==================== LECTURES EN CACHE ====================
+
+
+def role_reference(SessionLocal, role_id: int) -> dict:
+    """
+    Retourne un rôle ({"id", "role", "permissions"}) depuis le cache, ou None s'il n'existe pas.
+    """
+
+    def charger():
+        db = SessionLocal()
+        try:
+            ligne = db.execute(
+                select(Role.id, Role.role, Role.permissions).where(Role.id == role_id)
+            ).first()
+            return dict(ligne._mapping) if ligne else None
+        finally:
+            db.close()
+
+    return get_cache().obtenir(f"roles:{role_id}", charger)
+
+
+def collaborateur_reference(SessionLocal, collab_id: int) -> dict:
+    """
+    Retourne un collaborateur ({"id", "nom", "email", "role_id", "role"}) depuis
+    le cache, ou None s'il n'existe pas. Le mot de passe haché n'est jamais mis en cache.
+    """
+
+    def charger():
+        db = SessionLocal()
+        try:
+            ligne = db.execute(
+                select(
+                    Collaborateur.id,
+                    Collaborateur.nom,
+                    Collaborateur.email,
+                    Collaborateur.role_id,
+                    Role.role,
+                )
+                .outerjoin(Collaborateur.role)
+                .where(Collaborateur.id == collab_id)
+            ).first()
+            return dict(ligne._mapping) if ligne else None
+        finally:
+            db.close()
+
+    return get_cache().obtenir(f"collaborateurs:{collab_id}", charger)
+
+
+def verifier_role_existe(SessionLocal, role_id: int) -> bool:
+    """Vérifie qu'un rôle existe (None = pas de rôle demandé) ; affiche une erreur sinon."""
+    if role_id is None or role_reference(SessionLocal, role_id):
+        return True
+    console.print(Panel.fit(f"[red]Role {role_id} non trouvé.[/]", border_style="red"))
+    return False
+
+
+def verifier_collaborateur_role(SessionLocal, collab_id: int, role: str) -> bool:
+    """
+    Vérifie qu'un collaborateur existe et a le rôle attendu (ex : le support
+    d'un événement) ; None = pas de collaborateur demandé. Affiche une erreur sinon.
+    """
+    if collab_id is None:
+        return True
+    collab = collaborateur_reference(SessionLocal, collab_id)
+    if collab and collab["role"] == role:
+        return True
+    message = (
+        f"Collaborateur {collab_id} non trouvé."
+        if not collab
+        else f"Le collaborateur {collab_id} n'a pas le rôle {role}."
+    )
+    console.print(Panel.fit(f"[red]{message}[/]", border_style="red"))
+    return False
+
+
+def permissions_perimees(payload: dict, SessionLocal=None) -> bool:
+    """
+    Indique si les permissions embarquées dans un JWT ne correspondent plus à
+    celles du rôle en base.
+
+    Le rôle est lu par le cache de référence (`role_reference`) : une requête
+    sur la clé primaire au plus toutes les CACHE_REFERENCE_TTL secondes.
+    `update-role --permissions` remet le rôle modifié en cache : sur la même
+    machine, les anciens tokens sont refusés dès la commande suivante ; ailleurs,
+    au plus tard à l'expiration de l'entrée en cache. Un rôle supprimé rend
+    le token périmé.
+    """
+    if "permissions_empreinte" not in payload or payload.get("role_id") is None:
+        return False
+    if SessionLocal is None:
+        from app.database import SessionLocal
+    role = role_reference(SessionLocal, payload["role_id"])
+    if role is None:
+        return True
+    permissions = permissions_effectives(role["role"], role["permissions"])
+    return empreinte_permissions(permissions) != payload["permissions_empreinte"]
@@ -1,29 +1,48 @@
 import typer
 import os
 import re
+import time
 from datetime import datetime
-from sqlalchemy import inspect
-from typing import Type
+from sqlalchemy import delete, inspect, insert, literal, select, true, update
+from sqlalchemy.orm import Session, aliased
+from typing import Iterator, Type
 from sentry_init import sentry_sdk
+from app.telemetrie import evenement_metier
+from app.utils.rendu_utils import creer_rendu  # Formats d'affichage des lectures
+from contextlib import contextmanager
 from functools import wraps
+from operator import attrgetter
 from app.auth.utils import verifier_token  # Pour décoder et vérifier le JWT
-from werkzeug.security import generate_password_hash  # Pour sécuriser les mots de passe
+from app.auth.core import rafraichir_si_necessaire  # Renouvellement sans message
+from app.auth.mots_de_passe import (
+    hacher_mot_de_passe,
+)  # Pour sécuriser les mots de passe
 from app.models.collaborateur import Collaborateur
-from app.auth.permissions import DEFAULT_PERMISSIONS  # Permissions par rôle
+from app.models.contrat import Contrat
+from app.models.evenement import Evenement
+from app.auth.permissions import (  # Permissions par rôle (masques de bits)
+    MASQUES_PAR_DEFAUT,
+    a_permission,
+)
 from rich.console import Console  # Pour un affichage stylisé
-from rich.table import Table
 from rich.panel import Panel
 
 
 # Initialisation de la console Rich pour affichage coloré
 console = Console()
 
+# Nombre de lignes lues (et affichées) par page lors des lectures paginées
+DEFAULT_PAGE_SIZE = 500
+
 
 # ==================== DÉCORATEURS ====================
 
 
 def log_sentry(message_template: str):
-    """Décorateur pour logger un message Sentry après exécution et capturer exceptions."""
+    """
+    Décorateur qui enregistre un événement métier après exécution (envoyé à
+    Sentry par lots, voir `app.telemetrie`) et capture les exceptions.
+    """
 
     def decorator(func):
         @wraps(func)
@@ -34,7 +53,7 @@ def log_sentry(message_template: str):
                     msg = message_template.format(
                         result=result, args=args, kwargs=kwargs
                     )
-                    sentry_sdk.capture_message(msg)
+                    evenement_metier(msg)
                 except Exception as e:
                     sentry_sdk.capture_exception(e)
                 return result
@@ -47,6 +66,57 @@ def log_sentry(message_template: str):
     return decorator
 
 
+# ==================== MÉTADONNÉES DES MODÈLES ====================
+
+
+class MetaModele:
+    """
+    Métadonnées d'un modèle SQLAlchemy, calculées une seule fois par processus.
+
+    Attributs :
+        modele : Classe SQLAlchemy décrite.
+        colonnes (tuple[str]): Noms des colonnes, dans l'ordre du mapper.
+        types (dict): Type SQLAlchemy de chaque colonne.
+        pk (str): Nom de la colonne clé primaire.
+        attributs (dict): Attribut instrumenté de chaque colonne (ex : Client.email).
+    """
+
+    __slots__ = ("modele", "colonnes", "types", "pk", "attributs", "_getter")
+
+    def __init__(self, modele: Type):
+        mapper = inspect(modele).mapper
+        self.modele = modele
+        self.colonnes = tuple(c.key for c in mapper.column_attrs)
+        self.types = {c.key: c.columns[0].type for c in mapper.column_attrs}
+        self.pk = mapper.get_property_by_column(mapper.primary_key[0]).key
+        self.attributs = {col: getattr(modele, col) for col in self.colonnes}
+        self._getter = attrgetter(*self.colonnes)
+
+    def to_dict(self, instance) -> dict:
+        """Convertit une instance du modèle en dictionnaire {colonne: valeur}."""
+        valeurs = self._getter(instance)
+        if len(self.colonnes) == 1:
+            valeurs = (valeurs,)
+        return dict(zip(self.colonnes, valeurs))
+
+
+# Registre des métadonnées par modèle (rempli à la première utilisation)
+_REGISTRE_MODELES: dict[Type, MetaModele] = {}
+
+
+def get_meta(modele: Type) -> MetaModele:
+    """Retourne les métadonnées (en cache) d'un modèle SQLAlchemy."""
+    meta = _REGISTRE_MODELES.get(modele)
+    if meta is None:
+        meta = _REGISTRE_MODELES[modele] = MetaModele(modele)
+    return meta
+
+
+def row_to_dict(modele: Type, instance) -> dict:
+    """Convertit une instance d'un modèle en dictionnaire via le registre."""
+    return get_meta(modele).to_dict(instance)
+
+
 # ==================== AUTH ====================
 
 
@@ -54,7 +124,8 @@ def verifier_connexion():
     """
     Vérifie que l'utilisateur est connecté et que le token JWT est valide.
 
-    Cette fonction lit le fichier ".token", décode le token et affiche
+    Cette fonction lit le fichier ".token", le renouvelle s'il expire bientôt
+    (voir `rafraichir_si_necessaire`), décode le token et affiche
     l'utilisateur connecté. Si aucun token n'est trouvé ou que le token
     est invalide, la fonction arrête l'exécution avec un code d'erreur.
 
@@ -72,6 +143,8 @@ def verifier_connexion():
         raise typer.Exit(code=1)
     with open(token_path, "r") as f:
         token = f.read().strip()
+    # Token proche de l'expiration : renouvelé avec le refresh token s'il existe
+    token = rafraichir_si_necessaire(token)
     payload = verifier_token(token)
     console.print(
         Panel.fit(
@@ -82,17 +155,72 @@ def verifier_connexion():
     return payload
 
 
-def verifier_permission(action: str, resource: str) -> bool:
+class ContexteAuth:
+    """
+    Contexte d'authentification d'une invocation de la CLI.
+
+    Le token est lu et vérifié au premier accès à `payload`, puis conservé
+    jusqu'à son expiration : toutes les vérifications d'une même commande (ou
+    des commandes d'un même shell) réutilisent le même payload, sans relire
+    le fichier `.token` ni redécoder le JWT. À l'expiration, le token est relu
+    et renouvelé avec le refresh token s'il existe. Un token dont les permissions ne
+    correspondent plus à celles du rôle (voir `permissions_perimees`) est refusé.
+    """
+
+    def __init__(self, SessionLocal=None):
+        # Sessions utilisées pour relire le rôle (défaut : celles de app.database)
+        self.SessionLocal = SessionLocal
+        self._payload = None
+
+    @property
+    def payload(self) -> dict:
+        """Payload du JWT de l'utilisateur connecté (vérifié une seule fois)."""
+        maintenant = time.time()
+        if self._payload is None or self._payload.get("exp", maintenant) < maintenant:
+            payload = verifier_connexion()
+            # Import local : le cache de référence dépend de ce module
+            from app.utils.cache_utils import permissions_perimees
+
+            if permissions_perimees(payload, self.SessionLocal):
+                console.print(
+                    Panel.fit(
+                        "[bold red]Les permissions de votre rôle ont changé.[/]\n"
+                        "[white]Veuillez vous reconnecter (auth login ou auth refresh).[/]",
+                        border_style="red",
+                    )
+                )
+                raise typer.Exit(code=1)
+            self._payload = payload
+        return self._payload
+
+    def invalider(self):
+        """Oublie le payload (ex : après une connexion ou une déconnexion)."""
+        self._payload = None
+
+
+def verifier_permission(
+    action: str, resource: str, contexte: ContexteAuth = None
+) -> bool:
     """
     Vérifie si l'utilisateur connecté a la permission d'effectuer une action
     sur une ressource donnée (ex: "create" sur "client").
 
+    Si un contexte d'authentification est fourni, son payload (déjà vérifié)
+    est utilisé ; sinon le token est lu et vérifié.
+
+    Les permissions sont les masques de bits du rôle, compilés et embarqués
+    dans le JWT à la connexion : la vérification est un test de bit, sans
+    requête. Un token qui n'en contient pas utilise les masques par défaut du rôle.
+
     Retourne True si la permission est accordée, False sinon.
     """
-    payload = verifier_connexion()
+    payload = contexte.payload if contexte is not None else verifier_connexion()
     connected_user_role = payload["role"]
+    masques = payload.get("permissions")
+    if masques is None:
+        masques = MASQUES_PAR_DEFAUT.get(connected_user_role, {})
 
-    if action not in DEFAULT_PERMISSIONS.get(connected_user_role, {}).get(resource, []):
+    if not a_permission(masques, action, resource):
         console.print(
             Panel.fit(
                 f"[bold red]Accès refusé[/]\n"
@@ -159,8 +287,11 @@ def validate_participants(participants: int, attendues: int) -> tuple[int, int]:
 # ==================== AFFICHAGE RICH ====================
 
 
-def afficher_table(modele: Type, resultats: list[dict]):
+def afficher_table(modele: Type, resultats: list[dict], titre: str = None):
     """Affiche les résultats d'une table sous forme de tableau coloré."""
+    # Import local : le rendu des tableaux n'est chargé que par les commandes de lecture
+    from rich.table import Table
+
     if not resultats:
         console.print(
             Panel.fit(
@@ -169,7 +300,7 @@ def afficher_table(modele: Type, resultats: list[dict]):
             )
         )
         return
-    table = Table(title=f"{modele.__name__}", header_style="bold cyan")
+    table = Table(title=titre or f"{modele.__name__}", header_style="bold cyan")
     for col in resultats[0].keys():
         table.add_column(col, style="white")
     for ligne in resultats:
@@ -185,68 +316,574 @@ def add_collaborateur(SessionLocal, nom, email, mot_de_passe, role_id=None):
     """
     Ajoute un collaborateur en hachant le mot de passe.
     """
-    mot_de_passe_hache = generate_password_hash(mot_de_passe)
+    mot_de_passe_hache = hacher_mot_de_passe(mot_de_passe)
     data = {"nom": nom, "email": email, "mot_de_passe": mot_de_passe_hache}
     if role_id is not None:
         data["role_id"] = role_id
     return add_table(Collaborateur, SessionLocal, data)
 
 
-def read_table(modele: Type, SessionLocal):
+# Lignes visibles par rôle : (table, rôle) -> colonne qui doit contenir l'id connecté
+# (un commercial ne filtre que ses contrats, un support que ses événements)
+FILTRES_PAR_ROLE = {
+    ("contrats", "commercial"): "contact_commercial_id",
+    ("evenements", "support"): "support_contact_id",
+}
+
+
+def filtrer_par_role(modele: Type, query, payload: dict):
     """
-    Lit et affiche tous les enregistrements d'une table SQLAlchemy.
+    Restreint une requête SELECT aux lignes de l'utilisateur connecté selon son rôle.
+
+    Même règle pour les commandes filter-* et l'export (voir `FILTRES_PAR_ROLE`).
 
     Paramètres :
         modele : Classe SQLAlchemy représentant la table.
-        SessionLocal : Sessionmaker SQLAlchemy pour interagir avec la base.
+        query : Requête `select(...)` à filtrer.
+        payload : Payload JWT de l'utilisateur connecté.
+
+    Retour :
+        Select : Requête filtrée (inchangée si le rôle ne restreint pas cette table).
+    """
+    colonne = FILTRES_PAR_ROLE.get((modele.__tablename__, payload["role"]))
+    if colonne is None:
+        return query
+    return query.where(get_meta(modele).attributs[colonne] == payload["id"])
+
+
+# Lignes modifiables par rôle : (table, rôle) -> colonne qui doit contenir l'id connecté.
+# La gestion modifie toutes les lignes ; un autre rôle absent de cette table n'en
+# modifie aucune. La condition est ajoutée au WHERE des écritures (voir
+# `update_proprietaire`) : une ligne d'un autre propriétaire n'est jamais lue.
+PROPRIETAIRES_ECRITURE = {
+    ("clients", "commercial"): "contact_commercial_id",
+    ("contrats", "commercial"): "contact_commercial_id",
+    ("evenements", "support"): "support_contact_id",
+}
+
+# Rôles autorisés à modifier toutes les lignes
+ROLES_ECRITURE_TOTALE = ("gestion",)
+
+
+def predicat_proprietaire(modele: Type, payload: dict):
+    """
+    Retourne la condition SQL des lignes de `modele` que l'utilisateur connecté
+    peut modifier, ou None s'il ne peut en modifier aucune.
+    """
+    if payload["role"] in ROLES_ECRITURE_TOTALE:
+        return true()
+    colonne = PROPRIETAIRES_ECRITURE.get((modele.__tablename__, payload["role"]))
+    if colonne is None:
+        return None
+    return get_meta(modele).attributs[colonne] == int(payload["id"])
+
+
+def update_proprietaire(
+    db: Session, modele: Type, record_id: int, data: dict, payload: dict, *conditions
+) -> dict:
+    """
+    Met à jour une ligne en une seule requête, si l'utilisateur connecté en a le droit :
+    `UPDATE ... WHERE id = :id AND <propriétaire> [AND conditions] RETURNING *`.
+
+    Paramètres :
+        db : Session SQLAlchemy ouverte.
+        modele : Classe SQLAlchemy représentant la table.
+        record_id : Clé primaire de la ligne à modifier.
+        data : Champs à modifier (les valeurs None sont ignorées).
+        payload : Payload JWT de l'utilisateur connecté.
+        conditions : Conditions SQL supplémentaires (règles métier).
 
     Retour :
-        list[dict] : Liste des enregistrements sous forme de dictionnaires.
+        dict : Données mises à jour, ou None si aucune ligne ne correspond
+        (introuvable, autre propriétaire ou condition non remplie).
     """
+    meta = get_meta(modele)
+    predicat = predicat_proprietaire(modele, payload)
+    valeurs = {k: v for k, v in data.items() if k in meta.types and v is not None}
+    if predicat is None or not valeurs:
+        return None
+    requete = (
+        update(modele)
+        .where(meta.attributs[meta.pk] == record_id, predicat, *conditions)
+        .values(**valeurs)
+        .returning(*meta.attributs.values())
+        .execution_options(synchronize_session=False)
+    )
+    ligne = db.execute(requete).first()
+    return dict(zip(meta.colonnes, ligne)) if ligne else None
+
+
+def delete_proprietaire(
+    db: Session, modele: Type, record_id: int, payload: dict
+) -> bool:
+    """
+    Supprime une ligne en une seule requête si l'utilisateur connecté en a le droit :
+    `DELETE ... WHERE id = :id AND <propriétaire>`.
+
+    Retour :
+        bool : True si la ligne a été supprimée.
+    """
+    meta = get_meta(modele)
+    predicat = predicat_proprietaire(modele, payload)
+    if predicat is None:
+        return False
+    requete = (
+        delete(modele)
+        .where(meta.attributs[meta.pk] == record_id, predicat)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(requete).rowcount > 0
+
+
+def diagnostiquer_refus(
+    db: Session, modele: Type, record_id: int, payload: dict, verifier, colonnes=()
+):
+    """
+    Explique pourquoi une écriture n'a touché aucune ligne.
+
+    Appelée seulement après un échec : relit les colonnes de contrôle de la ligne
+    (propriétaire et `colonnes`) et les passe à la règle métier `verifier`
+    (ex : `can_update_client`), qui affiche le refus.
+
+    Retour :
+        Row : La ligne si elle existe et que l'utilisateur en a le droit (c'est
+        alors une condition supplémentaire qui a échoué), None sinon.
+    """
+    meta = get_meta(modele)
+    noms = {
+        colonne
+        for (table, _), colonne in PROPRIETAIRES_ECRITURE.items()
+        if table == modele.__tablename__
+    }
+    noms.update(colonnes)
+    ligne = db.execute(
+        select(
+            meta.attributs[meta.pk], *[meta.attributs[nom] for nom in sorted(noms)]
+        ).where(meta.attributs[meta.pk] == record_id)
+    ).first()
+    if not verifier(payload, ligne):
+        return None
+    if ligne is None:
+        afficher_introuvable(modele, record_id)
+        return None
+    return ligne
+
+
+def add_evenement_proprietaire(db: Session, data: dict, payload: dict) -> dict:
+    """
+    Crée un événement en une seule requête, si le contrat est signé et appartient
+    au commercial connecté :
+    `INSERT INTO evenements (...) SELECT ..., contrats.client_id FROM contrats
+    WHERE id = :contrat AND statut_contrat AND contact_commercial_id = :me RETURNING *`.
+
+    Retour :
+        dict : Données de l'événement créé, ou None si le contrat ne le permet pas.
+    """
+    if payload["role"] != "commercial" or data.get("contrat_id") is None:
+        return None
+    meta = get_meta(Evenement)
+    valeurs = {k: v for k, v in data.items() if k in meta.types and k != "client_id"}
+    colonnes = list(valeurs) + ["client_id"]
+    source = select(
+        *[
+            literal(v, type_=meta.attributs[k].type).label(k)
+            for k, v in valeurs.items()
+        ],
+        Contrat.client_id,
+    ).where(
+        Contrat.id == data["contrat_id"],
+        Contrat.statut_contrat.is_(True),
+        Contrat.contact_commercial_id == int(payload["id"]),
+    )
+    requete = (
+        insert(Evenement)
+        .from_select(colonnes, source)
+        .returning(*meta.attributs.values())
+    )
+    ligne = db.execute(requete).first()
+    return dict(zip(meta.colonnes, ligne)) if ligne else None
+
+
+def parse_colonnes(modele: Type, columns: str = None) -> list[str]:
+    """
+    Convertit l'option --columns ("id,lieu,date_debut") en liste de colonnes du modèle.
+
+    Paramètres :
+        modele : Classe SQLAlchemy représentant la table.
+        columns : Noms de colonnes séparés par des virgules (None = toutes les colonnes).
+
+    Retour :
+        list[str] : Colonnes demandées, dans l'ordre donné.
+
+    Exceptions :
+        typer.BadParameter : Si une colonne n'existe pas dans la table.
+    """
+    disponibles = get_meta(modele).colonnes
+    if not columns:
+        return list(disponibles)
+    demandees = [c.strip() for c in columns.split(",") if c.strip()]
+    inconnues = [c for c in demandees if c not in disponibles]
+    if inconnues or not demandees:
+        raise typer.BadParameter(
+            f"Colonne(s) inconnue(s) pour {modele.__name__} : {', '.join(inconnues)}. "
+            f"Colonnes disponibles : {', '.join(disponibles)}"
+        )
+    return demandees
+
+
+# Colonnes des tables liées lues par --with-relations :
+# table -> {libellé : (relation du modèle, colonne de la table liée)}
+RELATIONS_LECTURE = {
+    "contrats": {
+        "client": ("client", "nom_complet"),
+        "commercial": ("contact_commercial", "nom"),
+    },
+    "evenements": {
+        "client": ("client", "nom_complet"),
+        "support": ("support_contact", "nom"),
+    },
+}
+
+
+def relations_lecture(modele: Type) -> list[str]:
+    """Retourne les libellés des colonnes liées disponibles avec --with-relations."""
+    return list(RELATIONS_LECTURE.get(modele.__tablename__, {}))
+
+
+def requete_page(
+    modele: Type,
+    selection: list[str],
+    dernier_id: int = None,
+    taille: int = DEFAULT_PAGE_SIZE,
+    avec_relations: bool = False,
+):
+    """
+    Construit la requête d'une page : `WHERE pk > :dernier_id ORDER BY pk LIMIT :taille`.
+
+    Avec `avec_relations`, les noms des lignes liées (client d'un contrat, support
+    d'un événement...) sont lus par des LEFT JOIN dans la même requête, après les
+    colonnes de `selection` : une requête par page, sans chargement paresseux.
+
+    Paramètres :
+        modele : Classe SQLAlchemy représentant la table.
+        selection : Colonnes à lire.
+        dernier_id : Clé primaire de la dernière ligne de la page précédente (None = début).
+        taille : Nombre de lignes de la page.
+        avec_relations : Ajoute les colonnes de `RELATIONS_LECTURE`.
+
+    Retour :
+        Select : Requête de la page.
+    """
+    meta = get_meta(modele)
+    pk = meta.attributs[meta.pk]
+    requete = select(*[meta.attributs[col] for col in selection]).order_by(pk)
+    if avec_relations:
+        relations = RELATIONS_LECTURE.get(modele.__tablename__, {})
+        for libelle, (relation, colonne) in relations.items():
+            attribut = getattr(modele, relation)
+            # Alias : deux relations peuvent viser la même table
+            cible = aliased(attribut.property.mapper.class_)
+            requete = requete.outerjoin(attribut.of_type(cible)).add_columns(
+                getattr(cible, colonne).label(libelle)
+            )
+    if dernier_id is not None:
+        requete = requete.where(pk > dernier_id)
+    return requete.limit(taille)
+
+
+def iter_pages(
+    modele: Type,
+    SessionLocal,
+    limit: int = None,
+    after_id: int = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    colonnes: list[str] = None,
+    avec_relations: bool = False,
+) -> Iterator[list[dict]]:
+    """
+    Parcourt une table SQLAlchemy page par page (pagination keyset sur la clé primaire).
+
+    Chaque page est une requête `WHERE pk > :dernier_id ORDER BY pk LIMIT :page_size`
+    lue via un curseur serveur (`yield_per`) : la mémoire utilisée ne dépend que de
+    la taille de page, et la première page arrive sans attendre la fin de la table.
+    Seules les colonnes demandées sont sélectionnées (lignes `Row`, sans instancier
+    d'objets ORM).
+
+    Paramètres :
+        modele : Classe SQLAlchemy représentant la table.
+        SessionLocal : Sessionmaker SQLAlchemy pour interagir avec la base.
+        limit : Nombre maximal de lignes à lire (None = toute la table).
+        after_id : Ne lit que les lignes dont la clé primaire est strictement supérieure.
+        page_size : Nombre de lignes par page.
+        colonnes : Colonnes à lire (None = toutes les colonnes).
+        avec_relations : Ajoute les noms des lignes liées (voir `requete_page`).
+
+    Yields :
+        list[dict] : Une page d'enregistrements sous forme de dictionnaires.
+    """
+    meta = get_meta(modele)
+    colonnes = colonnes or list(meta.colonnes)
+    # La clé primaire est toujours lue : elle sert de curseur entre deux pages
+    selection = colonnes if meta.pk in colonnes else colonnes + [meta.pk]
+    libelles = relations_lecture(modele) if avec_relations else []
+    restant = limit
+    dernier_id = after_id
 
     db = SessionLocal()
     try:
-        colonnes = [c.key for c in inspect(modele).mapper.column_attrs]
-        lignes = db.query(modele).all()
-        resultats = [{col: getattr(obj, col) for col in colonnes} for obj in lignes]
-        afficher_table(modele, resultats)
-        return resultats
+        while restant is None or restant > 0:
+            taille = page_size if restant is None else min(page_size, restant)
+            requete = requete_page(
+                modele, selection, dernier_id, taille, avec_relations
+            )
+            lignes = db.execute(requete.execution_options(yield_per=taille)).all()
+            if not lignes:
+                return
+            yield [
+                {
+                    **dict(zip(colonnes, ligne)),
+                    **dict(zip(libelles, ligne[len(selection) :])),
+                }
+                for ligne in lignes
+            ]
+            if len(lignes) < taille:
+                return
+            dernier_id = lignes[-1][selection.index(meta.pk)]
+            if restant is not None:
+                restant -= len(lignes)
     finally:
         db.close()
 
 
-def add_table(modele: Type, SessionLocal, data: dict):
+def read_table(
+    modele: Type,
+    SessionLocal,
+    limit: int = None,
+    after_id: int = None,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    colonnes: list[str] = None,
+    avec_relations: bool = False,
+    format_sortie: str = "rich",
+    pager: bool = False,
+) -> int:
     """
-    Ajoute un nouvel enregistrement dans une table SQLAlchemy.
+    Lit et affiche les enregistrements d'une table SQLAlchemy, page par page.
+
+    Les lignes sont affichées dès que chaque page est lue (voir `iter_pages`),
+    sans jamais charger la table entière en mémoire.
+
+    Avec `pager` (format Rich dans un terminal), les lignes sont parcourues
+    dans un pager : les pages suivantes ne sont lues qu'au défilement
+    (voir `pager_utils.Pager`).
 
     Paramètres :
         modele : Classe SQLAlchemy représentant la table.
         SessionLocal : Sessionmaker SQLAlchemy pour interagir avec la base.
-        data : Dictionnaire contenant les champs et leurs valeurs.
+        limit : Nombre maximal de lignes à afficher (None = toute la table).
+        after_id : Reprend la lecture après cet identifiant.
+        page_size : Nombre de lignes lues et affichées par page.
+        colonnes : Colonnes à afficher (None = toutes les colonnes).
+        avec_relations : Affiche aussi les noms des lignes liées (client, support...).
+        format_sortie : "rich", "plain", "tsv", "json" ou "jsonl" (voir `rendu_utils`).
+        pager : Parcours interactif (ignoré hors Rich ou hors terminal).
 
     Retour :
-        dict : Données de l'enregistrement ajouté sous forme de dictionnaire.
+        int : Nombre total d'enregistrements affichés (lus en base avec `pager`).
+    """
+    pages = iter_pages(
+        modele, SessionLocal, limit, after_id, page_size, colonnes, avec_relations
+    )
+    if pager and format_sortie == "rich" and console.is_terminal:
+        # Import local : le pager n'est chargé que s'il est demandé
+        from app.utils.pager_utils import Pager
+
+        return Pager(modele, pages, console).executer()
+
+    pk = get_meta(modele).pk
+    rendu = creer_rendu(modele, format_sortie)
+    dernier_id = None
+    for numero, page in enumerate(pages, start=1):
+        rendu.page(page, titre=f"{modele.__name__} (page {numero})")
+        dernier_id = page[-1].get(pk)
+    rendu.terminer()
+
+    total = rendu.total
+    if limit is not None and total >= limit and dernier_id is not None:
+        console.print(
+            f"[dim]{total} ligne(s) affichée(s). "
+            f"Pour continuer : --after-id {dernier_id}[/]"
+        )
+    return total
+
+
+@contextmanager
+def unite_de_travail(SessionLocal) -> Iterator[Session]:
     """
+    Ouvre une unité de travail : une session et une transaction pour toute une commande.
+
+    La vérification des droits, la validation et l'écriture d'une commande se font
+    dans la même transaction : commit à la sortie du bloc, rollback si une exception
+    est levée.
+
+    Exemple d'utilisation :
+        with unite_de_travail(SessionLocal) as db:
+            client = get_for_update(db, Client, client_id)
+            update_row(db, Client, client, {"telephone": "0601020304"})
+
+    Paramètres :
+        SessionLocal : Sessionmaker SQLAlchemy pour interagir avec la base.
 
+    Yields :
+        Session : Session SQLAlchemy de l'unité de travail.
+    """
     db = SessionLocal()
     try:
-        colonnes = [c.key for c in inspect(modele).mapper.column_attrs]
-        valeurs_valides = {k: v for k, v in data.items() if k in colonnes}
-        instance = modele(**valeurs_valides)
-        db.add(instance)
+        yield db
         db.commit()
-        db.refresh(instance)
-        console.print(
-            Panel.fit(
-                f"[bold green]{modele.__name__} ajouté avec succès ![/]",
-                border_style="green",
-            )
-        )
-        return {col: getattr(instance, col) for col in colonnes}
+    except BaseException:
+        db.rollback()
+        raise
     finally:
         db.close()
 
 
+def copy_disponible(db: Session) -> bool:
+    """Indique si la base courante accepte `COPY` (PostgreSQL via psycopg2)."""
+    dialecte = db.get_bind().dialect
+    return dialecte.name == "postgresql" and dialecte.driver == "psycopg2"
+
+
+def get_for_update(db: Session, modele: Type, record_id: int, id_field: str = "id"):
+    """
+    Charge un enregistrement en le verrouillant jusqu'à la fin de la transaction.
+
+    Une seule requête `SELECT ... FOR UPDATE` : la ligne lue pour vérifier les droits
+    est celle qui sera modifiée, sans qu'une autre transaction puisse la changer entre-temps.
+
+    Retour :
+        Instance du modèle, ou None si l'enregistrement n'existe pas.
+    """
+    requete = (
+        select(modele).where(getattr(modele, id_field) == record_id).with_for_update()
+    )
+    return db.execute(requete).scalar_one_or_none()
+
+
+def add_row(db: Session, modele: Type, data: dict) -> dict:
+    """
+    Ajoute un enregistrement dans la session courante (sans commit).
+
+    L'insertion est un seul `INSERT ... RETURNING <toutes les colonnes>` :
+    l'identifiant et les valeurs générées par la base sont relus dans la même
+    requête, sans `refresh()` ni SELECT supplémentaire.
+
+    Retour :
+        dict : Données de l'enregistrement ajouté (identifiant compris).
+    """
+    return add_rows(db, modele, [data])[0]
+
+
+def add_rows(
+    db: Session, modele: Type, lignes: list[dict], ordonne: bool = True
+) -> list[dict]:
+    """
+    Ajoute plusieurs enregistrements dans la session courante (sans commit).
+
+    Les lignes sont envoyées en `INSERT ... VALUES (...), (...) RETURNING ...`
+    groupés (insertmanyvalues, voir DB_INSERTMANYVALUES_PAGE_SIZE) : un aller-retour
+    par lot au lieu d'un par ligne. Toutes les lignes doivent avoir les mêmes clés.
+
+    Paramètres :
+        db : Session SQLAlchemy ouverte.
+        modele : Classe SQLAlchemy représentant la table.
+        lignes : Liste de dictionnaires champ -> valeur.
+        ordonne : Si True, les lignes renvoyées suivent l'ordre de `lignes`
+            (PostgreSQL garde des lots ; SQLite repasse à un INSERT par ligne).
+
+    Retour :
+        list[dict] : Données des enregistrements ajoutés.
+    """
+    if not lignes:
+        return []
+    meta = get_meta(modele)
+    valeurs = [{k: v for k, v in data.items() if k in meta.types} for data in lignes]
+    requete = insert(modele).returning(
+        *meta.attributs.values(),
+        sort_by_parameter_order=ordonne and len(valeurs) > 1,
+    )
+    if len(valeurs) == 1:
+        resultat = db.execute(requete.values(**valeurs[0]))
+    else:
+        resultat = db.execute(requete, valeurs)
+    return [dict(zip(meta.colonnes, ligne)) for ligne in resultat]
+
+
+def update_row(db: Session, modele: Type, instance, data: dict) -> dict:
+    """
+    Applique les valeurs non nulles de `data` à une instance chargée (sans commit).
+
+    Retour :
+        dict : Données mises à jour de l'enregistrement.
+    """
+    meta = get_meta(modele)
+    for k, v in data.items():
+        if k in meta.types and v is not None:
+            setattr(instance, k, v)
+    db.flush()
+    return meta.to_dict(instance)
+
+
+def afficher_introuvable(modele: Type, record_id: int):
+    """Affiche qu'un enregistrement n'existe pas."""
+    console.print(
+        Panel.fit(
+            f"[red]{modele.__name__} {record_id} non trouvé.[/]",
+            border_style="red",
+        )
+    )
+
+
+def afficher_ajout(modele: Type):
+    """Affiche le succès d'un ajout (après commit)."""
+    console.print(
+        Panel.fit(
+            f"[bold green]{modele.__name__} ajouté avec succès ![/]",
+            border_style="green",
+        )
+    )
+
+
+def afficher_modification(modele: Type, record_id: int, data: dict = None):
+    """Affiche le succès d'une modification (après commit) et la journalise si besoin."""
+    console.print(
+        Panel.fit(
+            f"[bold green]{modele.__name__} {record_id} mis à jour avec succès ![/]",
+            border_style="green",
+        )
+    )
+    # Événement métier si collaborateur
+    if modele.__name__ == "Collaborateur":
+        evenement_metier(f"Collaborateur {record_id} modifié : {data}")
+
+
+def add_table(modele: Type, SessionLocal, data: dict):
+    """
+    Ajoute un nouvel enregistrement dans une table SQLAlchemy.
+
+    Paramètres :
+        modele : Classe SQLAlchemy représentant la table.
+        SessionLocal : Sessionmaker SQLAlchemy pour interagir avec la base.
+        data : Dictionnaire contenant les champs et leurs valeurs.
+
+    Retour :
+        dict : Données de l'enregistrement ajouté sous forme de dictionnaire.
+    """
+    with unite_de_travail(SessionLocal) as db:
+        resultat = add_row(db, modele, data)
+    afficher_ajout(modele)
+    return resultat
+
+
 def update_table(
     modele: Type, SessionLocal, record_id: int, data: dict, id_field: str = "id"
 ):
@@ -263,40 +900,23 @@ def update_table(
     Retour :
         dict : Données mises à jour de l'enregistrement sous forme de dictionnaire.
     """
-
-    db = SessionLocal()
-    try:
-        colonnes = [c.key for c in inspect(modele).mapper.column_attrs]
-        instance = (
-            db.query(modele).filter(getattr(modele, id_field) == record_id).first()
-        )
+    with unite_de_travail(SessionLocal) as db:
+        instance = get_for_update(db, modele, record_id, id_field)
         if not instance:
-            console.print(
-                Panel.fit(
-                    f"[red]{modele.__name__} {record_id} non trouvé.[/]",
-                    border_style="red",
-                )
-            )
+            afficher_introuvable(modele, record_id)
             return
-        for k, v in data.items():
-            if k in colonnes and v is not None:
-                setattr(instance, k, v)
-        db.commit()
-        console.print(
-            Panel.fit(
-                f"[bold green]{modele.__name__} {record_id} mis à jour avec succès ![/]",
-                border_style="green",
-            )
-        )
-        # Log Sentry si collaborateur
-        if modele.__name__ == "Collaborateur":
-            sentry_sdk.capture_message(f"Collaborateur {record_id} modifié : {data}")
-        return {col: getattr(instance, col) for col in colonnes}
-    finally:
-        db.close()
+        resultat = update_row(db, modele, instance, data)
+    afficher_modification(modele, record_id, data)
+    return resultat
 
 
-def delete_table(modele: Type, SessionLocal, record_id: int, id_field: str = "id"):
+def delete_table(
+    modele: Type,
+    SessionLocal,
+    record_id: int,
+    id_field: str = "id",
+    payload: dict = None,
+):
     """
     Supprime un enregistrement existant dans une table SQLAlchemy.
 
@@ -305,32 +925,37 @@ def delete_table(modele: Type, SessionLocal, record_id: int, id_field: str = "id
         SessionLocal : Sessionmaker SQLAlchemy pour interagir avec la base.
         record_id : ID de l'enregistrement à supprimer.
         id_field : Nom de la colonne ID utilisée pour identifier l'enregistrement (par défaut "id").
+        payload : Payload JWT de l'utilisateur connecté. S'il est fourni, la
+            suppression est une seule requête limitée aux lignes qu'il peut
+            modifier (voir `delete_proprietaire`).
     """
-    db = SessionLocal()
-    try:
-        instance = (
-            db.query(modele)
-            .filter(getattr(modele, id_field) == record_id)
-            .one_or_none()
-        )
-        if not instance:
-            console.print(
-                Panel.fit(
-                    f"[red]{modele.__name__} {record_id} non trouvé.[/]",
-                    border_style="red",
-                )
-            )
-            return
-        db.delete(instance)
-        db.commit()
-        console.print(
-            Panel.fit(
-                f"[bold red]{modele.__name__} {record_id} supprimé avec succès ![/]",
-                border_style="red",
-            )
+    with unite_de_travail(SessionLocal) as db:
+        if payload is not None:
+            if not delete_proprietaire(db, modele, record_id, payload):
+                pk = get_meta(modele).attributs[get_meta(modele).pk]
+                if db.execute(select(pk).where(pk == record_id)).first() is None:
+                    afficher_introuvable(modele, record_id)
+                else:
+                    console.print(
+                        Panel.fit(
+                            f"[bold red]Vous ne pouvez pas supprimer "
+                            f"{modele.__name__} {record_id}.[/]",
+                            border_style="red",
+                        )
+                    )
+                return
+        else:
+            instance = get_for_update(db, modele, record_id, id_field)
+            if not instance:
+                afficher_introuvable(modele, record_id)
+                return
+            db.delete(instance)
+    console.print(
+        Panel.fit(
+            f"[bold red]{modele.__name__} {record_id} supprimé avec succès ![/]",
+            border_style="red",
         )
-    finally:
-        db.close()
+    )
 
 
 # ==================== UTILITAIRES METIER ====================
@@ -463,7 +1088,9 @@ def can_update_evenement(payload: dict, evenement) -> bool:
         return False
 
     # Vérifie que le support connecté est bien responsable de cet événement
-    if int(evenement.support_contact_id) != int(payload["id"]):
+    if evenement.support_contact_id is None or int(evenement.support_contact_id) != int(
+        payload["id"]
+    ):
         console.print(
             "[bold red]Vous ne pouvez modifier que les événements qui vous sont attribués.[/]"
         )
@@ -0,0 +1,217 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Type
+
+import typer
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.collaborateur import Collaborateur, Role
+from app.models.contrat import Contrat
+from app.models.evenement import Evenement
+from app.utils.db_utils import copy_disponible, filtrer_par_role, get_meta
+
+# Nombre de lignes lues à la fois sur le curseur serveur
+EXPORT_BATCH_SIZE = 5000
+
+# Tables exportables : nom -> (modèle, ressource de permission)
+EXPORTS = {
+    "clients": (Client, "client"),
+    "contrats": (Contrat, "contrat"),
+    "evenements": (Evenement, "evenement"),
+    "collaborateurs": (Collaborateur, "collaborateur"),
+    "roles": (Role, "role"),
+}
+
+# Colonnes jamais exportées par défaut (à demander explicitement avec --columns)
+COLONNES_SENSIBLES = {"mot_de_passe"}
+
+FORMATS = ("csv", "jsonl")
+COMPRESSIONS = ("aucune", "gzip", "zstd")
+
+
+def colonnes_export(modele: Type, colonnes: list[str] = None) -> list[str]:
+    """
+    Retourne les colonnes à exporter : celles demandées, sinon toutes les colonnes
+    du modèle hors colonnes sensibles (mot de passe haché).
+    """
+    if colonnes:
+        return colonnes
+    return [c for c in get_meta(modele).colonnes if c not in COLONNES_SENSIBLES]
+
+
+def compression_par_defaut(sortie: Path = None) -> str:
+    """Déduit la compression de l'extension du fichier de sortie (.gz, .zst)."""
+    if sortie is None:
+        return "aucune"
+    suffixe = sortie.suffix.lower()
+    if suffixe == ".gz":
+        return "gzip"
+    if suffixe in (".zst", ".zstd"):
+        return "zstd"
+    return "aucune"
+
+
+@contextmanager
+def ouvrir_sortie(sortie: Path = None, compression: str = "aucune"):
+    """
+    Ouvre le flux binaire de sortie (fichier ou sortie standard), compressé à la volée.
+
+    Paramètres :
+        sortie : Fichier de sortie (None ou "-" = sortie standard).
+        compression : "aucune", "gzip" ou "zstd" (module optionnel `zstandard`).
+
+    Exceptions :
+        typer.BadParameter : Si zstd est demandé sans le module `zstandard`.
+    """
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise typer.BadParameter(
+                "La compression zstd nécessite le module 'zstandard' "
+                "(pip install zstandard)"
+            )
+
+    vers_stdout = sortie is None or str(sortie) == "-"
+    brut = sys.stdout.buffer if vers_stdout else open(sortie, "wb")
+    try:
+        if compression == "gzip":
+            flux = gzip.GzipFile(fileobj=brut, mode="wb")
+        elif compression == "zstd":
+            flux = zstandard.ZstdCompressor().stream_writer(brut, closefd=False)
+        else:
+            flux = None
+        try:
+            yield flux or brut
+        finally:
+            if flux is not None:
+                flux.close()  # Écrit la fin du flux compressé
+    finally:
+        if vers_stdout:
+            brut.flush()
+        else:
+            brut.close()
+
+
+def iter_lignes(
+    db: Session,
+    modele: Type,
+    colonnes: list[str],
+    payload: dict,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[tuple]:
+    """
+    Lit la table en flux, filtrée selon le rôle de l'utilisateur connecté.
+
+    `yield_per` ouvre un curseur côté serveur (PostgreSQL) : seules `batch_size`
+    lignes sont en mémoire à la fois, quelle que soit la taille de la table.
+    """
+    meta = get_meta(modele)
+    query = select(*[meta.attributs[c] for c in colonnes]).order_by(
+        meta.attributs[meta.pk]
+    )
+    query = filtrer_par_role(modele, query, payload)
+    yield from db.execute(query.execution_options(yield_per=batch_size))
+
+
+def ecrire_csv(flux, colonnes: list[str], lignes) -> int:
+    """Écrit les lignes en CSV (avec en-tête) dans un flux binaire ; retourne leur nombre."""
+    texte = io.TextIOWrapper(flux, encoding="utf-8", newline="", write_through=True)
+    writer = csv.writer(texte)
+    writer.writerow(colonnes)
+    total = 0
+    for ligne in lignes:
+        writer.writerow(ligne)
+        total += 1
+    texte.flush()
+    texte.detach()  # Le flux binaire reste ouvert (fermé par ouvrir_sortie)
+    return total
+
+
+def ecrire_jsonl(flux, colonnes: list[str], lignes) -> int:
+    """Écrit une ligne JSON par enregistrement dans un flux binaire ; retourne leur nombre."""
+    total = 0
+    for ligne in lignes:
+        flux.write(
+            json.dumps(
+                dict(zip(colonnes, ligne)), ensure_ascii=False, default=str
+            ).encode("utf-8")
+            + b"\n"
+        )
+        total += 1
+    return total
+
+
+def copy_csv(db: Session, modele: Type, colonnes: list[str], payload: dict, flux):
+    """
+    Exporte en CSV avec `COPY (SELECT ...) TO STDOUT` : PostgreSQL produit lui-même
+    le CSV, sans passer par les objets Python.
+    """
+    meta = get_meta(modele)
+    query = filtrer_par_role(
+        modele, select(*[meta.attributs[c] for c in colonnes]), payload
+    ).order_by(meta.attributs[meta.pk])
+    # Les seuls paramètres sont des identifiants entiers issus du JWT vérifié
+    sql = str(
+        query.compile(
+            dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}
+        )
+    )
+    curseur = db.connection().connection.cursor()
+    try:
+        curseur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER)", flux)
+        return curseur.rowcount
+    finally:
+        curseur.close()
+
+
+def exporter_table(
+    table: str,
+    SessionLocal,
+    payload: dict,
+    sortie: Path = None,
+    format_export: str = "csv",
+    compression: str = None,
+    colonnes: list[str] = None,
+    copy: bool = False,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> int:
+    """
+    Exporte une table en CSV ou JSONL, en flux et à mémoire constante.
+
+    Paramètres :
+        table : Nom de la table (clé de `EXPORTS`).
+        SessionLocal : Fabrique de sessions SQLAlchemy.
+        payload : Payload JWT de l'utilisateur connecté (filtrage par rôle).
+        sortie : Fichier de sortie (None = sortie standard).
+        format_export : "csv" ou "jsonl".
+        compression : "aucune", "gzip" ou "zstd" (déduite de l'extension si None).
+        colonnes : Colonnes à exporter (None = toutes hors colonnes sensibles).
+        copy : Utilise `COPY ... TO STDOUT` (PostgreSQL, format CSV uniquement).
+        batch_size : Lignes lues à la fois sur le curseur serveur.
+
+    Retour :
+        int : Nombre de lignes exportées.
+    """
+    modele, _ = EXPORTS[table]
+    colonnes = colonnes_export(modele, colonnes)
+    compression = compression or compression_par_defaut(sortie)
+
+    db = SessionLocal()
+    try:
+        with ouvrir_sortie(sortie, compression) as flux:
+            if copy and format_export == "csv" and copy_disponible(db):
+                return copy_csv(db, modele, colonnes, payload, flux)
+            lignes = iter_lignes(db, modele, colonnes, payload, batch_size)
+            if format_export == "jsonl":
+                return ecrire_jsonl(flux, colonnes, lignes)
+            return ecrire_csv(flux, colonnes, lignes)
+    finally:
+        db.close()
@@ -0,0 +1,562 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from pathlib import Path
+from typing import Iterator, Type
+
+import typer
+from rich.console import Console
+from sqlalchemy import select
+from sqlalchemy.exc import DataError, DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.auth.mots_de_passe import hacher_mots_de_passe, pool_hachage
+from app.models.client import Client
+from app.models.collaborateur import Collaborateur, Role
+from app.models.contrat import Contrat
+from app.models.evenement import Evenement
+from app.utils.db_utils import (
+    add_rows,
+    copy_disponible,
+    unite_de_travail,
+    validate_email,
+    validate_montant_restant,
+    validate_participants,
+    validate_positive_float,
+    validate_single_date,
+)
+from app.utils.export_utils import COLONNES_SENSIBLES
+
+# Initialise la console Rich pour l'affichage coloré
+console = Console()
+
+# Nombre de lignes écrites (et validées par un commit) par lot
+IMPORT_BATCH_SIZE = 1000
+
+# Extensions de fichiers acceptées par l'import
+FORMATS_CSV = (".csv",)
+FORMATS_JSONL = (".jsonl", ".ndjson")
+
+
+# ==================== LECTURE DU FICHIER ====================
+
+
+def lire_lignes(chemin: Path, skip: int = 0) -> Iterator[tuple[int, dict]]:
+    """
+    Lit un fichier CSV (avec en-tête) ou JSONL ligne par ligne, sans le charger en mémoire.
+
+    Paramètres :
+        chemin : Fichier à lire (.csv, .jsonl ou .ndjson).
+        skip : Nombre d'enregistrements à ignorer en début de fichier (reprise).
+
+    Retour :
+        Iterator[tuple[int, dict]] : Numéro de l'enregistrement (à partir de 1) et données.
+
+    Exceptions :
+        typer.BadParameter : Si l'extension du fichier n'est pas reconnue.
+    """
+    suffixe = chemin.suffix.lower()
+    if suffixe not in FORMATS_CSV + FORMATS_JSONL:
+        raise typer.BadParameter(
+            f"Format non reconnu '{suffixe}' (attendu : .csv, .jsonl ou .ndjson)"
+        )
+
+    with chemin.open(encoding="utf-8", newline="") as fichier:
+        if suffixe in FORMATS_CSV:
+            enregistrements = csv.DictReader(fichier)
+        else:
+            enregistrements = (
+                ligne for ligne in (brute.strip() for brute in fichier) if ligne
+            )
+        for numero, enregistrement in enumerate(enregistrements, start=1):
+            if numero <= skip:
+                continue
+            if suffixe in FORMATS_JSONL:
+                try:
+                    enregistrement = json.loads(enregistrement)
+                except json.JSONDecodeError as e:
+                    # Ligne illisible : transmise telle quelle, rejetée à la préparation
+                    enregistrement = {"__erreur__": f"JSON invalide : {e.msg}"}
+                else:
+                    if not isinstance(enregistrement, dict):
+                        # Tableau, nombre, chaîne... : une ligne doit être un objet
+                        enregistrement = {
+                            "__erreur__": "Objet JSON attendu",
+                            "valeur": enregistrement,
+                        }
+            yield numero, enregistrement
+
+
+# ==================== CONVERSION DES CHAMPS ====================
+
+
+def _texte(ligne: dict, champ: str, obligatoire: bool = True):
+    """Retourne le champ texte (sans espaces superflus), None s'il est vide."""
+    valeur = ligne.get(champ)
+    if valeur is not None:
+        valeur = str(valeur).strip() or None
+    if valeur is None and obligatoire:
+        raise typer.BadParameter(f"{champ} est obligatoire")
+    return valeur
+
+
+def _entier(ligne: dict, champ: str, obligatoire: bool = True):
+    """Retourne le champ converti en entier, None s'il est vide et facultatif."""
+    valeur = _texte(ligne, champ, obligatoire)
+    if valeur is None:
+        return None
+    try:
+        return int(valeur)
+    except ValueError:
+        raise typer.BadParameter(f"{champ} doit être un entier")
+
+
+def _reel(ligne: dict, champ: str) -> float:
+    """Retourne le champ (obligatoire) converti en nombre réel."""
+    try:
+        return float(_texte(ligne, champ))
+    except ValueError:
+        raise typer.BadParameter(f"{champ} doit être un nombre")
+
+
+def _booleen(ligne: dict, champ: str) -> bool:
+    """Retourne le champ converti en booléen (vide = False)."""
+    valeur = _texte(ligne, champ, obligatoire=False)
+    if valeur is None:
+        return False
+    valeur = valeur.lower()
+    if valeur in ("1", "true", "vrai", "oui", "yes"):
+        return True
+    if valeur in ("0", "false", "faux", "non", "no"):
+        return False
+    raise typer.BadParameter(f"{champ} doit être un booléen (true/false)")
+
+
+# ==================== PRÉPARATION DES LIGNES ====================
+# Mêmes règles que les commandes add-client, add-collaborateur, add-contrat et add-evenement
+
+
+def preparer_client(ligne: dict, payload: dict) -> dict:
+    """
+    Valide une ligne de client et retourne les valeurs à insérer.
+
+    Un commercial devient automatiquement le contact commercial de ses clients ;
+    le contact indiqué par un autre rôle est vérifié par `resoudre_clients`.
+    """
+    maintenant = datetime.now()
+    return {
+        "nom_complet": _texte(ligne, "nom_complet"),
+        "email": validate_email(_texte(ligne, "email")),
+        "telephone": _texte(ligne, "telephone"),
+        "entreprise": _texte(ligne, "entreprise"),
+        "contact_commercial_id": (
+            int(payload["id"])
+            if payload["role"] == "commercial"
+            else _entier(ligne, "contact_commercial_id", obligatoire=False)
+        ),
+        "date_creation": maintenant,
+        "derniere_mise_a_jour": maintenant,
+    }
+
+
+def preparer_collaborateur(ligne: dict, payload: dict) -> dict:
+    """
+    Valide une ligne de collaborateur et retourne les valeurs à insérer.
+
+    Le mot de passe reste en clair ici : il est haché pour tout le lot par
+    `resoudre_collaborateurs`.
+    """
+    return {
+        "nom": _texte(ligne, "nom"),
+        "email": validate_email(_texte(ligne, "email")),
+        "mot_de_passe": _texte(ligne, "mot_de_passe"),
+        "role_id": _entier(ligne, "role_id"),
+    }
+
+
+def preparer_contrat(ligne: dict, payload: dict) -> dict:
+    """
+    Valide une ligne de contrat et retourne les valeurs à insérer.
+
+    Le contact commercial est celui du client (résolu par `resoudre_contrats`).
+    """
+    montant_total = validate_positive_float(_reel(ligne, "montant_total"))
+    return {
+        "montant_total": montant_total,
+        "montant_restant": validate_montant_restant(
+            montant_total, _reel(ligne, "montant_restant")
+        ),
+        "statut_contrat": _booleen(ligne, "statut_contrat"),
+        "client_id": _entier(ligne, "client_id"),
+        "date_creation": date.today(),
+        "contact_commercial_id": None,
+    }
+
+
+def preparer_evenement(ligne: dict, payload: dict) -> dict:
+    """
+    Valide une ligne d'événement et retourne les valeurs à insérer.
+
+    Le client est celui du contrat (résolu par `resoudre_evenements`).
+    """
+    date_debut = validate_single_date(_texte(ligne, "date_debut"))
+    date_fin = validate_single_date(_texte(ligne, "date_fin"))
+    if date_fin < date_debut:
+        raise typer.BadParameter("date_fin doit être supérieure à date_debut")
+    participants, attendues = validate_participants(
+        _entier(ligne, "participants"), _entier(ligne, "attendues")
+    )
+    return {
+        "date_debut": date_debut,
+        "date_fin": date_fin,
+        "lieu": _texte(ligne, "lieu"),
+        "participants": participants,
+        "attendues": attendues,
+        "notes": _texte(ligne, "notes", obligatoire=False),
+        "contrat_id": _entier(ligne, "contrat_id"),
+        "client_id": None,
+        "support_contact_id": None,
+    }
+
+
+# ==================== RÉSOLUTION DES CLÉS ÉTRANGÈRES ====================
+# Une seule requête par lot pour toutes les lignes du lot
+
+
+def resoudre_clients(db: Session, lot: list, payload: dict) -> list:
+    """
+    Vérifie que le contact commercial indiqué pour chaque client est un
+    collaborateur de rôle commercial (comme `update-client`).
+
+    Retour :
+        list : Rejets (numéro, données, erreur) des clients dont le contact est
+        introuvable ou n'est pas commercial.
+        Les lignes rejetées sont retirées de `lot`.
+    """
+    ids = {valeurs["contact_commercial_id"] for _, _, valeurs in lot} - {None}
+    if not ids:
+        return []
+    roles = dict(
+        db.execute(
+            select(Collaborateur.id, Role.role)
+            .outerjoin(Collaborateur.role)
+            .where(Collaborateur.id.in_(ids))
+        ).all()
+    )
+    rejets, gardes = [], []
+    for numero, ligne, valeurs in lot:
+        collab_id = valeurs["contact_commercial_id"]
+        if collab_id is not None and collab_id not in roles:
+            rejets.append((numero, ligne, f"Collaborateur {collab_id} non trouvé"))
+        elif collab_id is not None and roles[collab_id] != "commercial":
+            rejets.append(
+                (
+                    numero,
+                    ligne,
+                    f"Le collaborateur {collab_id} n'a pas le rôle commercial",
+                )
+            )
+        else:
+            gardes.append((numero, ligne, valeurs))
+    lot[:] = gardes
+    return rejets
+
+
+def resoudre_contrats(db: Session, lot: list, payload: dict) -> list:
+    """
+    Renseigne le contact commercial de chaque contrat à partir de son client.
+
+    Retour :
+        list : Rejets (numéro, données, erreur) des contrats dont le client est
+        introuvable ou sans contact commercial.
+        Les lignes rejetées sont retirées de `lot`.
+    """
+    ids = {valeurs["client_id"] for _, _, valeurs in lot}
+    contacts = dict(
+        db.execute(
+            select(Client.id, Client.contact_commercial_id).where(Client.id.in_(ids))
+        ).all()
+    )
+    rejets, gardes = [], []
+    for numero, ligne, valeurs in lot:
+        client_id = valeurs["client_id"]
+        if client_id not in contacts:
+            rejets.append((numero, ligne, f"Client {client_id} introuvable"))
+        elif contacts[client_id] is None:
+            rejets.append(
+                (numero, ligne, f"Client {client_id} sans contact commercial")
+            )
+        else:
+            valeurs["contact_commercial_id"] = contacts[client_id]
+            gardes.append((numero, ligne, valeurs))
+    lot[:] = gardes
+    return rejets
+
+
+def resoudre_evenements(db: Session, lot: list, payload: dict) -> list:
+    """
+    Vérifie le contrat de chaque événement (existant, signé, géré par le commercial
+    connecté, comme `can_create_evenement`) et renseigne le client.
+
+    Retour :
+        list : Rejets (numéro, données, erreur) des événements refusés.
+        Les lignes rejetées sont retirées de `lot`.
+    """
+    ids = {valeurs["contrat_id"] for _, _, valeurs in lot}
+    contrats = {
+        contrat.id: contrat
+        for contrat in db.execute(
+            select(
+                Contrat.id,
+                Contrat.client_id,
+                Contrat.statut_contrat,
+                Contrat.contact_commercial_id,
+            ).where(Contrat.id.in_(ids))
+        )
+    }
+    rejets, gardes = [], []
+    for numero, ligne, valeurs in lot:
+        contrat = contrats.get(valeurs["contrat_id"])
+        if contrat is None:
+            erreur = f"Contrat {valeurs['contrat_id']} introuvable"
+        elif not contrat.statut_contrat:
+            erreur = f"Contrat {contrat.id} non signé"
+        elif contrat.contact_commercial_id is None:
+            erreur = f"Contrat {contrat.id} sans contact commercial"
+        elif int(contrat.contact_commercial_id) != int(payload["id"]):
+            erreur = f"Contrat {contrat.id} géré par un autre commercial"
+        else:
+            valeurs["client_id"] = contrat.client_id
+            gardes.append((numero, ligne, valeurs))
+            continue
+        rejets.append((numero, ligne, erreur))
+    lot[:] = gardes
+    return rejets
+
+
+def resoudre_collaborateurs(db: Session, lot: list, payload: dict) -> list:
+    """
+    Hache les mots de passe du lot en parallèle (`hacher_mots_de_passe`) puis
+    vérifie que les rôles existent.
+
+    Le hachage a lieu avant la première requête : la transaction du lot ne
+    s'ouvre qu'ensuite et reste courte.
+
+    Retour :
+        list : Rejets (numéro, données, erreur) des collaborateurs dont le rôle est introuvable.
+        Les lignes rejetées sont retirées de `lot`.
+    """
+    hashs = hacher_mots_de_passe([valeurs["mot_de_passe"] for _, _, valeurs in lot])
+    for (_, _, valeurs), hache in zip(lot, hashs):
+        valeurs["mot_de_passe"] = hache
+
+    ids = {valeurs["role_id"] for _, _, valeurs in lot}
+    roles = set(db.scalars(select(Role.id).where(Role.id.in_(ids))))
+    rejets, gardes = [], []
+    for numero, ligne, valeurs in lot:
+        if valeurs["role_id"] not in roles:
+            rejets.append((numero, ligne, f"Role {valeurs['role_id']} introuvable"))
+            continue
+        gardes.append((numero, ligne, valeurs))
+    lot[:] = gardes
+    return rejets
+
+
+# Tables importables : nom -> (modèle, ressource de permission, préparation, résolution)
+IMPORTS = {
+    "clients": (Client, "client", preparer_client, resoudre_clients),
+    "collaborateurs": (
+        Collaborateur,
+        "collaborateur",
+        preparer_collaborateur,
+        resoudre_collaborateurs,
+    ),
+    "contrats": (Contrat, "contrat", preparer_contrat, resoudre_contrats),
+    "evenements": (Evenement, "evenement", preparer_evenement, resoudre_evenements),
+}
+
+
+# ==================== ÉCRITURE ====================
+
+
+def copy_rows(db: Session, modele: Type, lignes: list[dict]):
+    """
+    Écrit les lignes avec `COPY ... FROM STDIN` (PostgreSQL + psycopg2 uniquement).
+
+    Les valeurs passent par un tampon CSV en mémoire : une seule commande par lot.
+
+    Exceptions :
+        IntegrityError, DataError... : Erreur du driver sur le curseur brut,
+            convertie en exception SQLAlchemy comme pour les INSERT.
+    """
+    # Import local : psycopg2 n'est chargé que pour COPY
+    import psycopg2
+
+    colonnes = list(lignes[0])
+    tampon = io.StringIO()
+    writer = csv.writer(tampon)
+    for valeurs in lignes:
+        writer.writerow(["\\N" if valeurs[c] is None else valeurs[c] for c in colonnes])
+    tampon.seek(0)
+
+    instruction = (
+        f"COPY {modele.__tablename__} ({', '.join(colonnes)}) "
+        "FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    curseur = db.connection().connection.cursor()
+    try:
+        curseur.copy_expert(instruction, tampon)
+    except psycopg2.Error as e:
+        raise DBAPIError.instance(instruction, None, e, psycopg2.Error) from e
+    finally:
+        curseur.close()
+
+
+def _ecrire(db: Session, modele: Type, lignes: list[dict], copy: bool):
+    """Écrit un lot avec COPY ou avec des INSERT groupés."""
+    if copy:
+        copy_rows(db, modele, lignes)
+    else:
+        add_rows(db, modele, lignes, ordonne=False)
+
+
+def ecrire_lot(
+    SessionLocal, table: str, lot: list, payload: dict, copy: bool = False
+) -> tuple[int, list]:
+    """
+    Résout, écrit et valide (commit) un lot de lignes déjà préparées.
+
+    Si le lot est refusé par la base (contrainte, type, ou toute erreur de COPY),
+    il est rejoué ligne par ligne avec des INSERT pour n'écarter que les lignes
+    fautives.
+
+    Paramètres :
+        SessionLocal : Fabrique de sessions SQLAlchemy.
+        table : Nom de la table importée (clé de `IMPORTS`).
+        lot : Liste de tuples (numéro, données lues, valeurs préparées).
+        payload : Payload JWT de l'utilisateur connecté.
+        copy : Utilise `COPY` au lieu des INSERT groupés.
+
+    Retour :
+        tuple[int, list] : Nombre de lignes écrites et rejets (numéro, données, erreur).
+    """
+    modele, _, _, resoudre = IMPORTS[table]
+    rejets = []
+    try:
+        with unite_de_travail(SessionLocal) as db:
+            if resoudre:
+                rejets = resoudre(db, lot, payload)
+            if lot:
+                _ecrire(db, modele, [valeurs for _, _, valeurs in lot], copy)
+        return len(lot), rejets
+    except (IntegrityError, DataError):
+        pass
+    except DBAPIError:
+        if not copy:
+            raise
+
+    # Lot refusé : une transaction par ligne pour isoler les lignes fautives
+    ecrites = 0
+    for numero, ligne, valeurs in lot:
+        try:
+            with unite_de_travail(SessionLocal) as db:
+                _ecrire(db, modele, [valeurs], copy=False)
+            ecrites += 1
+        except (IntegrityError, DataError) as e:
+            rejets.append((numero, ligne, str(e.orig).strip().splitlines()[0]))
+    return ecrites, rejets
+
+
+def importer_fichier(
+    table: str,
+    chemin: Path,
+    SessionLocal,
+    payload: dict,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    skip: int = 0,
+    chemin_rejets: Path = None,
+    copy: bool = False,
+) -> dict:
+    """
+    Importe un fichier CSV ou JSONL dans une table, par lots validés un à un.
+
+    Chaque ligne est validée avec les mêmes règles que la commande add-* de la
+    table ; les lignes invalides sont écrites dans le fichier de rejets (JSONL)
+    avec leur numéro et l'erreur. Chaque lot est validé par un commit : après une
+    interruption, l'import reprend avec `skip` = dernier numéro affiché.
+
+    Paramètres :
+        table : "clients", "collaborateurs", "contrats" ou "evenements".
+        chemin : Fichier à importer.
+        SessionLocal : Fabrique de sessions SQLAlchemy.
+        payload : Payload JWT de l'utilisateur connecté.
+        batch_size : Nombre de lignes par lot (et par commit).
+        skip : Nombre d'enregistrements déjà importés à ignorer.
+        chemin_rejets : Fichier des rejets (par défaut `<fichier>.rejets.jsonl`).
+        copy : Utilise `COPY` (PostgreSQL) au lieu des INSERT groupés.
+
+    Retour :
+        dict : Compteurs "importees", "rejetees" et "derniere_ligne".
+    """
+    _, _, preparer, _ = IMPORTS[table]
+    chemin_rejets = chemin_rejets or chemin.with_name(chemin.name + ".rejets.jsonl")
+    if copy:
+        with unite_de_travail(SessionLocal) as db:
+            copy = copy_disponible(db)
+        if not copy:
+            console.print(
+                "[yellow]COPY n'est disponible qu'avec PostgreSQL : INSERT groupés utilisés.[/]"
+            )
+
+    stats = {"importees": 0, "rejetees": 0, "derniere_ligne": skip}
+
+    # Fichier de rejets ouvert en ajout : une reprise complète les rejets précédents ;
+    # les processus de hachage des mots de passe servent à tous les lots
+    with chemin_rejets.open("a", encoding="utf-8") as fichier_rejets, pool_hachage():
+
+        def rejeter(numero, ligne, erreur):
+            # Les mots de passe en clair ne sont jamais recopiés dans les rejets
+            donnees = {
+                champ: "***" if champ in COLONNES_SENSIBLES else valeur
+                for champ, valeur in ligne.items()
+            }
+            fichier_rejets.write(
+                json.dumps(
+                    {"ligne": numero, "erreur": erreur, "donnees": donnees},
+                    ensure_ascii=False,
+                    default=str,
+                )
+                + "\n"
+            )
+            stats["rejetees"] += 1
+
+        def valider(lot, dernier_numero):
+            ecrites, rejets = ecrire_lot(SessionLocal, table, lot, payload, copy)
+            for rejet in rejets:
+                rejeter(*rejet)
+            fichier_rejets.flush()
+            stats["importees"] += ecrites
+            stats["derniere_ligne"] = dernier_numero
+            console.print(
+                f"[cyan]Lot validé jusqu'à la ligne {dernier_numero}[/] "
+                f"({stats['importees']} importée(s), {stats['rejetees']} rejetée(s))"
+            )
+
+        lot = []
+        numero = skip
+        for numero, ligne in lire_lignes(chemin, skip):
+            try:
+                if "__erreur__" in ligne:
+                    raise typer.BadParameter(ligne["__erreur__"])
+                lot.append((numero, ligne, preparer(ligne, payload)))
+            except (typer.BadParameter, ValueError, TypeError) as e:
+                message = e.message if isinstance(e, typer.BadParameter) else str(e)
+                rejeter(numero, ligne, message)
+            if len(lot) >= batch_size:
+                valider(lot, numero)
+                lot = []
+        if lot or numero > stats["derniere_ligne"]:
+            valider(lot, numero)
+
+    return stats
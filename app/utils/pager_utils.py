@@ -0,0 +1,215 @@
+from typing import Iterator, Type
+
+import click
+from rich.console import Console
+from rich.live import Live
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from app import config
+
+# Touches du pager (click.getchar renvoie les séquences d'échappement des flèches ;
+# "\xe0..." / "\x00..." sont les codes des touches spéciales sous Windows)
+TOUCHES = {
+    "ligne_suivante": ("j", "\x1b[B", "\xe0P", "\x00P", "\r", "\n"),
+    "ligne_precedente": ("k", "\x1b[A", "\xe0H", "\x00H"),
+    "page_suivante": (" ", "f", "\x1b[6~", "\xe0Q", "\x00Q"),
+    "page_precedente": ("b", "\x1b[5~", "\xe0I", "\x00I"),
+    "debut": ("g", "\x1b[H", "\xe0G", "\x00G"),
+    "quitter": ("q", "Q", "\x1b", "\x03"),
+}
+
+
+def cellule(valeur) -> str:
+    """Convertit une valeur en texte sur une seule ligne (None = vide)."""
+    if valeur is None:
+        return ""
+    return str(valeur).replace("\r", " ").replace("\n", " ")
+
+
+def largeurs_colonnes(
+    entetes: list[str],
+    echantillon: list[tuple[str, ...]],
+    largeur_totale: int,
+    largeur_max: int = None,
+) -> list[int]:
+    """
+    Calcule la largeur de chaque colonne à partir d'un échantillon de lignes.
+
+    Chaque colonne prend la largeur de sa plus longue cellule dans l'échantillon
+    (ou de son en-tête), bornée par `largeur_max`. Si le total dépasse la largeur
+    du terminal, les colonnes les plus larges sont réduites en premier.
+
+    Paramètres :
+        entetes : Noms des colonnes.
+        echantillon : Lignes déjà converties en texte.
+        largeur_totale : Largeur disponible pour le contenu des cellules.
+        largeur_max : Largeur maximale d'une colonne (PAGER_LARGEUR_MAX_COLONNE si absent).
+
+    Retour :
+        list[int] : Largeur de chaque colonne, dans l'ordre de `entetes`.
+    """
+    largeur_max = largeur_max or config.PAGER_LARGEUR_MAX_COLONNE
+    largeurs = [
+        min(largeur_max, max([len(entete)] + [len(ligne[i]) for ligne in echantillon]))
+        for i, entete in enumerate(entetes)
+    ]
+    # Réduit la plus large colonne, une unité à la fois, jusqu'à tenir à l'écran
+    while sum(largeurs) > largeur_totale and max(largeurs) > 3:
+        largeurs[largeurs.index(max(largeurs))] -= 1
+    return largeurs
+
+
+class Pager:
+    """
+    Parcours interactif d'une table : seule une fenêtre de lignes est rendue,
+    et les pages suivantes ne sont lues en base que lorsque le défilement les
+    atteint.
+
+    Les largeurs de colonnes sont mesurées une fois, sur un échantillon
+    (PAGER_ECHANTILLON lignes) : le rendu d'une fenêtre ne dépend pas du
+    nombre de lignes lues.
+
+    Exemple d'utilisation :
+        pager = Pager(Evenement, iter_pages(Evenement, SessionLocal))
+        pager.executer()
+    """
+
+    def __init__(
+        self,
+        modele: Type,
+        pages: Iterator[list[dict]],
+        console: Console = None,
+        hauteur: int = None,
+    ):
+        self.modele = modele
+        self.pages = iter(pages)
+        self.console = console or Console()
+        # Lignes visibles : hauteur du terminal moins le titre, les bordures et l'aide
+        self.hauteur = hauteur or max(1, self.console.size.height - 7)
+        self.entetes: list[str] = []
+        self.lignes: list[tuple[str, ...]] = []
+        self.largeurs: list[int] = []
+        self.debut = 0
+        self.pages_lues = 0
+        self.termine = False
+
+    def charger_page(self) -> bool:
+        """
+        Lit la page suivante en base et l'ajoute aux lignes déjà lues.
+
+        Retour :
+            bool : False s'il n'y a plus de page.
+        """
+        if self.termine:
+            return False
+        page = next(self.pages, None)
+        if not page:
+            self.termine = True
+            return False
+        if not self.entetes:
+            self.entetes = list(page[0].keys())
+        self.lignes.extend(tuple(map(cellule, ligne.values())) for ligne in page)
+        self.pages_lues += 1
+        return True
+
+    def charger_jusqua(self, nombre: int):
+        """Lit des pages jusqu'à disposer de `nombre` lignes (ou jusqu'à la fin de la table)."""
+        while len(self.lignes) < nombre and self.charger_page():
+            pass
+
+    def mesurer(self):
+        """Fixe les largeurs de colonnes à partir des premières lignes lues."""
+        self.charger_jusqua(config.PAGER_ECHANTILLON)
+        # Bordures et marges de Rich : 3 caractères par colonne, plus 1
+        disponible = self.console.width - 3 * len(self.entetes) - 1
+        self.largeurs = largeurs_colonnes(
+            self.entetes, self.lignes[: config.PAGER_ECHANTILLON], disponible
+        )
+
+    def fenetre(self) -> list[tuple[str, ...]]:
+        """Retourne les lignes visibles, en lisant les pages nécessaires."""
+        self.charger_jusqua(self.debut + self.hauteur)
+        return self.lignes[self.debut : self.debut + self.hauteur]
+
+    def deplacer(self, decalage: int):
+        """Fait défiler la fenêtre de `decalage` lignes (négatif = vers le haut)."""
+        debut = max(0, self.debut + decalage)
+        # Ne dépasse pas la fin de la table une fois la dernière ligne lue
+        self.charger_jusqua(debut + self.hauteur)
+        self.debut = max(0, min(debut, len(self.lignes) - self.hauteur))
+
+    def touche(self, touche: str) -> bool:
+        """
+        Applique une touche au pager.
+
+        Retour :
+            bool : False si la touche demande de quitter.
+        """
+        if touche in TOUCHES["quitter"]:
+            return False
+        if touche in TOUCHES["ligne_suivante"]:
+            self.deplacer(1)
+        elif touche in TOUCHES["ligne_precedente"]:
+            self.deplacer(-1)
+        elif touche in TOUCHES["page_suivante"]:
+            self.deplacer(self.hauteur)
+        elif touche in TOUCHES["page_precedente"]:
+            self.deplacer(-self.hauteur)
+        elif touche in TOUCHES["debut"]:
+            self.debut = 0
+        return True
+
+    def vue(self) -> Table:
+        """Construit le tableau Rich de la fenêtre courante (largeurs fixes, une ligne par enregistrement)."""
+        lignes = self.fenetre()
+        fin = self.debut + len(lignes)
+        suite = "" if self.termine and fin >= len(self.lignes) else "+"
+        table = Table(
+            title=f"{self.modele.__name__} (lignes {self.debut + 1 if lignes else 0}"
+            f"-{fin} sur {len(self.lignes)}{suite})",
+            header_style="bold cyan",
+            caption="↑/↓ j/k : ligne   Espace/b : page   g : début   q : quitter",
+            caption_style="dim",
+        )
+        for entete, largeur in zip(self.entetes, self.largeurs):
+            table.add_column(
+                entete,
+                style="white",
+                width=largeur,
+                no_wrap=True,
+                overflow="ellipsis",
+            )
+        for ligne in lignes:
+            # Text : les valeurs ne sont pas interprétées comme du balisage Rich
+            table.add_row(*map(Text, ligne))
+        return table
+
+    def executer(self, lire_touche=click.getchar) -> int:
+        """
+        Affiche le pager dans l'écran alternatif du terminal jusqu'à ce que
+        l'utilisateur quitte.
+
+        Retour :
+            int : Nombre de lignes lues en base.
+        """
+        try:
+            self.mesurer()
+            if not self.lignes:
+                self.console.print(
+                    Panel.fit(
+                        f"[yellow]Aucune donnée trouvée dans {self.modele.__name__}.[/]",
+                        border_style="yellow",
+                    )
+                )
+                return 0
+            with Live(
+                self.vue(), console=self.console, screen=True, auto_refresh=False
+            ) as live:
+                while self.touche(lire_touche()):
+                    live.update(self.vue(), refresh=True)
+            return len(self.lignes)
+        finally:
+            # Quitter avant la fin de la table : la session de lecture est libérée
+            getattr(self.pages, "close", lambda: None)()
@@ -0,0 +1,154 @@
+import heapq
+import json
+import time
+from datetime import datetime, timezone
+
+import click
+from rich.console import Console
+from rich.table import Table
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Nombre de requêtes les plus lentes gardées dans le résumé
+PROFIL_TOP = 5
+
+# Longueur maximale du SQL affiché pour une requête lente
+PROFIL_SQL_MAX = 200
+
+
+def _nom_commande() -> str:
+    """
+    Retourne le nom de la commande CLI en cours (ex : "db update-contrat"),
+    sans le nom du programme, ou une chaîne vide hors d'une commande Click.
+    """
+    ctx = click.get_current_context(silent=True)
+    noms = []
+    while ctx is not None and ctx.parent is not None:
+        noms.append(ctx.info_name)
+        ctx = ctx.parent
+    return " ".join(reversed(noms))
+
+
+class ProfilSQL:
+    """
+    Mesure les requêtes SQL exécutées pendant une commande CLI.
+
+    Le profil s'abonne aux événements `before_cursor_execute` et
+    `after_cursor_execute` de tous les moteurs SQLAlchemy : il compte les
+    requêtes, cumule leur durée et les lignes rapportées par le driver
+    (`rowcount`, inconnu pour les SELECT sous SQLite) et garde les
+    `PROFIL_TOP` requêtes les plus lentes.
+    """
+
+    def __init__(self, top: int = PROFIL_TOP):
+        self.top = top
+        self.commande = ""
+        self.requetes = 0
+        self.duree = 0.0
+        self.lignes = 0
+        self.plus_lentes = []  # Tas (durée, n°, sql) des requêtes les plus lentes
+        # Méthodes liées gardées pour pouvoir retirer exactement les mêmes écouteurs
+        self._avant = self._avant_execution
+        self._apres = self._apres_execution
+
+    def demarrer(self) -> "ProfilSQL":
+        """Commence la mesure (abonnement aux événements des moteurs)."""
+        event.listen(Engine, "before_cursor_execute", self._avant)
+        event.listen(Engine, "after_cursor_execute", self._apres)
+        return self
+
+    def arreter(self):
+        """Arrête la mesure (désabonnement des événements des moteurs)."""
+        if event.contains(Engine, "before_cursor_execute", self._avant):
+            event.remove(Engine, "before_cursor_execute", self._avant)
+            event.remove(Engine, "after_cursor_execute", self._apres)
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+    def _avant_execution(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        # Pile : une requête peut en déclencher une autre sur la même connexion
+        conn.info.setdefault("profil_debuts", []).append(time.perf_counter())
+        if not self.commande:
+            self.commande = _nom_commande()
+
+    def _apres_execution(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        debuts = conn.info.get("profil_debuts")
+        if not debuts:
+            return
+        duree = time.perf_counter() - debuts.pop()
+        self.requetes += 1
+        self.duree += duree
+        self.lignes += max(cursor.rowcount, 0)
+        entree = (duree, self.requetes, " ".join(statement.split()))
+        if len(self.plus_lentes) < self.top:
+            heapq.heappush(self.plus_lentes, entree)
+        else:
+            heapq.heappushpop(self.plus_lentes, entree)
+
+    def resume(self) -> dict:
+        """
+        Retourne le résumé du profil, sérialisable en JSON.
+
+        Retour :
+            dict : Commande, nombre de requêtes, durée totale (ms), lignes et
+            requêtes les plus lentes (de la plus lente à la plus rapide).
+        """
+        return {
+            "evenement": "profil_sql",
+            "horodatage": datetime.now(timezone.utc).isoformat(),
+            "commande": self.commande,
+            "requetes": self.requetes,
+            "duree_ms": round(self.duree * 1000, 3),
+            "lignes": self.lignes,
+            "plus_lentes": [
+                {"duree_ms": round(duree * 1000, 3), "sql": sql[:PROFIL_SQL_MAX]}
+                for duree, _, sql in sorted(self.plus_lentes, reverse=True)
+            ],
+        }
+
+    def ligne_json(self) -> str:
+        """Retourne le résumé sur une seule ligne JSON (ingérable par la collecte de métriques)."""
+        return json.dumps(self.resume(), ensure_ascii=False)
+
+    def afficher(self, console: Console = None):
+        """Affiche le résumé sous forme de tableau Rich (sur la sortie d'erreur par défaut)."""
+        console = console or Console(stderr=True)
+        resume = self.resume()
+        table = Table(
+            title=(
+                f"Profil SQL — {resume['commande'] or 'commande'} : "
+                f"{resume['requetes']} requête(s), {resume['duree_ms']:.1f} ms, "
+                f"{resume['lignes']} ligne(s)"
+            ),
+            title_justify="left",
+        )
+        table.add_column("Durée (ms)", justify="right", style="yellow")
+        table.add_column("Requête", style="cyan", overflow="fold")
+        for requete in resume["plus_lentes"]:
+            table.add_row(f"{requete['duree_ms']:.3f}", requete["sql"])
+        console.print(table)
+
+    def terminer(self, afficher: bool = True, journal: str = None):
+        """
+        Arrête la mesure et publie le résumé.
+
+        Paramètres :
+            afficher : Affiche le tableau et la ligne JSON sur la sortie d'erreur (--profile).
+            journal : Fichier auquel ajouter la ligne JSON (DB_PROFILE_LOG), ou None.
+        """
+        self.arreter()
+        ligne = self.ligne_json()
+        if afficher:
+            self.afficher()
+            click.echo(ligne, err=True)
+        if journal:
+            with open(journal, "a", encoding="utf-8") as fichier:
+                fichier.write(ligne + "\n")
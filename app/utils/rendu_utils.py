@@ -0,0 +1,208 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Type
+
+import typer
+
+# Formats d'affichage des commandes de lecture (read-* et filter-*)
+#   rich  : tableau Rich (largeurs calculées sur toutes les cellules), pour le terminal
+#   plain : une ligne de texte par enregistrement, sans cadre ni alignement
+#   tsv   : valeurs séparées par des tabulations, avec en-tête
+#   json  : un tableau JSON
+#   jsonl : un objet JSON par ligne
+FORMATS_AFFICHAGE = ("rich", "plain", "tsv", "json", "jsonl")
+
+
+def format_par_defaut(flux=None) -> str:
+    """Retourne "rich" si la sortie est un terminal, "tsv" sinon (redirection, pipe)."""
+    flux = flux or sys.stdout
+    return "rich" if flux.isatty() else "tsv"
+
+
+def resoudre_format(format_sortie: str = None) -> str:
+    """
+    Valide le format demandé avec --format, ou choisit le format par défaut.
+
+    Exceptions :
+        typer.BadParameter : Si le format est inconnu.
+    """
+    if format_sortie is None:
+        return format_par_defaut()
+    if format_sortie not in FORMATS_AFFICHAGE:
+        raise typer.BadParameter(
+            f"Format inconnu (choix : {', '.join(FORMATS_AFFICHAGE)})"
+        )
+    return format_sortie
+
+
+def messages_sur_stderr(ctx: typer.Context, *consoles):
+    """
+    Envoie les messages des consoles Rich (connexion, titres, pagination) sur la
+    sortie d'erreur jusqu'à la fin de la commande : la sortie standard ne
+    contient que les données.
+    """
+    for console in consoles:
+        if not console.stderr:
+            console.stderr = True
+            ctx.call_on_close(lambda console=console: setattr(console, "stderr", False))
+
+
+# ==================== RENDUS ====================
+
+
+class Rendu(ABC):
+    """
+    Affichage incrémental des lignes d'une lecture : chaque page est écrite dès
+    qu'elle est lue, sans garder les pages précédentes.
+
+    Exemple d'utilisation :
+        rendu = creer_rendu(Client, "jsonl")
+        for page in iter_pages(Client, SessionLocal):
+            rendu.page(page)
+        rendu.terminer()
+    """
+
+    def __init__(self, modele: Type, sortie=None):
+        self.modele = modele
+        self.sortie = sortie or sys.stdout
+        self.total = 0
+
+    def page(self, lignes: list[dict], titre: str = None):
+        """Écrit une page de lignes (dictionnaires colonne -> valeur)."""
+        if lignes:
+            self._ecrire(lignes, titre)
+            self.total += len(lignes)
+
+    @abstractmethod
+    def _ecrire(self, lignes: list[dict], titre: str = None):
+        """Écrit une page non vide dans le format du rendu."""
+
+    def terminer(self):
+        """Termine l'affichage (fin du document, vidage du tampon)."""
+        self.sortie.flush()
+
+
+class RenduRich(Rendu):
+    """Tableaux Rich, un par page (voir `afficher_table`)."""
+
+    def _ecrire(self, lignes, titre=None):
+        # Import local : db_utils importe ce module
+        from app.utils.db_utils import afficher_table
+
+        afficher_table(self.modele, lignes, titre=titre)
+
+    def terminer(self):
+        if self.total == 0:
+            from app.utils.db_utils import afficher_table
+
+            afficher_table(self.modele, [])
+
+
+class RenduTexte(Rendu):
+    """
+    Texte brut : une ligne par enregistrement, en-tête sur la première ligne.
+    Aucune mesure de largeur : chaque page est écrite en un seul appel.
+    """
+
+    separateur = "  "
+
+    def cellule(self, valeur) -> str:
+        """Convertit une valeur en texte sur une seule ligne (None = vide)."""
+        if valeur is None:
+            return ""
+        return str(valeur).replace("\r", " ").replace("\n", " ")
+
+    def _ecrire(self, lignes, titre=None):
+        morceaux = []
+        if self.total == 0:
+            morceaux.append(self.separateur.join(lignes[0].keys()))
+        for ligne in lignes:
+            morceaux.append(self.separateur.join(map(self.cellule, ligne.values())))
+        self.sortie.write("\n".join(morceaux) + "\n")
+
+
+class RenduTsv(RenduTexte):
+    """Valeurs séparées par des tabulations (tabulations et sauts de ligne échappés)."""
+
+    separateur = "\t"
+
+    def cellule(self, valeur) -> str:
+        if valeur is None:
+            return ""
+        return (
+            str(valeur)
+            .replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+
+
+class RenduJsonl(Rendu):
+    """Un objet JSON par ligne."""
+
+    def _ecrire(self, lignes, titre=None):
+        self.sortie.write(
+            "".join(
+                json.dumps(ligne, ensure_ascii=False, default=str) + "\n"
+                for ligne in lignes
+            )
+        )
+
+
+class RenduJson(Rendu):
+    """Un tableau JSON, écrit élément par élément (valide quel que soit le nombre de pages)."""
+
+    def _ecrire(self, lignes, titre=None):
+        debut = "[\n" if self.total == 0 else ",\n"
+        self.sortie.write(
+            debut
+            + ",\n".join(
+                json.dumps(ligne, ensure_ascii=False, default=str) for ligne in lignes
+            )
+        )
+
+    def terminer(self):
+        self.sortie.write("\n]\n" if self.total else "[]\n")
+        super().terminer()
+
+
+RENDUS = {
+    "rich": RenduRich,
+    "plain": RenduTexte,
+    "tsv": RenduTsv,
+    "json": RenduJson,
+    "jsonl": RenduJsonl,
+}
+
+
+def creer_rendu(modele: Type, format_sortie: str = "rich", sortie=None) -> Rendu:
+    """Retourne le rendu du format demandé (voir `FORMATS_AFFICHAGE`)."""
+    return RENDUS[format_sortie](modele, sortie)
+
+
+def afficher_resultat(
+    modele: Type,
+    colonnes: list[str],
+    resultat,
+    format_sortie: str = "rich",
+    taille_lot: int = 500,
+) -> int:
+    """
+    Affiche le résultat d'une requête SELECT dans le format demandé.
+
+    En Rich, toutes les lignes forment un seul tableau. Les autres formats
+    écrivent les lignes par lots de `taille_lot`, au fil de la lecture.
+
+    Retour :
+        int : Nombre de lignes affichées.
+    """
+    rendu = creer_rendu(modele, format_sortie)
+    lots = (
+        [resultat.all()] if format_sortie == "rich" else resultat.partitions(taille_lot)
+    )
+    for lot in lots:
+        rendu.page([dict(zip(colonnes, ligne)) for ligne in lot])
+    rendu.terminer()
+    return rendu.total
@@ -0,0 +1,175 @@
+import re
+from typing import Type
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+from app.models.collaborateur import Collaborateur
+from app.models.contrat import Contrat
+from app.models.evenement import Evenement
+from app.utils.db_utils import (
+    DEFAULT_PAGE_SIZE,
+    filtrer_par_role,
+    get_meta,
+    requete_page,
+)
+
+# Lignes de plan qui indiquent un accès par index (PostgreSQL et SQLite)
+MOTIF_INDEX = re.compile(
+    r"Index Scan|Index Only Scan|Bitmap Index Scan|"
+    r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY"
+)
+
+
+# ==================== REQUÊTES DES COMMANDES ====================
+
+
+def _selection(modele: Type, colonnes: list[str] = None):
+    """Retourne les attributs SQLAlchemy des colonnes demandées (toutes par défaut)."""
+    meta = get_meta(modele)
+    return [meta.attributs[col] for col in colonnes or meta.colonnes]
+
+
+def requete_filter_evenements(
+    payload: dict, colonnes: list[str] = None, sans_support: bool = False
+):
+    """
+    Construit la requête de filter-evenements.
+
+    Un support ne voit que ses événements ; sinon --sans-support ne garde que
+    les événements sans support (index partiel `ix_evenements_sans_support`).
+    """
+    requete = filtrer_par_role(
+        Evenement, select(*_selection(Evenement, colonnes)), payload
+    )
+    if payload["role"] != "support" and sans_support:
+        requete = requete.where(Evenement.support_contact_id.is_(None))
+    return requete
+
+
+def requete_filter_contrats(
+    payload: dict,
+    colonnes: list[str] = None,
+    non_signe: bool = False,
+    non_payes: bool = False,
+):
+    """
+    Construit la requête de filter-contrats.
+
+    Un commercial ne voit que ses contrats (index `ix_contrats_commercial_statut`) ;
+    --non-payes utilise l'index partiel `ix_contrats_non_payes`.
+    """
+    requete = filtrer_par_role(Contrat, select(*_selection(Contrat, colonnes)), payload)
+    if non_signe:
+        requete = requete.where(~Contrat.statut_contrat)
+    if non_payes:
+        requete = requete.where(Contrat.montant_restant > 0)
+    return requete
+
+
+def requetes_cli(payload: dict) -> dict:
+    """
+    Retourne les requêtes des commandes CLI, construites comme par les commandes
+    elles-mêmes, pour l'utilisateur connecté et pour chaque rôle concerné.
+
+    Retour :
+        dict : Libellé de la commande -> requête `Select`.
+    """
+    id_utilisateur = int(payload["id"])
+    commercial = {"role": "commercial", "id": id_utilisateur}
+    support = {"role": "support", "id": id_utilisateur}
+    gestion = {"role": "gestion", "id": id_utilisateur}
+
+    # Page suivante : la valeur de `dernier_id` est sans effet sur le plan
+    requetes = {
+        f"read-{modele.__tablename__} (page suivante)": requete_page(
+            modele,
+            list(get_meta(modele).colonnes),
+            dernier_id=1,
+            taille=DEFAULT_PAGE_SIZE,
+        )
+        for modele in (Client, Contrat, Evenement, Collaborateur)
+    }
+    requetes.update(
+        {
+            f"read-{modele.__tablename__} --with-relations": requete_page(
+                modele,
+                list(get_meta(modele).colonnes),
+                dernier_id=1,
+                taille=DEFAULT_PAGE_SIZE,
+                avec_relations=True,
+            )
+            for modele in (Contrat, Evenement)
+        }
+    )
+    requetes.update(
+        {
+            "filter-evenements (support)": requete_filter_evenements(support),
+            "filter-evenements --sans-support": requete_filter_evenements(
+                gestion, sans_support=True
+            ),
+            "filter-contrats (commercial)": requete_filter_contrats(commercial),
+            "filter-contrats --non-signe (commercial)": requete_filter_contrats(
+                commercial, non_signe=True
+            ),
+            "filter-contrats --non-payes (commercial)": requete_filter_contrats(
+                commercial, non_payes=True
+            ),
+            "filter-contrats --non-payes (gestion)": requete_filter_contrats(
+                gestion, non_payes=True
+            ),
+            "auth login (collaborateur par email)": select(Collaborateur).where(
+                Collaborateur.email == payload.get("email", "")
+            ),
+            "update-client (clients du commercial)": select(Client.id).where(
+                Client.contact_commercial_id == id_utilisateur
+            ),
+            "update-evenement (événements du support)": select(Evenement.id).where(
+                Evenement.support_contact_id == id_utilisateur
+            ),
+            # Même WHERE que l'UPDATE ... RETURNING (EXPLAIN ANALYZE n'écrit rien)
+            "update-contrat (contrat du commercial)": select(Contrat.id).where(
+                Contrat.id == 1, Contrat.contact_commercial_id == id_utilisateur
+            ),
+            "import contrats (clients du lot)": select(
+                Client.id, Client.contact_commercial_id
+            ).where(Client.id.in_([1, 2, 3])),
+            "import evenements (contrats du lot)": select(
+                Contrat.id, Contrat.client_id
+            ).where(Contrat.id.in_([1, 2, 3])),
+        }
+    )
+    return requetes
+
+
+# ==================== PLANS D'EXÉCUTION ====================
+
+
+def plan_execution(db: Session, requete, analyze: bool = False) -> list[str]:
+    """
+    Retourne le plan d'exécution d'une requête (EXPLAIN), ligne par ligne.
+
+    Paramètres :
+        db : Session SQLAlchemy ouverte.
+        requete : Requête `Select` à expliquer.
+        analyze : PostgreSQL uniquement, exécute la requête (EXPLAIN ANALYZE)
+            pour obtenir les temps et nombres de lignes réels.
+
+    Retour :
+        list[str] : Lignes du plan.
+    """
+    dialecte = db.get_bind().dialect
+    # Valeurs littérales : les seuls paramètres sont des entiers et l'email du JWT
+    sql = str(requete.compile(dialect=dialecte, compile_kwargs={"literal_binds": True}))
+    connexion = db.connection()
+    if dialecte.name == "sqlite":
+        lignes = connexion.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+        return [ligne[-1] for ligne in lignes]
+    prefixe = "EXPLAIN (ANALYZE, BUFFERS)" if analyze else "EXPLAIN"
+    return [ligne[0] for ligne in connexion.exec_driver_sql(f"{prefixe} {sql}")]
+
+
+def utilise_index(plan: list[str]) -> bool:
+    """Indique si un plan d'exécution accède aux données par un index."""
+    return any(MOTIF_INDEX.search(ligne) for ligne in plan)
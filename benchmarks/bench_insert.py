@@ -0,0 +1,110 @@
+"""
+Mesure le nombre d'allers-retours SQL et la durée d'une insertion.
+
+Compare l'ancienne insertion (add + commit + refresh) à l'insertion actuelle
+(`add_row` : un seul INSERT ... RETURNING) et à l'insertion par lot (`add_rows`).
+
+Utilisation :
+    python -m benchmarks.bench_insert                       # SQLite en mémoire
+    python -m benchmarks.bench_insert --url postgresql+psycopg2://u:p@localhost/bench
+
+La base cible doit être vide ou jetable : les tables sont créées puis supprimées.
+"""
+
+import time
+
+import typer
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, creer_engine
+from app.models import client, collaborateur, contrat, evenement  # noqa: F401
+from app.models.collaborateur import Role
+from app.utils.db_utils import add_row, add_rows, unite_de_travail
+
+app = typer.Typer(help="Benchmark des insertions")
+
+
+def insertion_refresh(SessionBench, data: dict):
+    """Ancienne insertion : add, commit puis refresh pour relire l'identifiant."""
+    db = SessionBench()
+    try:
+        instance = Role(**data)
+        db.add(instance)
+        db.commit()
+        db.refresh(instance)
+        return instance.id
+    finally:
+        db.close()
+
+
+def insertion_returning(SessionBench, data: dict):
+    """Insertion actuelle : un seul INSERT ... RETURNING dans une unité de travail."""
+    with unite_de_travail(SessionBench) as db:
+        return add_row(db, Role, data)["id"]
+
+
+@app.command()
+def main(
+    url: str = typer.Option("sqlite://", help="URL de la base de test"),
+    nombre: int = typer.Option(500, help="Nombre d'insertions par méthode"),
+):
+    """
+    Affiche, pour chaque méthode, les requêtes SQL par insertion et la durée totale.
+    """
+    options = {"poolclass": StaticPool} if url.startswith("sqlite") else {}
+    engine = creer_engine(url, echo=False, **options)
+    Base.metadata.create_all(engine)
+    SessionBench = sessionmaker(bind=engine, autoflush=False)
+
+    requetes = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def compter(conn, cursor, statement, *args):
+        # BEGIN/COMMIT ne passent pas par le curseur : seules les requêtes SQL comptent
+        requetes.append(statement)
+
+    def mesurer(nom, inserer):
+        requetes.clear()
+        debut = time.perf_counter()
+        inserer()
+        duree = time.perf_counter() - debut
+        typer.echo(
+            f"{nom:<28} {len(requetes) / nombre:>6.2f} requête(s)/insertion"
+            f"  {duree * 1000:>9.1f} ms"
+        )
+
+    try:
+        mesurer(
+            "add + commit + refresh",
+            lambda: [
+                insertion_refresh(SessionBench, {"role": f"a{i}", "permissions": {}})
+                for i in range(nombre)
+            ],
+        )
+        mesurer(
+            "add_row (RETURNING)",
+            lambda: [
+                insertion_returning(SessionBench, {"role": f"b{i}", "permissions": {}})
+                for i in range(nombre)
+            ],
+        )
+
+        def par_lot():
+            with unite_de_travail(SessionBench) as db:
+                add_rows(
+                    db,
+                    Role,
+                    [{"role": f"c{i}", "permissions": {}} for i in range(nombre)],
+                    ordonne=False,
+                )
+
+        mesurer("add_rows (lot, RETURNING)", par_lot)
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    app()
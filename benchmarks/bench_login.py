@@ -0,0 +1,110 @@
+"""
+Mesure la latence de `auth login` (p50 / p99) selon la méthode de hachage des mots de passe.
+
+Pour chaque méthode, un collaborateur est créé avec un mot de passe haché par
+cette méthode, puis `login` est appelé plusieurs fois. Le coût du hachage
+domine la connexion : ce tableau sert à régler PASSWORD_HASH_METHOD.
+
+Utilisation :
+    python -m benchmarks.bench_login                                # SQLite en mémoire
+    python -m benchmarks.bench_login --methode scrypt:16384:8:1 --methode pbkdf2:sha256:600000
+    python -m benchmarks.bench_login --url postgresql+psycopg2://u:p@localhost/bench
+
+La base cible doit être vide ou jetable : les tables sont créées puis supprimées.
+"""
+
+import statistics
+import time
+
+import typer
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import config
+from app.auth import core
+from app.auth.mots_de_passe import hacher_mot_de_passe
+from app.database import Base, creer_engine
+from app.models import client, collaborateur, contrat, evenement  # noqa: F401
+from app.models.collaborateur import Collaborateur, Role
+from app.utils.db_utils import add_row, unite_de_travail
+
+app = typer.Typer(help="Benchmark de la connexion")
+
+METHODES_PAR_DEFAUT = [
+    "scrypt:32768:8:1",
+    "scrypt:16384:8:1",
+    "scrypt:8192:8:1",
+    "pbkdf2:sha256:1000000",
+    "pbkdf2:sha256:600000",
+]
+
+
+def centile(durees: list[float], rang: int) -> float:
+    """Retourne le centile `rang` (1 à 99) d'une liste de durées."""
+    if len(durees) < 2:
+        return durees[0]
+    return statistics.quantiles(durees, n=100, method="inclusive")[rang - 1]
+
+
+@app.command()
+def main(
+    url: str = typer.Option("sqlite://", help="URL de la base de test"),
+    methode: list[str] = typer.Option(
+        METHODES_PAR_DEFAUT, help="Méthode(s) de hachage werkzeug à comparer"
+    ),
+    nombre: int = typer.Option(20, help="Nombre de connexions par méthode"),
+):
+    """
+    Affiche, pour chaque méthode, la durée d'un hachage et les centiles p50 / p99 de `login`.
+    """
+    options = {"poolclass": StaticPool} if url.startswith("sqlite") else {}
+    engine = creer_engine(url, echo=False, **options)
+    Base.metadata.create_all(engine)
+    SessionBench = sessionmaker(bind=engine, autoflush=False)
+
+    # `login` utilise la base de test ; pas de rehachage pendant la mesure
+    core.SessionLocal = SessionBench
+    core.SECRET_KEY = core.SECRET_KEY or "bench"
+    config.PASSWORD_REHASH = False
+
+    with unite_de_travail(SessionBench) as db:
+        role_id = add_row(db, Role, {"role": "gestion", "permissions": {}})["id"]
+
+    typer.echo(f"{'méthode':<24} {'hachage':>10} {'login p50':>10} {'login p99':>10}")
+    try:
+        for numero, nom in enumerate(methode):
+            debut = time.perf_counter()
+            hache = hacher_mot_de_passe("mot-de-passe", nom)
+            duree_hachage = time.perf_counter() - debut
+
+            email = f"bench{numero}@exemple.fr"
+            with unite_de_travail(SessionBench) as db:
+                add_row(
+                    db,
+                    Collaborateur,
+                    {
+                        "nom": f"Bench {numero}",
+                        "email": email,
+                        "mot_de_passe": hache,
+                        "role_id": role_id,
+                    },
+                )
+
+            durees = []
+            for _ in range(nombre):
+                debut = time.perf_counter()
+                core.login(email, "mot-de-passe")
+                durees.append(time.perf_counter() - debut)
+
+            typer.echo(
+                f"{nom:<24} {duree_hachage * 1000:>7.1f} ms"
+                f" {centile(durees, 50) * 1000:>7.1f} ms"
+                f" {centile(durees, 99) * 1000:>7.1f} ms"
+            )
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    app()
@@ -1,14 +1,59 @@
-import os
+import urllib.request
+
 import sentry_sdk
-from dotenv import load_dotenv
+from sentry_sdk.transport import Transport
 
-# Charge les variables d'environnement
-load_dotenv()
+from app import config
 
-# Initialisation de Sentry
-SENTRY_DSN = os.getenv("SENTRY_DSN")
+# Initialisation de Sentry (DSN lu depuis le .env par app.config)
+SENTRY_DSN = config.SENTRY_DSN
 if SENTRY_DSN:
     sentry_sdk.init(
         dsn=SENTRY_DSN,
-        traces_sample_rate=1.0,  # Pour activer le tracing (optionnel)
+        # Tracing désactivé par défaut : une commande CLI est un processus court
+        traces_sample_rate=config.SENTRY_TRACES_SAMPLE_RATE,
+        # Attente maximale de l'envoi des erreurs à la sortie du processus
+        shutdown_timeout=config.TELEMETRIE_FLUSH_TIMEOUT,
     )
+
+
+class TransportLots(Transport):
+    """
+    Transport Sentry synchrone des lots de télémétrie : chaque enveloppe est
+    envoyée immédiatement et le résultat de l'envoi (réponse HTTP 2xx ou non)
+    est compté, ce qui permet de confirmer la livraison d'un lot.
+
+    Paramètres :
+        dsn : DSN Sentry de destination.
+        timeout : Attente maximale (secondes) de chaque requête.
+    """
+
+    def __init__(self, dsn: str, timeout: float):
+        super().__init__({"dsn": dsn})
+        self.timeout = timeout
+        self.acceptees = 0
+        self.refusees = 0
+
+    def capture_envelope(self, envelope):
+        if self._poster(envelope.serialize()):
+            self.acceptees += 1
+        else:
+            self.refusees += 1
+
+    def _poster(self, corps: bytes) -> bool:
+        """Envoie une enveloppe sérialisée ; True si Sentry l'a acceptée."""
+        auth = self.parsed_dsn.to_auth("epic-events-cli")
+        requete = urllib.request.Request(
+            auth.get_api_url(),
+            data=corps,
+            headers={
+                "Content-Type": "application/x-sentry-envelope",
+                "X-Sentry-Auth": auth.to_header(),
+            },
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(requete, timeout=self.timeout) as reponse:
+                return 200 <= reponse.status < 300
+        except (OSError, ValueError):  # Erreur réseau ou HTTP (URLError, HTTPError)
+            return False
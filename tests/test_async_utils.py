@@ -0,0 +1,111 @@
+import asyncio
+from datetime import date
+import pytest
+from app.database import Base
+from app.database_async import creer_engine_async
+from app.models.client import Client
+from app.models.collaborateur import Collaborateur, Role
+from app.models.contrat import Contrat
+from app.models import evenement  # noqa: F401
+from app.utils import async_utils
+
+
+def test_en_synchrone_execute_la_coroutine():
+    """Vérifie que l'adaptateur synchrone retourne le résultat de la coroutine."""
+
+    async def double(x):
+        await asyncio.sleep(0)
+        return 2 * x
+
+    assert async_utils.en_synchrone(double)(21) == 42
+
+
+def test_driver_asynchrone_absent_message_installation(monkeypatch):
+    """Vérifie qu'un driver asynchrone manquant donne la commande d'installation."""
+
+    def import_impossible(*args, **kwargs):
+        raise ImportError("No module named 'asyncpg'")
+
+    monkeypatch.setattr("app.database_async.create_async_engine", import_impossible)
+    with pytest.raises(ImportError, match="pip install asyncpg"):
+        creer_engine_async("postgresql+asyncpg://u:p@localhost/crm")
+
+
+@pytest.fixture
+def base_async(tmp_path):
+    """
+    Fixture qui crée une base SQLite fichier accessible par aiosqlite
+    (ignorée si aiosqlite n'est pas installé).
+    """
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    engine = creer_engine_async(f"sqlite+aiosqlite:///{tmp_path / 'crm.db'}")
+
+    async def preparer():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        SessionAsync = async_sessionmaker(engine, expire_on_commit=False)
+        async with SessionAsync() as db:
+            db.add(Role(id=1, role="commercial", permissions={}))
+            db.add(
+                Collaborateur(
+                    id=1, nom="Com", email="c@e.fr", mot_de_passe="x", role_id=1
+                )
+            )
+            db.add(
+                Client(
+                    id=1,
+                    nom_complet="Client",
+                    email="cl@e.fr",
+                    telephone="01",
+                    entreprise="E",
+                    date_creation=date.today(),
+                    contact_commercial_id=1,
+                )
+            )
+            await db.commit()
+        return SessionAsync
+
+    SessionAsync = async_utils.en_synchrone(preparer)()
+    yield SessionAsync
+    async_utils.en_synchrone(engine.dispose)()
+
+
+def test_charger_ensemble_en_parallele(base_async):
+    """Vérifie que les recherches indépendantes sont toutes résolues."""
+    trouves = async_utils.charger_ensemble_sync(
+        base_async,
+        client=(Client, 1),
+        support=(Collaborateur, 1),
+        contrat=(Contrat, 99),
+    )
+
+    assert trouves["client"].nom_complet == "Client"
+    assert trouves["support"].email == "c@e.fr"
+    assert trouves["contrat"] is None
+
+
+def test_add_update_delete_table_sync(base_async):
+    """Vérifie les écritures asynchrones à travers l'adaptateur synchrone."""
+    contrat = async_utils.add_table_sync(
+        Contrat,
+        base_async,
+        {
+            "montant_total": 100,
+            "montant_restant": 50,
+            "date_creation": date.today(),
+            "statut_contrat": False,
+            "client_id": 1,
+            "contact_commercial_id": 1,
+        },
+    )
+    maj = async_utils.update_table_sync(
+        Contrat, base_async, contrat["id"], {"montant_restant": 0}
+    )
+    total = async_utils.read_table_sync(Contrat, base_async)
+    async_utils.delete_table_sync(Contrat, base_async, contrat["id"])
+
+    assert maj["montant_restant"] == 0
+    assert total == 1
+    assert async_utils.read_table_sync(Contrat, base_async) == 0
@@ -13,10 +13,14 @@ def test_login_success(monkeypatch, tmp_path):
     - Vérifie la sortie et la création du fichier token.
     """
     token_path = tmp_path / ".token"
+    refresh_path = tmp_path / ".refresh_token"
     # Redirige le chemin du token vers le tmp_path
-    monkeypatch.setattr(auth_cli, "TOKEN_FILE", token_path)
+    monkeypatch.setattr(auth_cli.auth_utils, "TOKEN_FILE", str(token_path))
+    monkeypatch.setattr(auth_cli.auth_utils, "REFRESH_TOKEN_FILE", str(refresh_path))
     # Remplace la fonction login par un fake qui renvoie un token
     monkeypatch.setattr(auth_cli, "login", lambda e, m: "fake_jwt_token")
+    monkeypatch.setattr(auth_cli, "verifier_token", lambda t: {"id": "1"})
+    monkeypatch.setattr(auth_cli, "creer_refresh_token", lambda i: "fake_refresh")
 
     # Appel de la commande CLI
     result = runner.invoke(
@@ -25,8 +29,11 @@ def test_login_success(monkeypatch, tmp_path):
 
     # Vérifie que la commande s'est terminée avec succès
     assert result.exit_code == 0
-    # Vérifie que le token a été écrit
+    # Vérifie que le token et le refresh token ont été écrits
     assert token_path.exists()
+    assert refresh_path.read_text() == "fake_refresh"
+    # Refresh token lisible par l'utilisateur seulement
+    assert refresh_path.stat().st_mode & 0o777 == 0o600
     # Vérifie le message de succès
     assert "Connexion réussie" in result.output
 
@@ -53,6 +60,35 @@ def test_login_failure(monkeypatch, tmp_path):
     assert "Erreur de connexion" in result.output
 
 
+# ------------------- TEST REFRESH -------------------
+def test_refresh(monkeypatch, tmp_path):
+    """
+    Vérifie que la commande 'refresh' remplace le token et le refresh token,
+    et échoue proprement sans refresh token.
+    """
+    token_path = tmp_path / ".token"
+    refresh_path = tmp_path / ".refresh_token"
+    monkeypatch.setattr(auth_cli.auth_utils, "TOKEN_FILE", str(token_path))
+    monkeypatch.setattr(auth_cli.auth_utils, "REFRESH_TOKEN_FILE", str(refresh_path))
+
+    result = runner.invoke(auth_cli.app, ["refresh"])
+    assert result.exit_code == 1
+    assert "Aucun refresh token" in result.output
+
+    refresh_path.write_text("ancien_refresh")
+    refresh_path.chmod(0o644)
+    monkeypatch.setattr(
+        auth_cli, "rafraichir", lambda r: ("nouveau_jwt", f"{r}_renouvele")
+    )
+    result = runner.invoke(auth_cli.app, ["refresh"])
+
+    assert result.exit_code == 0
+    assert "Token renouvelé" in result.output
+    assert token_path.read_text() == "nouveau_jwt"
+    assert refresh_path.read_text() == "ancien_refresh_renouvele"
+    assert refresh_path.stat().st_mode & 0o777 == 0o600
+
+
 # ------------------- TEST LOGOUT -------------------
 def test_logout(monkeypatch, tmp_path):
     """
@@ -63,7 +99,10 @@ def test_logout(monkeypatch, tmp_path):
     """
     token_path = tmp_path / ".token"
     token_path.write_text("abc")  # Crée un token fictif
-    monkeypatch.setattr(auth_cli, "TOKEN_FILE", token_path)
+    monkeypatch.setattr(auth_cli.auth_utils, "TOKEN_FILE", str(token_path))
+    monkeypatch.setattr(
+        auth_cli.auth_utils, "REFRESH_TOKEN_FILE", str(tmp_path / ".refresh_token")
+    )
 
     # Appel de la commande CLI
     result = runner.invoke(auth_cli.app, ["logout"])
@@ -12,8 +12,9 @@ from app.auth import core, utils
 class DummyRole:
     """Classe factice pour simuler un rôle d'utilisateur."""
 
-    def __init__(self, role):
+    def __init__(self, role, permissions=None):
         self.role = role
+        self.permissions = permissions
 
 
 class DummyCollaborateur:
@@ -25,6 +26,7 @@ class DummyCollaborateur:
         self.id = id
         self.email = email
         self.mot_de_passe = mot_de_passe
+        self.role_id = 1
         self.role = DummyRole(role)
 
 
@@ -40,6 +42,9 @@ def fake_db(monkeypatch):
         def __init__(self, user):
             self.user = user
 
+        def options(self, *args):
+            return self
+
         def filter_by(self, **kwargs):
             return self
 
@@ -65,13 +70,13 @@ def fake_db(monkeypatch):
 def test_login_success(monkeypatch, fake_db):
     """
     Vérifie qu’un token JWT est renvoyé pour un utilisateur valide.
-    - Monkeypatch SessionLocal, check_password_hash et SECRET_KEY.
+    - Monkeypatch SessionLocal, verifier_mot_de_passe et SECRET_KEY.
     - Vérifie le contenu décodé du token.
     """
     user = DummyCollaborateur(mot_de_passe="hashed")
 
     monkeypatch.setattr(core, "SessionLocal", lambda: fake_db(user))
-    monkeypatch.setattr(core, "check_password_hash", lambda h, p: True)
+    monkeypatch.setattr(core, "verifier_mot_de_passe", lambda h, p: True)
     monkeypatch.setattr(core, "SECRET_KEY", "test_secret")
 
     token = core.login("test@example.com", "password")
@@ -87,7 +92,7 @@ def test_login_invalid_email(monkeypatch, fake_db):
     - Doit lever ValueError avec le message approprié.
     """
     monkeypatch.setattr(core, "SessionLocal", lambda: fake_db(user=None))
-    monkeypatch.setattr(core, "check_password_hash", lambda h, p: True)
+    monkeypatch.setattr(core, "verifier_mot_de_passe", lambda h, p: True)
     with pytest.raises(ValueError, match="Email ou mot de passe incorrect"):
         core.login("bad@example.com", "password")
 
@@ -99,7 +104,7 @@ def test_login_wrong_password(monkeypatch, fake_db):
     """
     user = DummyCollaborateur(mot_de_passe="hashed")
     monkeypatch.setattr(core, "SessionLocal", lambda: fake_db(user))
-    monkeypatch.setattr(core, "check_password_hash", lambda h, p: False)
+    monkeypatch.setattr(core, "verifier_mot_de_passe", lambda h, p: False)
     with pytest.raises(ValueError, match="Email ou mot de passe incorrect"):
         core.login("test@example.com", "wrongpass")
 
@@ -161,6 +166,22 @@ def test_verifier_token_invalid(monkeypatch, token_file):
         utils.verifier_token("invalid.token")
 
 
+def test_verifier_token_utilise_le_token_fourni(monkeypatch):
+    """
+    Vérifie qu’un token passé en argument est vérifié sans lire le fichier .token.
+    """
+    payload = {
+        "id": "1",
+        "email": "toto@test.com",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+    }
+    token = jwt.encode(payload, "secret", algorithm="HS256")
+    monkeypatch.setattr(utils, "SECRET_KEY", "secret")
+    monkeypatch.setattr(utils, "TOKEN_FILE", "nonexistent.token")
+
+    assert utils.verifier_token(token)["email"] == "toto@test.com"
+
+
 def test_verifier_token_file_missing(monkeypatch):
     """
     Vérifie que l’absence du fichier .token lève une PermissionError.
@@ -182,3 +203,80 @@ def test_logout_remove_token_file(token_file):
     assert os.path.exists(token_file)
     os.remove(token_file)
     assert not os.path.exists(token_file)
+
+
+def test_login_embarque_les_permissions_compilees(monkeypatch, fake_db):
+    """
+    Vérifie que le token contient les masques de bits des permissions du rôle
+    (celles de la base, ou par défaut si elles sont à l'ancien format).
+    """
+    from app.auth.permissions import BITS_ACTIONS, MASQUES_PAR_DEFAUT
+
+    monkeypatch.setattr(core, "verifier_mot_de_passe", lambda h, p: True)
+    monkeypatch.setattr(core, "SECRET_KEY", "test_secret")
+
+    user = DummyCollaborateur(role="support")
+    user.role.permissions = {"read": True, "write": False}
+    monkeypatch.setattr(core, "SessionLocal", lambda: fake_db(user))
+    decoded = jwt.decode(
+        core.login("test@example.com", "pw"), "test_secret", algorithms=["HS256"]
+    )
+    assert decoded["permissions"] == MASQUES_PAR_DEFAUT["support"]
+    assert decoded["role_id"] == 1
+
+    user.role.permissions = {"client": ["lire", "creer"]}
+    decoded_perso = jwt.decode(
+        core.login("test@example.com", "pw"), "test_secret", algorithms=["HS256"]
+    )
+    assert decoded_perso["permissions"] == {
+        "client": BITS_ACTIONS["lire"] | BITS_ACTIONS["creer"]
+    }
+    assert decoded_perso["permissions_empreinte"] != decoded["permissions_empreinte"]
+
+
+def test_methode_de_hachage_et_rehachage(monkeypatch):
+    """
+    Vérifie la comparaison de la méthode d'un hash stocké à la méthode cible
+    (paramètres par défaut complétés, hash au format inconnu ignoré).
+    """
+    from app import config
+    from app.auth.mots_de_passe import doit_rehacher, methode_normalisee
+
+    assert methode_normalisee("scrypt") == "scrypt:32768:8:1"
+    assert methode_normalisee("pbkdf2:sha256:600000") == "pbkdf2:sha256:600000"
+
+    monkeypatch.setattr(config, "PASSWORD_HASH_METHOD", "scrypt")
+    assert not doit_rehacher("scrypt:32768:8:1$sel$hash")
+    assert doit_rehacher("scrypt:16384:8:1$sel$hash")
+    assert doit_rehacher("pbkdf2:sha256:600000$sel$hash")
+    assert not doit_rehacher("hashed")
+
+
+def test_verifier_token_cache_des_claims(monkeypatch):
+    """
+    Vérifie qu'un token déjà vérifié n'est pas redécodé dans le même processus,
+    et qu'un refresh token est refusé comme token d'accès.
+    """
+    monkeypatch.setattr(utils, "SECRET_KEY", "secret")
+    payload = {
+        "id": "1",
+        "email": "cache@test.com",
+        "exp": datetime.now(timezone.utc) + timedelta(minutes=5),
+    }
+    token = jwt.encode(payload, "secret", algorithm="HS256")
+    assert utils.verifier_token(token)["email"] == "cache@test.com"
+
+    def decode_interdit(*args, **kwargs):
+        raise AssertionError("signature revérifiée")
+
+    monkeypatch.setattr(utils.jwt, "decode", decode_interdit)
+    assert utils.verifier_token(token)["email"] == "cache@test.com"
+    monkeypatch.undo()
+
+    monkeypatch.setattr(utils, "SECRET_KEY", "secret")
+    refresh = jwt.encode({**payload, "type": "refresh"}, "secret", algorithm="HS256")
+    with pytest.raises(PermissionError, match="Token invalide"):
+        utils.verifier_token(refresh)
+    assert utils.verifier_refresh_token(refresh)["id"] == "1"
+    with pytest.raises(PermissionError, match="Refresh token invalide"):
+        utils.verifier_refresh_token(token)
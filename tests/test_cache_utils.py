@@ -0,0 +1,131 @@
+import json
+from app.utils.cache_utils import CacheReference
+
+
+def test_obtenir_read_through_et_compteurs(tmp_path):
+    """Vérifie qu'une valeur n'est chargée qu'une fois puis servie par le cache."""
+    cache = CacheReference(str(tmp_path / "cache.json"), ttl=60)
+    chargements = []
+
+    def charger():
+        chargements.append(1)
+        return {"id": 1, "role": "support"}
+
+    assert cache.obtenir("roles:1", charger) == {"id": 1, "role": "support"}
+    assert cache.obtenir("roles:1", charger) == {"id": 1, "role": "support"}
+
+    assert len(chargements) == 1
+    assert cache.stats() == {"hits": 1, "misses": 1, "taux": 0.5, "entrees": 1}
+
+
+def test_cache_partage_entre_invocations(tmp_path):
+    """Vérifie qu'une nouvelle instance (invocation suivante) relit le fichier du cache."""
+    fichier = str(tmp_path / "cache.json")
+    CacheReference(fichier, ttl=60).obtenir("roles:1", lambda: {"id": 1})
+
+    suivante = CacheReference(fichier, ttl=60)
+    valeur = suivante.obtenir("roles:1", lambda: None)
+
+    assert valeur == {"id": 1}
+    assert suivante.stats()["hits"] == 1
+    assert suivante.stats()["misses"] == 1  # Compteurs cumulés
+
+
+def test_succes_sans_ecriture_du_fichier(tmp_path, monkeypatch):
+    """
+    Vérifie qu'un succès n'écrit pas le fichier du cache : ses compteurs sont
+    enregistrés une seule fois, en fin de commande.
+    """
+    fichier = tmp_path / "cache.json"
+    cache = CacheReference(str(fichier), ttl=60)
+    cache.obtenir("roles:1", lambda: {"id": 1})
+    ecritures = []
+    monkeypatch.setattr("app.utils.cache_utils.os.replace", ecritures.append)
+
+    for _ in range(3):
+        assert cache.obtenir("roles:1", lambda: None) == {"id": 1}
+    assert ecritures == []
+
+    monkeypatch.undo()
+    cache.enregistrer_compteurs()
+    cache.enregistrer_compteurs()  # Plus rien à enregistrer
+    assert json.loads(fichier.read_text())["hits"] == 3
+
+
+def test_entree_expiree_et_valeur_introuvable(tmp_path):
+    """Vérifie qu'une entrée expirée est rechargée et qu'un None n'est pas gardé."""
+    cache = CacheReference(str(tmp_path / "cache.json"), ttl=-1)
+
+    cache.obtenir("roles:1", lambda: {"id": 1})
+    cache.obtenir("roles:2", lambda: None)
+
+    assert cache.obtenir("roles:1", lambda: {"id": 1, "role": "gestion"}) == {
+        "id": 1,
+        "role": "gestion",
+    }
+    assert cache.stats()["misses"] == 3
+    assert "roles:2" not in json.loads((tmp_path / "cache.json").read_text())["entrees"]
+
+
+def test_invalider_role_invalide_les_collaborateurs(tmp_path):
+    """Vérifie que modifier un rôle invalide aussi les collaborateurs en cache."""
+    cache = CacheReference(str(tmp_path / "cache.json"), ttl=60)
+    cache.obtenir("roles:1", lambda: {"id": 1})
+    cache.obtenir("collaborateurs:1", lambda: {"id": 1, "role": "support"})
+
+    cache.invalider("collaborateurs")
+    assert list(cache.entrees) == ["roles:1"]
+
+    cache.obtenir("collaborateurs:1", lambda: {"id": 1, "role": "support"})
+    cache.invalider("roles")
+    assert cache.entrees == {}
+
+
+def test_cache_en_memoire_sans_fichier(tmp_path, monkeypatch):
+    """Vérifie que, sans fichier, le cache reste en mémoire et n'écrit rien."""
+    monkeypatch.chdir(tmp_path)
+    cache = CacheReference(None, ttl=60)
+
+    cache.obtenir("roles:1", lambda: {"id": 1})
+    cache.vider()
+
+    assert list(tmp_path.iterdir()) == []
+    assert cache.stats() == {"hits": 0, "misses": 0, "taux": 0.0, "entrees": 0}
+
+
+def test_ecrivain_perime_ne_restaure_pas_une_invalidation(tmp_path):
+    """
+    Vérifie qu'un processus qui a lu le cache avant une invalidation faite
+    ailleurs n'y réécrit pas ses entrées, et que les entrées des autres
+    processus sont fusionnées plutôt qu'écrasées.
+    """
+    fichier = str(tmp_path / "cache.json")
+    CacheReference(fichier, ttl=60).obtenir("roles:1", lambda: {"permissions": {}})
+    ancien = CacheReference(fichier, ttl=60)
+    ancien.obtenir("roles:1", lambda: None)  # Lu avant l'invalidation
+
+    autre = CacheReference(fichier, ttl=60)
+    autre.invalider("roles")
+    autre.obtenir("collaborateurs:1", lambda: {"id": 1})
+    ancien.obtenir("roles:2", lambda: {"permissions": {"client": ["read"]}})
+
+    entrees = json.loads((tmp_path / "cache.json").read_text())["entrees"]
+    assert list(entrees) == ["collaborateurs:1"]
+    assert "roles:1" not in ancien.entrees
+
+    ancien.obtenir("roles:2", lambda: {"permissions": {}})
+    entrees = json.loads((tmp_path / "cache.json").read_text())["entrees"]
+    assert sorted(entrees) == ["collaborateurs:1", "roles:2"]
+
+
+def test_ecriture_impossible_ignoree(tmp_path):
+    """Vérifie qu'un fichier du cache non inscriptible ne fait pas échouer la commande."""
+    cache = CacheReference(str(tmp_path / "absent" / "cache.json"), ttl=60)
+
+    assert cache.obtenir("roles:1", lambda: {"id": 1}) == {"id": 1}
+    assert cache.obtenir("roles:1", lambda: None) == {"id": 1}
+    cache.invalider("roles")
+    cache.enregistrer_compteurs()
+
+    assert cache.stats()["hits"] == 1
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,54 @@
+from app import database
+
+# ------------------- TEST creer_engine -------------------
+# Tests de la fabrique de moteur (aucune connexion n'est ouverte)
+
+
+def test_creer_engine_postgresql_utilise_la_configuration(monkeypatch):
+    """
+    Vérifie que le moteur PostgreSQL est réglé depuis la configuration (.env).
+    """
+    monkeypatch.setattr(database.config, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(database.config, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(database.config, "DB_STATEMENT_TIMEOUT_MS", 1500)
+    monkeypatch.setattr(database.config, "DB_INSERTMANYVALUES_PAGE_SIZE", 250)
+
+    engine = database.creer_engine("postgresql+psycopg2://u:p@localhost:5432/test")
+
+    assert engine.pool.size() == 7
+    assert engine.pool._max_overflow == 3
+    assert engine.pool._pre_ping is True
+    assert engine.dialect.insertmanyvalues_page_size == 250
+    assert engine.dialect.executemany_mode is not None
+    engine.dispose()
+
+
+def test_creer_engine_options_explicites():
+    """
+    Vérifie que les options passées à la fabrique remplacent la configuration,
+    et que les réglages propres à PostgreSQL ne sont pas appliqués à SQLite.
+    """
+    engine = database.creer_engine("sqlite://", echo=True)
+
+    assert engine.echo is True
+    assert engine.dialect.name == "sqlite"
+    engine.dispose()
+
+
+# ------------------- TEST SessionLocal -------------------
+
+
+def test_session_unique_par_commande(monkeypatch):
+    """
+    Vérifie que tous les appels à SessionLocal d'une même commande partagent
+    la même session, jusqu'à `SessionLocal.remove()`.
+    """
+    monkeypatch.setattr(database, "_engine", database.creer_engine("sqlite://"))
+    monkeypatch.setitem(database.SessionLocal.session_factory.kw, "bind", None)
+
+    premiere = database.SessionLocal()
+    assert database.SessionLocal() is premiere
+
+    database.SessionLocal.remove()
+    assert database.SessionLocal() is not premiere
+    database.SessionLocal.remove()
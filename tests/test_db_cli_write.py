@@ -0,0 +1,964 @@
+import gzip
+import json
+import time
+from datetime import date
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import StaticPool
+from typer.testing import CliRunner
+from app.cli import db_cli
+from app.database import Base
+from app.models.client import Client
+from app.models.collaborateur import Collaborateur, Role
+from app.models.contrat import Contrat
+from app.models.evenement import Evenement
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def base_test(monkeypatch):
+    """
+    Fixture qui remplace la base de la CLI par une base SQLite en mémoire.
+    - Crée un commercial (id 1), un client et un contrat qui lui appartiennent.
+    - Monkeypatch `SessionLocal` et `verifier_connexion` (commercial connecté).
+    - Retourne la liste des requêtes SQL exécutées pendant la commande.
+    """
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    SessionTest = scoped_session(sessionmaker(bind=engine))
+    with SessionTest() as db:
+        db.add(Role(id=1, role="commercial", permissions={}))
+        db.add(
+            Collaborateur(id=1, nom="Com", email="c@e.fr", mot_de_passe="x", role_id=1)
+        )
+        db.add(
+            Client(
+                id=1,
+                nom_complet="Client",
+                email="cl@e.fr",
+                telephone="01",
+                entreprise="E",
+                date_creation=date.today(),
+                contact_commercial_id=1,
+            )
+        )
+        db.add(
+            Contrat(
+                id=1,
+                montant_total=100,
+                montant_restant=50,
+                date_creation=date.today(),
+                statut_contrat=False,
+                client_id=1,
+                contact_commercial_id=1,
+            )
+        )
+        db.commit()
+    SessionTest.remove()
+
+    monkeypatch.setattr(db_cli, "SessionLocal", SessionTest)
+    monkeypatch.setattr(
+        "app.utils.db_utils.verifier_connexion",
+        lambda: {"role": "commercial", "id": "1", "email": "c@e.fr"},
+    )
+
+    requetes = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: requetes.append(statement),
+    )
+    yield SessionTest, requetes
+    SessionTest.remove()
+
+
+def test_update_contrat_une_seule_requete(base_test):
+    """
+    Vérifie que update-contrat est un seul UPDATE ... RETURNING, filtré sur le
+    commercial connecté et sur la règle des montants, sans lecture préalable.
+    """
+    SessionTest, requetes = base_test
+
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "1", "--montant-restant", "10"]
+    )
+
+    assert result.exit_code == 0
+    assert "mis à jour avec succès" in result.output
+    assert len(requetes) == 1
+    assert requetes[0].lstrip().upper().startswith("UPDATE CONTRATS")
+    assert "contact_commercial_id" in requetes[0]
+    assert "RETURNING" in requetes[0]
+    assert SessionTest().get(Contrat, 1).montant_restant == 10
+
+
+def test_update_contrat_invalide_annule_la_transaction(base_test):
+    """
+    Vérifie qu'une validation en échec (montant restant > total) n'écrit rien.
+    """
+    SessionTest, requetes = base_test
+
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "1", "--montant-restant", "500"]
+    )
+
+    assert result.exit_code != 0
+    assert "ne peut pas dépasser montant_total" in result.output
+    assert SessionTest().get(Contrat, 1).montant_restant == 50
+
+
+def test_ecritures_limitees_au_proprietaire(base_test):
+    """
+    Vérifie qu'un commercial ne modifie ni ne supprime le contrat ou le client
+    d'un autre commercial : la condition de propriétaire est dans la requête.
+    """
+    SessionTest, requetes = base_test
+    with SessionTest() as db:
+        db.add(
+            Collaborateur(
+                id=2, nom="Autre", email="a@e.fr", mot_de_passe="x", role_id=1
+            )
+        )
+        db.add(
+            Contrat(
+                id=2,
+                montant_total=100,
+                montant_restant=50,
+                date_creation=date.today(),
+                statut_contrat=True,
+                client_id=1,
+                contact_commercial_id=2,
+            )
+        )
+        db.commit()
+    SessionTest.remove()
+    requetes.clear()
+
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "2", "--montant-restant", "0"]
+    )
+    assert "vos propres clients" in result.output
+    result = runner.invoke(
+        db_cli.app,
+        [
+            "add-evenement",
+            "2024-01-01",
+            "2024-01-02",
+            "Lyon",
+            "20",
+            "10",
+            "--contrat-id",
+            "2",
+        ],
+    )
+    assert "vos propres clients" in result.output
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "99", "--montant-restant", "0"]
+    )
+    assert "introuvable" in result.output
+
+    with SessionTest() as db:
+        assert db.get(Contrat, 2).montant_restant == 50
+        assert db.query(Evenement).count() == 0
+    ecritures = [
+        r for r in requetes if r.lstrip().upper().startswith(("UPDATE", "INSERT"))
+    ]
+    assert all("contact_commercial_id" in r for r in ecritures)
+
+
+# ------------------- TEST db import -------------------
+
+
+def test_import_contrats_csv_par_lots(base_test, tmp_path):
+    """
+    Vérifie l'import CSV : lignes valides écrites par lots, lignes invalides
+    (montants, client inconnu) écrites dans le fichier de rejets.
+    """
+    SessionTest, requetes = base_test
+    fichier = tmp_path / "contrats.csv"
+    fichier.write_text(
+        "montant_total,montant_restant,statut_contrat,client_id\n"
+        "1000,500,true,1\n"
+        "1000,5000,false,1\n"
+        "200,0,false,99\n"
+        "300,100,,1\n",
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(
+        db_cli.app, ["import", "contrats", str(fichier), "--batch-size", "2"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "2 ligne(s) importée(s)" in result.output
+    contrats = SessionTest().query(Contrat).order_by(Contrat.id).all()
+    assert [c.montant_total for c in contrats] == [100, 1000, 300]
+    assert all(c.contact_commercial_id == 1 for c in contrats)
+
+    rejets = [
+        json.loads(ligne)
+        for ligne in (tmp_path / "contrats.csv.rejets.jsonl").read_text().splitlines()
+    ]
+    assert [r["ligne"] for r in rejets] == [2, 3]
+    assert "montant_restant" in rejets[0]["erreur"]
+    assert "Client 99 introuvable" in rejets[1]["erreur"]
+    # Deux lots : un INSERT groupé par lot
+    inserts = [r for r in requetes if r.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+
+
+def test_import_clients_contact_commercial_verifie(base_test, tmp_path, monkeypatch):
+    """
+    Vérifie que le contact commercial indiqué dans le fichier (par un rôle
+    autorisé à créer des clients, autre que commercial) doit exister et avoir
+    le rôle commercial.
+    """
+    from app.auth.permissions import compiler_permissions
+
+    SessionTest, _ = base_test
+    with SessionTest() as db:
+        db.add(Role(id=2, role="support", permissions={}))
+        db.add(
+            Collaborateur(id=2, nom="Sup", email="s@e.fr", mot_de_passe="x", role_id=2)
+        )
+        db.commit()
+    monkeypatch.setattr(
+        "app.utils.db_utils.verifier_connexion",
+        lambda: {
+            "role": "gestion",
+            "id": "1",
+            "email": "g@e.fr",
+            "permissions": compiler_permissions({"client": ["creer"]}),
+        },
+    )
+    fichier = tmp_path / "clients.csv"
+    fichier.write_text(
+        "nom_complet,email,telephone,entreprise,contact_commercial_id\n"
+        "A,a@e.fr,01,E,1\n"
+        "B,b@e.fr,02,E,2\n"
+        "C,c@e.fr,03,E,99\n"
+        "D,d@e.fr,04,E,\n",
+        encoding="utf-8",
+    )
+    rejets = tmp_path / "rejets.jsonl"
+
+    result = runner.invoke(
+        db_cli.app, ["import", "clients", str(fichier), "--rejets", str(rejets)]
+    )
+
+    assert result.exit_code == 0, result.output
+    clients = SessionTest().query(Client).filter(Client.id > 1).order_by(Client.id)
+    assert [(c.nom_complet, c.contact_commercial_id) for c in clients] == [
+        ("A", 1),
+        ("D", None),
+    ]
+    assert clients[0].date_creation == date.today()
+    erreurs = [json.loads(ligne)["erreur"] for ligne in rejets.read_text().splitlines()]
+    assert erreurs == [
+        "Le collaborateur 2 n'a pas le rôle commercial",
+        "Collaborateur 99 non trouvé",
+    ]
+
+
+def test_import_clients_jsonl_reprise(base_test, tmp_path):
+    """
+    Vérifie l'import JSONL (le commercial connecté devient le contact) et la
+    reprise avec --skip, qui ignore les lignes déjà importées.
+    """
+    SessionTest, _ = base_test
+    fichier = tmp_path / "clients.jsonl"
+    fichier.write_text(
+        '{"nom_complet": "A", "email": "a@e.fr", "telephone": "01", "entreprise": "E"}\n'
+        '{"nom_complet": "B", "email": "pas-un-email", "telephone": "02", "entreprise": "E"}\n'
+        "{pas du json}\n"
+        '{"nom_complet": "C", "email": "c@e.fr", "telephone": "03", "entreprise": "E"}\n',
+        encoding="utf-8",
+    )
+    rejets = tmp_path / "rejets.jsonl"
+
+    result = runner.invoke(
+        db_cli.app,
+        ["import", "clients", str(fichier), "--skip", "1", "--rejets", str(rejets)],
+    )
+
+    assert result.exit_code == 0, result.output
+    clients = SessionTest().query(Client).order_by(Client.id).all()
+    assert [c.nom_complet for c in clients] == ["Client", "C"]
+    assert clients[1].contact_commercial_id == 1
+    assert len(rejets.read_text().splitlines()) == 2
+
+
+def test_import_collaborateurs_hachage_parallele(base_test, tmp_path, monkeypatch):
+    """
+    Vérifie l'import de collaborateurs : mots de passe hachés par le pool de
+    processus, un INSERT groupé, rôle inconnu rejeté sans recopier le mot de passe.
+    """
+    from app import config
+    from app.auth.mots_de_passe import verifier_mot_de_passe
+
+    SessionTest, requetes = base_test
+    monkeypatch.setattr(
+        "app.utils.db_utils.verifier_connexion",
+        lambda: {"role": "gestion", "id": "1", "email": "g@e.fr"},
+    )
+    monkeypatch.setattr(config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    monkeypatch.setattr(config, "PASSWORD_HASH_WORKERS", 2)
+    fichier = tmp_path / "equipe.csv"
+    fichier.write_text(
+        "nom,email,mot_de_passe,role_id\n"
+        "Ana,ana@e.fr,secret-a,1\n"
+        "Bob,bob@e.fr,secret-b,99\n"
+        "Eve,eve@e.fr,secret-e,1\n",
+        encoding="utf-8",
+    )
+    rejets = tmp_path / "rejets.jsonl"
+
+    result = runner.invoke(
+        db_cli.app, ["import", "collaborateurs", str(fichier), "--rejets", str(rejets)]
+    )
+
+    assert result.exit_code == 0, result.output
+    ajoutes = SessionTest().query(Collaborateur).filter(Collaborateur.id > 1).all()
+    assert [c.nom for c in ajoutes] == ["Ana", "Eve"]
+    assert verifier_mot_de_passe(ajoutes[0].mot_de_passe, "secret-a")
+    assert ajoutes[0].mot_de_passe.startswith("pbkdf2:sha256:1000$")
+    rejet = json.loads(rejets.read_text())
+    assert "Role 99 introuvable" in rejet["erreur"]
+    assert rejet["donnees"]["mot_de_passe"] == "***"
+    inserts = [r for r in requetes if r.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+
+
+def test_import_collaborateurs_un_pool_par_import(base_test, tmp_path, monkeypatch):
+    """
+    Vérifie que les processus de hachage sont démarrés une seule fois pour
+    tout l'import, quel que soit le nombre de lots, puis arrêtés à la fin.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app import config
+    from app.auth import mots_de_passe
+
+    pools = []
+
+    class PoolEspion(ThreadPoolExecutor):
+        def __init__(self, max_workers):
+            super().__init__(max_workers)
+            pools.append(self)
+
+    monkeypatch.setattr(
+        "app.utils.db_utils.verifier_connexion",
+        lambda: {"role": "gestion", "id": "1", "email": "g@e.fr"},
+    )
+    monkeypatch.setattr(config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+    monkeypatch.setattr(config, "PASSWORD_HASH_WORKERS", 2)
+    monkeypatch.setattr(mots_de_passe, "ProcessPoolExecutor", PoolEspion)
+    fichier = tmp_path / "equipe.csv"
+    fichier.write_text(
+        "nom,email,mot_de_passe,role_id\n"
+        + "".join(f"N{i},n{i}@e.fr,secret-{i},1\n" for i in range(6)),
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(
+        db_cli.app, ["import", "collaborateurs", str(fichier), "--batch-size", "2"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Lot validé jusqu'à la ligne 6" in result.output
+    assert len(pools) == 1
+    assert pools[0]._shutdown
+    assert mots_de_passe._executeur is None
+
+
+def test_import_copy_lot_refuse_rejoue_ligne_par_ligne(
+    base_test, tmp_path, monkeypatch
+):
+    """
+    Vérifie qu'avec --copy, une erreur psycopg2 sur le lot (email en double) est
+    convertie en IntegrityError : le lot est rejoué ligne par ligne et seule la
+    ligne fautive est rejetée. Une ligne JSONL qui n'est pas un objet est rejetée.
+    """
+    import psycopg2.errors
+    from types import SimpleNamespace
+    from app.utils import import_utils
+
+    class CurseurCopy:
+        def copy_expert(self, instruction, tampon):
+            raise psycopg2.errors.UniqueViolation("duplicate key value")
+
+        def close(self):
+            pass
+
+    connexion = SimpleNamespace(connection=SimpleNamespace(cursor=CurseurCopy))
+    copy_rows = import_utils.copy_rows
+    monkeypatch.setattr(import_utils, "copy_disponible", lambda db: True)
+    monkeypatch.setattr(
+        import_utils,
+        "copy_rows",
+        lambda db, modele, lignes: copy_rows(
+            SimpleNamespace(connection=lambda: connexion), modele, lignes
+        ),
+    )
+    SessionTest, _ = base_test
+    fichier = tmp_path / "clients.jsonl"
+    fichier.write_text(
+        '{"nom_complet": "A", "email": "a@e.fr", "telephone": "01", "entreprise": "E"}\n'
+        '["pas", "un", "objet"]\n'
+        '{"nom_complet": "B", "email": "cl@e.fr", "telephone": "02", "entreprise": "E"}\n',
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(db_cli.app, ["import", "clients", str(fichier), "--copy"])
+
+    assert result.exit_code == 0, result.output
+    assert "1 ligne(s) importée(s)" in result.output
+    clients = SessionTest().query(Client).order_by(Client.id).all()
+    assert [c.nom_complet for c in clients] == ["Client", "A"]
+    rejets = [
+        json.loads(ligne)
+        for ligne in (tmp_path / "clients.jsonl.rejets.jsonl").read_text().splitlines()
+    ]
+    assert [(r["ligne"], r["erreur"]) for r in rejets][0] == (2, "Objet JSON attendu")
+    assert rejets[1]["ligne"] == 3
+    assert "UNIQUE" in rejets[1]["erreur"]
+
+
+def test_import_table_inconnue(base_test, tmp_path):
+    """Vérifie que seules les tables déclarées dans IMPORTS sont importables."""
+    fichier = tmp_path / "roles.csv"
+    fichier.write_text("role\nadmin\n", encoding="utf-8")
+
+    result = runner.invoke(db_cli.app, ["import", "roles", str(fichier)])
+
+    assert result.exit_code != 0
+
+
+def test_import_evenements_contrat_non_signe(base_test, tmp_path):
+    """Vérifie que les règles de add-evenement s'appliquent : contrat signé obligatoire."""
+    SessionTest, _ = base_test
+    fichier = tmp_path / "evenements.csv"
+    fichier.write_text(
+        "date_debut,date_fin,lieu,participants,attendues,contrat_id\n"
+        "2025-12-01 10:00,2025-12-01 18:00,Paris,100,80,1\n",
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(db_cli.app, ["import", "evenements", str(fichier)])
+
+    assert result.exit_code == 0, result.output
+    assert "0 ligne(s) importée(s)" in result.output
+    rejet = json.loads((tmp_path / "evenements.csv.rejets.jsonl").read_text())
+    assert rejet["erreur"] == "Contrat 1 non signé"
+
+
+def test_import_contrats_client_sans_commercial(base_test, tmp_path):
+    """Vérifie qu'un contrat dont le client n'a pas de commercial est rejeté sans erreur."""
+    SessionTest, _ = base_test
+    with SessionTest() as db:
+        db.add(
+            Client(
+                id=2,
+                nom_complet="Sans commercial",
+                email="sc@e.fr",
+                telephone="02",
+                entreprise="E",
+                date_creation=date.today(),
+            )
+        )
+        db.commit()
+    SessionTest.remove()
+    fichier = tmp_path / "contrats.csv"
+    fichier.write_text(
+        "montant_total,montant_restant,statut_contrat,client_id\n100,0,true,2\n",
+        encoding="utf-8",
+    )
+
+    result = runner.invoke(db_cli.app, ["import", "contrats", str(fichier)])
+
+    assert result.exit_code == 0, result.output
+    rejet = json.loads((tmp_path / "contrats.csv.rejets.jsonl").read_text())
+    assert rejet["erreur"] == "Client 2 sans contact commercial"
+
+
+# ------------------- TEST db export -------------------
+
+
+def test_export_contrats_gzip_filtre_par_role(base_test, tmp_path):
+    """
+    Vérifie l'export CSV compressé (gzip déduit de l'extension) et le filtrage
+    par rôle : un commercial n'exporte que ses propres contrats.
+    """
+    SessionTest, _ = base_test
+    with SessionTest() as db:
+        db.add(
+            Collaborateur(
+                id=2, nom="Autre", email="a@e.fr", mot_de_passe="x", role_id=1
+            )
+        )
+        db.add(
+            Contrat(
+                id=2,
+                montant_total=300,
+                montant_restant=0,
+                date_creation=date.today(),
+                client_id=1,
+                contact_commercial_id=2,
+            )
+        )
+        db.commit()
+    SessionTest.remove()
+    sortie = tmp_path / "contrats.csv.gz"
+
+    result = runner.invoke(
+        db_cli.app,
+        ["export", "contrats", "-o", str(sortie), "--columns", "id,montant_total"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "1 ligne(s) exportée(s)" in result.output
+    with gzip.open(sortie, "rt", encoding="utf-8") as fichier:
+        assert fichier.read().splitlines() == ["id,montant_total", "1,100.0"]
+
+
+def test_export_clients_jsonl_sortie_standard(base_test):
+    """Vérifie l'export JSONL vers la sortie standard."""
+    result = runner.invoke(db_cli.app, ["export", "clients", "--format", "jsonl"])
+
+    assert result.exit_code == 0, result.output
+    client = json.loads(result.stdout.splitlines()[0])
+    assert client["nom_complet"] == "Client"
+    assert client["contact_commercial_id"] == 1
+
+
+def test_export_sortie_standard_sans_messages(base_test, monkeypatch):
+    """
+    Vérifie que l'export vers la sortie standard ne contient que les données :
+    le panneau de connexion passe sur la sortie d'erreur (CSV et gzip lisibles).
+    """
+    from app.utils import db_utils
+
+    def connexion():
+        db_utils.console.print("Utilisateur connecté : c@e.fr (commercial)")
+        return {"role": "commercial", "id": "1", "email": "c@e.fr"}
+
+    monkeypatch.setattr(db_utils, "verifier_connexion", connexion)
+
+    result = runner.invoke(
+        db_cli.app, ["export", "contrats", "--columns", "id,montant_total"]
+    )
+    assert result.exit_code == 0, result.output
+    assert result.stdout.splitlines() == ["id,montant_total", "1,100.0"]
+    assert "Utilisateur connecté" in result.stderr
+
+    result = runner.invoke(
+        db_cli.app,
+        ["export", "contrats", "--columns", "id", "--compression", "gzip"],
+    )
+    assert result.exit_code == 0, result.output
+    assert gzip.decompress(result.stdout_bytes).decode().splitlines() == ["id", "1"]
+
+
+# ------------------- TEST db explain -------------------
+
+
+def test_explain_les_filtres_utilisent_les_index(base_test):
+    """
+    Vérifie que db explain affiche un plan par requête et que les filtres
+    (propriétaire, sans support, non payés) passent par les index des modèles.
+    """
+    result = runner.invoke(db_cli.app, ["explain"])
+
+    assert result.exit_code == 0, result.output
+    assert "filter-contrats --non-payes (commercial) — index utilisé" in result.output
+    assert "filter-evenements --sans-support — index utilisé" in result.output
+    assert "ix_contrats_non_payes" in result.output
+    assert "ix_contrats_commercial_statut" in result.output
+
+
+def test_explain_requetes_page_suivante():
+    """Vérifie que la requête « page suivante » reprend après un id, avec la taille d'une page."""
+    from app.utils.db_utils import DEFAULT_PAGE_SIZE
+    from app.utils.requetes_utils import requetes_cli
+
+    requetes = requetes_cli({"id": "1", "role": "gestion"})
+
+    for libelle in (
+        "read-clients (page suivante)",
+        "read-contrats --with-relations",
+    ):
+        parametres = requetes[libelle].compile().params
+        assert list(parametres.values()) == [1, DEFAULT_PAGE_SIZE], libelle
+
+
+def test_explain_ferme_la_session_si_un_plan_echoue(base_test, monkeypatch):
+    """Vérifie que la session est fermée même si un EXPLAIN échoue (ex : délai dépassé)."""
+    fermetures = []
+
+    class SessionEspion:
+        remove = staticmethod(lambda: None)  # Appelé en fin de commande
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            fermetures.append(exc[0])
+
+    def plan_execution(db, requete, analyze):
+        raise TimeoutError
+
+    monkeypatch.setattr(db_cli, "SessionLocal", SessionEspion)
+    monkeypatch.setattr(db_cli, "plan_execution", plan_execution)
+
+    result = runner.invoke(db_cli.app, ["explain"])
+
+    assert isinstance(result.exception, TimeoutError)
+    assert fermetures == [TimeoutError]
+
+
+# ------------------- TEST chargement des relations (N+1) -------------------
+
+
+def test_read_contrats_with_relations_nombre_de_requetes_fixe(base_test):
+    """
+    Vérifie que read-contrats --with-relations affiche le nom du client avec une
+    seule requête par page, quel que soit le nombre de contrats.
+    """
+    SessionTest, requetes = base_test
+    with SessionTest() as db:
+        db.add_all(
+            Contrat(
+                montant_total=10 * i,
+                montant_restant=0,
+                date_creation=date.today(),
+                client_id=1,
+                contact_commercial_id=1,
+            )
+            for i in range(1, 30)
+        )
+        db.commit()
+    SessionTest.remove()
+    requetes.clear()
+
+    result = runner.invoke(
+        db_cli.app,
+        ["read-contrats", "--with-relations", "--columns", "id,montant_total"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "client" in result.output and "Client" in result.output
+    selects = [r for r in requetes if r.lstrip().upper().startswith("SELECT")]
+    assert len(selects) == 1
+    assert "JOIN" in selects[0].upper()
+
+
+def test_read_et_filter_formats_de_sortie(base_test):
+    """
+    Vérifie les formats --format : hors terminal, tsv par défaut ; json et jsonl
+    valides ; les messages (connexion, titre) restent hors de la sortie standard.
+    """
+    result = runner.invoke(db_cli.app, ["read-clients", "--columns", "id,nom_complet"])
+    assert result.exit_code == 0, result.output
+    assert result.stdout == "id\tnom_complet\n1\tClient\n"
+    assert "Lecture des clients" in result.stderr
+
+    result = runner.invoke(db_cli.app, ["read-contrats", "--format", "json"])
+    assert result.exit_code == 0, result.output
+    contrats = json.loads(result.stdout)
+    assert [(c["id"], c["montant_total"]) for c in contrats] == [(1, 100.0)]
+
+    result = runner.invoke(
+        db_cli.app, ["filter-contrats", "--non-signe", "--format", "jsonl"]
+    )
+    assert result.exit_code == 0, result.output
+    assert [json.loads(ligne)["id"] for ligne in result.stdout.splitlines()] == [1]
+
+    result = runner.invoke(db_cli.app, ["read-clients", "--format", "rich"])
+    assert "Lecture des clients" in result.stdout
+    assert "Client (page 1)" in result.stdout
+
+    # Hors terminal, --pager affiche le tableau habituel
+    result = runner.invoke(db_cli.app, ["read-clients", "--format", "rich", "--pager"])
+    assert result.exit_code == 0, result.output
+    assert "Client (page 1)" in result.stdout
+
+    result = runner.invoke(db_cli.app, ["read-clients", "--format", "xml"])
+    assert result.exit_code != 0
+
+
+def test_login_et_repr_sans_chargement_paresseux(base_test, monkeypatch):
+    """
+    Vérifie que login lit le collaborateur et son rôle en une requête, et que
+    __repr__ d'un contrat ou d'un collaborateur n'émet aucune requête.
+    """
+    from app.auth import core
+
+    SessionTest, requetes = base_test
+    monkeypatch.setattr(core, "SessionLocal", SessionTest)
+    monkeypatch.setattr(core, "verifier_mot_de_passe", lambda h, p: True)
+    monkeypatch.setattr(core, "SECRET_KEY", "test_secret")
+    requetes.clear()
+
+    assert core.login("c@e.fr", "x")
+    assert len(requetes) == 1
+
+    db = SessionTest()
+    contrat = db.get(Contrat, 1)
+    collaborateur = db.get(Collaborateur, 1)
+    requetes.clear()
+    assert repr(contrat) == "<Contrat(id=1, client=1, signe=False)>"
+    assert repr(collaborateur) == "<Collaborateur(nom=Com, role=1)>"
+    assert requetes == []
+
+
+def test_login_rehache_le_mot_de_passe(base_test, monkeypatch):
+    """
+    Vérifie qu'une connexion réussie remplace un hash aux anciens paramètres par
+    la méthode configurée, et qu'un hash à jour n'est pas recalculé.
+    """
+    from app import config
+    from app.auth import core
+    from app.auth.mots_de_passe import hacher_mot_de_passe
+
+    SessionTest, requetes = base_test
+    monkeypatch.setattr(core, "SessionLocal", SessionTest)
+    monkeypatch.setattr(core, "SECRET_KEY", "test_secret")
+    monkeypatch.setattr(config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:2000")
+    monkeypatch.setattr(config, "PASSWORD_REHASH_ARRIERE_PLAN", False)
+    with SessionTest() as db:
+        db.get(Collaborateur, 1).mot_de_passe = hacher_mot_de_passe(
+            "secret", "pbkdf2:sha256:1000"
+        )
+        db.commit()
+
+    assert core.login("c@e.fr", "secret")
+    with SessionTest() as db:
+        nouveau = db.get(Collaborateur, 1).mot_de_passe
+    assert nouveau.startswith("pbkdf2:sha256:2000$")
+
+    requetes.clear()
+    assert core.login("c@e.fr", "secret")
+    assert len(requetes) == 1  # Hash à jour : lecture seule, pas d'UPDATE
+
+
+def test_renouvellement_automatique_du_token(base_test, tmp_path, monkeypatch):
+    """
+    Vérifie qu'un token proche de l'expiration est renouvelé sans mot de passe
+    avec le refresh token, et que les fichiers locaux sont mis à jour.
+    """
+    from app.auth import core, utils
+
+    SessionTest, _ = base_test
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(core, "SessionLocal", SessionTest)
+    monkeypatch.setattr(core, "SECRET_KEY", "test_secret")
+    monkeypatch.setattr(utils, "SECRET_KEY", "test_secret")
+    monkeypatch.setattr(utils, "TOKEN_FILE", ".token")
+    with SessionTest() as db:
+        token = core.creer_token_acces(db.get(Collaborateur, 1), expire_minutes=1)
+    utils.enregistrer_tokens(token, core.creer_refresh_token(1))
+
+    nouveau = core.rafraichir_si_necessaire(token)
+
+    assert nouveau != token
+    assert (tmp_path / ".token").read_text() == nouveau
+    payload = utils.verifier_token(nouveau)
+    assert payload["role"] == "commercial"
+    assert payload["exp"] - time.time() > 30 * 60
+    # Un token encore loin de l'expiration est gardé tel quel
+    assert core.rafraichir_si_necessaire(nouveau) == nouveau
+
+
+def test_profile_resume_sql_de_la_commande(base_test, tmp_path, monkeypatch):
+    """
+    Vérifie que `--profile` compte les requêtes de la commande, affiche le résumé
+    et écrit la ligne JSON dans le fichier DB_PROFILE_LOG.
+    """
+    from app import config
+    from app.cli.__main__ import app
+
+    _, requetes = base_test
+    journal = tmp_path / "profil.jsonl"
+    monkeypatch.setattr(config, "DB_PROFILE_LOG", str(journal))
+
+    result = runner.invoke(
+        app, ["--profile", "db", "update-contrat", "1", "--montant-restant", "10"]
+    )
+
+    assert result.exit_code == 0
+    assert "Profil SQL" in result.output
+    resume = json.loads(journal.read_text().strip())
+    assert resume["commande"] == "db update-contrat"
+    assert resume["requetes"] == len(requetes)
+    assert 1 <= len(resume["plus_lentes"]) <= 5
+    assert any(r["sql"].startswith("UPDATE contrats") for r in resume["plus_lentes"])
+
+
+def test_update_contrat_commercial_verifie_par_le_cache(
+    base_test, tmp_path, monkeypatch
+):
+    """
+    Vérifie que le nouveau commercial d'un contrat est lu une seule fois (cache de
+    référence), qu'un collaborateur d'un autre rôle est refusé et que
+    update-collaborateur invalide le cache.
+    """
+    from app.utils import cache_utils
+
+    SessionTest, requetes = base_test
+    monkeypatch.setattr(
+        cache_utils,
+        "_cache",
+        cache_utils.CacheReference(str(tmp_path / "cache.json"), ttl=60),
+    )
+    with SessionTest() as db:
+        db.add(Role(id=2, role="support", permissions={}))
+        db.add(
+            Collaborateur(id=2, nom="Sup", email="s@e.fr", mot_de_passe="x", role_id=2)
+        )
+        db.commit()
+    SessionTest.remove()
+
+    def lectures_collaborateur():
+        return [r for r in requetes if "FROM collaborateurs" in r]
+
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "1", "--contact-commercial-id", "2"]
+    )
+    assert "n'a pas le rôle commercial" in result.output
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "1", "--contact-commercial-id", "2"]
+    )
+    assert "n'a pas le rôle commercial" in result.output
+    assert len(lectures_collaborateur()) == 1
+    assert cache_utils.get_cache().stats()["hits"] == 1
+
+    monkeypatch.setattr(
+        "app.utils.db_utils.verifier_connexion",
+        lambda: {"role": "gestion", "id": "1", "email": "c@e.fr"},
+    )
+    runner.invoke(db_cli.app, ["update-collaborateur", "2", "--role-id", "1"])
+    result = runner.invoke(
+        db_cli.app, ["update-contrat", "1", "--contact-commercial-id", "2"]
+    )
+
+    assert result.exit_code == 0
+    assert "mis à jour avec succès" in result.output
+    with SessionTest() as db:
+        assert db.get(Contrat, 1).contact_commercial_id == 2
+
+
+def test_update_role_permissions_refuse_les_anciens_tokens(
+    base_test, tmp_path, monkeypatch
+):
+    """
+    Vérifie que update-role --permissions enregistre les permissions et que les
+    tokens émis avant la modification sont refusés (reconnexion demandée).
+    """
+    from app.auth.permissions import empreinte_permissions, get_default_permissions
+    from app.utils import cache_utils
+
+    SessionTest, _ = base_test
+    monkeypatch.setattr(
+        cache_utils,
+        "_cache",
+        cache_utils.CacheReference(str(tmp_path / "cache.json"), ttl=60),
+    )
+    ancien_token = {
+        "role": "commercial",
+        "id": "1",
+        "email": "c@e.fr",
+        "role_id": 1,
+        "permissions_empreinte": empreinte_permissions(
+            get_default_permissions("commercial")
+        ),
+    }
+    monkeypatch.setattr(
+        "app.utils.db_utils.verifier_connexion",
+        lambda: {"role": "gestion", "id": "9", "email": "g@e.fr"},
+    )
+
+    result = runner.invoke(
+        db_cli.app, ["update-role", "1", "--permissions", '{"oups": ["lire"]}']
+    )
+    assert result.exit_code != 0
+    result = runner.invoke(
+        db_cli.app,
+        [
+            "update-role",
+            "1",
+            "--permissions",
+            '{"client": ["lire"], "contrat": ["lire"]}',
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    with SessionTest() as db:
+        assert db.get(Role, 1).permissions == {"client": ["lire"], "contrat": ["lire"]}
+
+    monkeypatch.setattr("app.utils.db_utils.verifier_connexion", lambda: ancien_token)
+    result = runner.invoke(db_cli.app, ["read-clients"])
+
+    assert result.exit_code == 1
+    assert "permissions de votre rôle ont changé" in result.output
+
+
+def test_permissions_retirees_depuis_une_autre_machine(
+    base_test, tmp_path, monkeypatch
+):
+    """
+    Vérifie que des permissions vides ({}) retirent tous les droits du rôle, et
+    qu'un rôle modifié hors de la CLI locale (cache vide) périme les anciens tokens.
+    """
+    from app.auth.permissions import (
+        compiler_permissions,
+        empreinte_permissions,
+        get_default_permissions,
+        permissions_effectives,
+    )
+    from app.utils import cache_utils
+
+    assert permissions_effectives("commercial", {}) == {}
+    assert permissions_effectives("commercial", None) == get_default_permissions(
+        "commercial"
+    )
+
+    SessionTest, _ = base_test
+    with SessionTest() as db:
+        db.get(Role, 1).permissions = get_default_permissions("commercial")
+        db.commit()
+    SessionTest.remove()
+    monkeypatch.setattr(
+        cache_utils,
+        "_cache",
+        cache_utils.CacheReference(str(tmp_path / "cache.json"), ttl=60),
+    )
+    permissions = get_default_permissions("commercial")
+    token = {
+        "role": "commercial",
+        "id": "1",
+        "email": "c@e.fr",
+        "role_id": 1,
+        "permissions": compiler_permissions(permissions),
+        "permissions_empreinte": empreinte_permissions(permissions),
+    }
+    monkeypatch.setattr("app.utils.db_utils.verifier_connexion", lambda: token)
+    result = runner.invoke(db_cli.app, ["read-clients", "--format", "tsv"])
+    assert result.exit_code == 0, result.output
+
+    # Révocation écrite par un autre poste : le cache local ignore la modification
+    with SessionTest() as db:
+        db.get(Role, 1).permissions = {}
+        db.commit()
+    SessionTest.remove()
+    monkeypatch.setattr(
+        cache_utils,
+        "_cache",
+        cache_utils.CacheReference(str(tmp_path / "autre.json"), ttl=60),
+    )
+    result = runner.invoke(db_cli.app, ["read-clients"])
+
+    assert result.exit_code == 1
+    assert "permissions de votre rôle ont changé" in result.output
@@ -5,6 +5,8 @@ import typer
 
 from app.utils import db_utils
 
+# Enregistre tous les modèles (relations entre tables) pour les tests SQLite
+from app.models import client, collaborateur, contrat, evenement  # noqa: F401
 
 # ------------------- TEST validate_* -------------------
 # Tests pour les fonctions de validation : email, nombres positifs, dates, participants, montants
@@ -114,21 +116,51 @@ def test_verifier_permission_denied(mock_console, mock_connexion):
     mock_console.assert_called()
 
 
+@patch(
+    "app.utils.db_utils.verifier_connexion",
+    return_value={"role": "support", "permissions": {"client": 0b0011}},
+)
+@patch("app.utils.db_utils.console.print")
+def test_verifier_permission_masques_du_token(mock_console, mock_connexion):
+    """Vérifie que les masques de bits embarqués dans le JWT priment sur les défauts."""
+    assert db_utils.verifier_permission("creer", "client")
+    assert not db_utils.verifier_permission("modifier", "client")
+    assert not db_utils.verifier_permission("lire", "evenement")
+
+
+@patch(
+    "app.utils.db_utils.verifier_connexion",
+    return_value={"role": "commercial", "id": 1},
+)
+@patch("app.utils.db_utils.console.print")
+def test_contexte_auth_verifie_le_token_une_fois(mock_console, mock_connexion):
+    """Vérifie que le contexte d'authentification ne décode le token qu'une fois."""
+    contexte = db_utils.ContexteAuth()
+    assert db_utils.verifier_permission("creer", "client", contexte)
+    assert db_utils.verifier_permission("lire", "contrat", contexte)
+    assert contexte.payload["id"] == 1
+    mock_connexion.assert_called_once()
+
+    contexte.invalider()
+    contexte.payload
+    assert mock_connexion.call_count == 2
+
+
 # ------------------- TEST log_sentry -------------------
 # Tests pour le décorateur log_sentry, capture de messages et exceptions Sentry
 
 
-@patch("app.utils.db_utils.sentry_sdk.capture_message")
+@patch("app.utils.db_utils.evenement_metier")
 @patch("app.utils.db_utils.sentry_sdk.capture_exception")
 def test_log_sentry_success(mock_exception, mock_message):
-    """Vérifie que le message Sentry est capturé lors de l'exécution réussie."""
+    """Vérifie que l'événement métier est enregistré lors de l'exécution réussie."""
 
     @db_utils.log_sentry("Résultat : {result}")
     def f():
         return "OK"
 
     assert f() == "OK"
-    mock_message.assert_called()
+    mock_message.assert_called_once_with("Résultat : OK")
 
 
 @patch("app.utils.db_utils.sentry_sdk.capture_message")
@@ -242,3 +274,244 @@ def test_can_update_client_support(mock_print):
     payload = {"role": "support", "id": 1}
     assert not db_utils.can_update_client(payload, DummyClient())
     mock_print.assert_called()
+
+
+# ------------------- TEST iter_pages / read_table -------------------
+# Tests de la lecture paginée (keyset) sur une base SQLite en mémoire
+
+
+@pytest.fixture
+def sqlite_session():
+    """
+    Fixture qui fournit un sessionmaker lié à une base SQLite en mémoire
+    contenant 7 rôles (id 1 à 7).
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from app.database import Base
+    from app.models.collaborateur import Role
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    SessionTest = sessionmaker(bind=engine)
+    with SessionTest() as db:
+        db.add_all([Role(role=f"role{i}", permissions={}) for i in range(1, 8)])
+        db.commit()
+    return SessionTest
+
+
+def test_iter_pages_decoupe_en_pages(sqlite_session):
+    """Vérifie que la table est lue par pages de taille page_size, dans l'ordre de la clé."""
+    from app.models.collaborateur import Role
+
+    pages = list(db_utils.iter_pages(Role, sqlite_session, page_size=3))
+    assert [len(p) for p in pages] == [3, 3, 1]
+    assert [ligne["id"] for p in pages for ligne in p] == list(range(1, 8))
+
+
+def test_iter_pages_limit_et_after_id(sqlite_session):
+    """Vérifie que --limit et --after-id bornent la lecture."""
+    from app.models.collaborateur import Role
+
+    pages = list(
+        db_utils.iter_pages(Role, sqlite_session, limit=3, after_id=2, page_size=2)
+    )
+    assert [ligne["id"] for p in pages for ligne in p] == [3, 4, 5]
+
+
+@patch("app.utils.db_utils.console.print")
+def test_read_table_retourne_le_total(mock_console, sqlite_session):
+    """Vérifie que read_table affiche chaque page et retourne le nombre de lignes."""
+    from app.models.collaborateur import Role
+
+    assert db_utils.read_table(Role, sqlite_session, page_size=5) == 7
+    assert db_utils.read_table(Role, sqlite_session, after_id=7) == 0
+
+
+def test_iter_pages_projection(sqlite_session):
+    """Vérifie que seules les colonnes demandées sont renvoyées, même sans la clé primaire."""
+    from app.models.collaborateur import Role
+
+    pages = list(
+        db_utils.iter_pages(Role, sqlite_session, page_size=4, colonnes=["role"])
+    )
+    assert [len(p) for p in pages] == [4, 3]
+    assert pages[0][0] == {"role": "role1"}
+
+
+def test_parse_colonnes():
+    """Vérifie la conversion de l'option --columns et le rejet des colonnes inconnues."""
+    from app.models.evenement import Evenement
+
+    assert db_utils.parse_colonnes(Evenement, "id, lieu,date_debut") == [
+        "id",
+        "lieu",
+        "date_debut",
+    ]
+    assert "notes" in db_utils.parse_colonnes(Evenement, None)
+    with pytest.raises(typer.BadParameter):
+        db_utils.parse_colonnes(Evenement, "id,inconnue")
+
+
+# ------------------- TEST registre des métadonnées -------------------
+
+
+def test_get_meta_est_en_cache():
+    """Vérifie que les métadonnées d'un modèle sont calculées une seule fois."""
+    from app.models.contrat import Contrat
+
+    meta = db_utils.get_meta(Contrat)
+    assert db_utils.get_meta(Contrat) is meta
+    assert meta.pk == "id"
+    assert meta.colonnes[0] == "id"
+    assert "montant_restant" in meta.types
+
+
+def test_row_to_dict():
+    """Vérifie la conversion d'une instance en dictionnaire de colonnes."""
+    from app.models.collaborateur import Role
+
+    role = Role(id=3, role="support", permissions={})
+    assert db_utils.row_to_dict(Role, role) == {
+        "id": 3,
+        "role": "support",
+        "permissions": {},
+    }
+
+
+# ------------------- TEST add_row / add_rows -------------------
+# Insertions avec INSERT ... RETURNING : aucun aller-retour après l'insertion
+
+
+def _compter_requetes(SessionTest):
+    """Enregistre les requêtes SQL envoyées par le moteur du sessionmaker."""
+    from sqlalchemy import event
+
+    requetes = []
+    event.listen(
+        SessionTest.kw["bind"],
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: requetes.append(statement),
+    )
+    return requetes
+
+
+def test_add_row_une_seule_requete(sqlite_session):
+    """Vérifie que add_row renvoie la ligne créée (id compris) en une seule requête."""
+    from app.models.collaborateur import Role
+
+    requetes = _compter_requetes(sqlite_session)
+    with sqlite_session() as db:
+        ligne = db_utils.add_row(db, Role, {"role": "nouveau", "inconnue": 1})
+        db.commit()
+
+    assert ligne == {"id": 8, "role": "nouveau", "permissions": {}}
+    assert len(requetes) == 1
+    assert "RETURNING" in requetes[0].upper()
+
+
+def test_add_rows_par_lot(sqlite_session):
+    """
+    Vérifie que add_rows renvoie les lignes créées : dans l'ordre donné par défaut,
+    et en un seul INSERT groupé quand l'ordre n'est pas demandé.
+    """
+    from app.models.collaborateur import Role
+
+    with sqlite_session() as db:
+        lignes = db_utils.add_rows(db, Role, [{"role": f"r{i}"} for i in range(5)])
+        db.commit()
+    assert [ligne["role"] for ligne in lignes] == [f"r{i}" for i in range(5)]
+    assert [ligne["id"] for ligne in lignes] == list(range(8, 13))
+
+    requetes = _compter_requetes(sqlite_session)
+    with sqlite_session() as db:
+        lignes = db_utils.add_rows(
+            db, Role, [{"role": f"s{i}"} for i in range(5)], ordonne=False
+        )
+        db.commit()
+    assert sorted(ligne["id"] for ligne in lignes) == list(range(13, 18))
+    assert len(requetes) == 1
+    assert db_utils.add_rows(None, Role, []) == []
+
+
+# ------------------- TEST filtrer_par_role -------------------
+
+
+def test_filtrer_par_role():
+    """Vérifie que seuls les contrats (commercial) et événements (support) sont restreints."""
+    from sqlalchemy import select
+    from app.models.contrat import Contrat
+    from app.models.client import Client
+
+    commercial = {"role": "commercial", "id": 4}
+    requete = db_utils.filtrer_par_role(Contrat, select(Contrat.id), commercial)
+    assert "contact_commercial_id" in str(requete)
+
+    requete = select(Client.id)
+    assert db_utils.filtrer_par_role(Client, requete, commercial) is requete
+    gestion = {"role": "gestion", "id": 1}
+    requete = select(Contrat.id)
+    assert db_utils.filtrer_par_role(Contrat, requete, gestion) is requete
+
+
+# ------------------- TEST pager -------------------
+
+
+def test_pager_lit_les_pages_au_defilement(monkeypatch):
+    """
+    Vérifie que le pager ne lit que les pages nécessaires à la fenêtre affichée,
+    et que les largeurs de colonnes sont mesurées sur l'échantillon.
+    """
+    from io import StringIO
+    from rich.console import Console
+    from app.models.collaborateur import Role
+    from app.utils import pager_utils
+
+    monkeypatch.setattr(pager_utils.config, "PAGER_ECHANTILLON", 10)
+    lues = []
+
+    def pages():
+        for numero in range(5):
+            lues.append(numero)
+            yield [
+                {"id": numero * 10 + i, "role": "x" * (i + 1 if numero == 0 else 60)}
+                for i in range(10)
+            ]
+
+    console = Console(file=StringIO(), force_terminal=True, width=80, height=20)
+    pager = pager_utils.Pager(Role, pages(), console, hauteur=8)
+    touches = iter(["j", " ", "\x1b[B", "q"])
+    total = pager.executer(lire_touche=lambda: next(touches))
+
+    # Fenêtre : lignes 10 à 17 -> 2 pages lues sur 5
+    assert lues == [0, 1]
+    assert total == 20
+    assert pager.debut == 10
+    # Largeurs mesurées sur la première page, pas sur les cellules de 60 caractères
+    assert pager.largeurs == [2, 10]
+
+    pager.touche("g")
+    assert pager.debut == 0
+    assert not pager.touche("q")
+
+
+def test_largeurs_colonnes_tient_dans_le_terminal():
+    """Vérifie que les colonnes sont bornées puis réduites pour tenir à l'écran."""
+    from app.utils.pager_utils import largeurs_colonnes
+
+    echantillon = [("1", "a" * 100, "b" * 30)]
+    assert largeurs_colonnes(["id", "nom", "notes"], echantillon, 200, 40) == [
+        2,
+        40,
+        30,
+    ]
+    assert largeurs_colonnes(["id", "nom", "notes"], echantillon, 42, 40) == [
+        2,
+        20,
+        20,
+    ]
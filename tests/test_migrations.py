@@ -0,0 +1,235 @@
+import json
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+from typer.testing import CliRunner
+from app import database
+from app.cli import db_cli
+from app.database import Base
+from app.migrations import moteur
+from app.migrations.operations import Backfill, CreerIndex
+from app.migrations.versions import MIGRATIONS, Migration
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def engine():
+    """Fixture qui fournit une base SQLite en mémoire vide (sans aucune table)."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    yield engine
+    engine.dispose()
+
+
+def _index(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+# ------------------- TEST migrer -------------------
+
+
+def test_migrer_base_neuve_puis_a_jour(engine):
+    """
+    Vérifie qu'une base vide est créée par les migrations (tables et index),
+    puis qu'une seconde exécution n'applique plus rien.
+    """
+    assert moteur.migrer(engine, afficher=lambda _: None) == [1, 2, 3]
+
+    assert "ix_evenements_sans_support" in _index(engine, "evenements")
+    with engine.connect() as connexion:
+        assert moteur.version_actuelle(connexion) == 3
+    assert moteur.migrer(engine, afficher=lambda _: None) == []
+
+
+def test_migrer_base_existante_index_sans_reecrire_les_clients(engine):
+    """
+    Vérifie la migration d'une base créée avant les index : les index sont
+    ajoutés et les dates de mise à jour des clients existants ne sont pas touchées.
+    """
+    moteur.migrer(engine, cible=1, afficher=lambda _: None)
+    with engine.begin() as connexion:
+        for table in ("contrats", "evenements"):
+            for index in _index(engine, table):
+                connexion.exec_driver_sql(f"DROP INDEX {index}")
+        connexion.exec_driver_sql(
+            "INSERT INTO clients (nom_complet, email, telephone, entreprise, "
+            "date_creation) VALUES ('C', 'c@e.fr', '01', 'E', '2024-01-01')"
+        )
+
+    assert moteur.migrer(engine, afficher=lambda _: None) == [2, 3]
+
+    assert "ix_contrats_non_payes" in _index(engine, "contrats")
+    with engine.connect() as connexion:
+        manquantes = connexion.exec_driver_sql(
+            "SELECT COUNT(*) FROM clients WHERE derniere_mise_a_jour IS NULL"
+        ).scalar()
+    assert manquantes == 1
+
+
+def test_backfill_par_lots(engine):
+    """Vérifie qu'un rattrapage traite toutes les lignes, par lots de `taille_lot`."""
+    moteur.migrer(engine, afficher=lambda _: None)
+    with engine.begin() as connexion:
+        for i in range(5):
+            connexion.exec_driver_sql(
+                "INSERT INTO clients (nom_complet, email, telephone, entreprise, "
+                f"date_creation) VALUES ('C{i}', 'c{i}@e.fr', '01', 'E', '2024-01-0{i + 1}')"
+            )
+    backfill = Backfill(
+        "clients",
+        "derniere_mise_a_jour = date_creation",
+        "derniere_mise_a_jour IS NULL",
+        taille_lot=2,
+    )
+    rattrapage = Migration(99, "Rattrapage de test", [backfill])
+
+    moteur.appliquer(engine, rattrapage)
+
+    with engine.connect() as connexion:
+        manquantes = connexion.exec_driver_sql(
+            "SELECT COUNT(*) FROM clients WHERE derniere_mise_a_jour IS NULL"
+        ).scalar()
+    assert manquantes == 0
+    assert backfill.instructions(None)[0].endswith("LIMIT 2)")
+
+
+def test_migrer_dry_run_n_execute_rien(engine):
+    """Vérifie que --dry-run affiche le SQL sans créer de table."""
+    sortie = []
+
+    assert moteur.migrer(engine, dry_run=True, afficher=sortie.append) == [1, 2, 3]
+
+    assert inspect(engine).get_table_names() == []
+    assert any(ligne.startswith("CREATE TABLE clients") for ligne in sortie)
+
+
+def test_migrer_permissions_des_roles_par_defaut(engine):
+    """
+    Vérifie que les anciennes permissions {"read", "write"} des rôles par défaut
+    sont remplacées, sans toucher aux permissions déjà au bon format.
+    """
+    from app.auth.permissions import get_default_permissions
+
+    moteur.migrer(engine, cible=2, afficher=lambda _: None)
+    with engine.begin() as connexion:
+        connexion.exec_driver_sql(
+            "INSERT INTO roles (role, permissions) VALUES "
+            """('gestion', '{"read": true, "write": false}'), """
+            """('support', '{"client": ["lire"]}')"""
+        )
+
+    assert moteur.migrer(engine, afficher=lambda _: None) == [3]
+
+    with engine.connect() as connexion:
+        permissions = dict(
+            connexion.exec_driver_sql("SELECT role, permissions FROM roles").all()
+        )
+    assert json.loads(permissions["gestion"]) == get_default_permissions("gestion")
+    assert json.loads(permissions["support"]) == {"client": ["lire"]}
+
+
+def test_migrations_couvrent_les_index_des_modeles():
+    """Vérifie que chaque index déclaré dans les modèles est créé par une migration."""
+    from app.models import client, collaborateur, contrat, evenement  # noqa: F401
+
+    index_modeles = {
+        index.name for table in Base.metadata.tables.values() for index in table.indexes
+    }
+    index_migrations = {
+        operation.nom
+        for migration in MIGRATIONS
+        for operation in migration.operations
+        if isinstance(operation, CreerIndex)
+    }
+    assert index_modeles <= index_migrations
+
+
+# ------------------- TEST opérations PostgreSQL -------------------
+
+
+def test_creer_index_concurrently_sur_postgresql():
+    """Vérifie le SQL produit pour PostgreSQL : CONCURRENTLY, hors transaction."""
+    from types import SimpleNamespace
+
+    connexion = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+    operation = CreerIndex(
+        "clients_email_key", "clients", ["email"], unique=True, contrainte=True
+    )
+
+    assert operation.instructions(connexion) == [
+        "SET lock_timeout = '5s'",
+        "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS clients_email_key "
+        "ON clients (email)",
+        "ALTER TABLE clients ADD CONSTRAINT clients_email_key "
+        "UNIQUE USING INDEX clients_email_key",
+        "RESET lock_timeout",
+    ]
+    assert operation.transactionnelle(connexion) is False
+    assert Backfill("t", "a = 1", "a IS NULL").transactionnelle(connexion) is False
+
+
+def test_verrou_migrations_sur_postgresql():
+    """Vérifie que le verrou consultatif est pris puis relâché, hors transaction."""
+    from unittest.mock import MagicMock
+
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    connexion = engine.connect.return_value.execution_options.return_value
+    connexion.__enter__.return_value = connexion
+
+    with moteur.verrou_migrations(engine):
+        assert connexion.execute.call_count == 1
+
+    engine.connect.return_value.execution_options.assert_called_once_with(
+        isolation_level="AUTOCOMMIT"
+    )
+    appels = connexion.execute.call_args_list
+    assert [str(appel.args[0]) for appel in appels] == [
+        "SELECT pg_advisory_lock(:cle)",
+        "SELECT pg_advisory_unlock(:cle)",
+    ]
+    assert appels[0].args[1] == {"cle": moteur.CLE_VERROU_MIGRATIONS}
+
+
+def test_migrer_lit_la_version_sous_verrou(engine, monkeypatch):
+    """Vérifie que la version du schéma n'est lue qu'une fois le verrou pris."""
+    from contextlib import contextmanager
+
+    etapes = []
+    lire_version = moteur.version_actuelle
+
+    @contextmanager
+    def verrou(engine_verrouille):
+        etapes.append("verrou")
+        yield
+        etapes.append("libération")
+
+    def version_actuelle(connexion):
+        etapes.append("version")
+        return lire_version(connexion)
+
+    monkeypatch.setattr(moteur, "verrou_migrations", verrou)
+    monkeypatch.setattr(moteur, "version_actuelle", version_actuelle)
+
+    moteur.migrer(engine, afficher=lambda _: None)
+
+    assert etapes == ["verrou", "version", "libération"]
+
+
+# ------------------- TEST db migrate -------------------
+
+
+def test_cli_migrate(engine, monkeypatch):
+    """Vérifie la commande db migrate (dry-run puis application)."""
+    monkeypatch.setattr(database, "_engine", engine)
+
+    result = runner.invoke(db_cli.app, ["migrate", "--dry-run"])
+    assert result.exit_code == 0, result.output
+    assert "-- Migration 0002" in result.output
+    assert "schema_version" not in inspect(engine).get_table_names()
+
+    result = runner.invoke(db_cli.app, ["migrate"])
+    assert result.exit_code == 0, result.output
+    assert "Schéma mis à jour : version 3" in result.output
@@ -0,0 +1,61 @@
+import typer
+from app.cli import shell_cli
+from app.cli.__main__ import app
+from app.cli import db_cli
+from app.utils import db_utils
+
+
+def lignes(*commandes):
+    """Simule la saisie utilisateur : renvoie chaque commande puis EOF (Ctrl-D)."""
+    it = iter(commandes)
+
+    def lire_ligne(prompt):
+        try:
+            return next(it)
+        except StopIteration:
+            raise EOFError
+
+    return lire_ligne
+
+
+def test_shell_partage_le_token_entre_commandes(monkeypatch):
+    """
+    Vérifie que plusieurs commandes exécutées dans le shell ne vérifient le token qu'une fois.
+    - Monkeypatch `verifier_connexion` pour compter les vérifications.
+    - Monkeypatch `read_table` pour éviter l'accès réel à la base.
+    """
+    appels = []
+
+    def fake_connexion():
+        appels.append(1)
+        return {"role": "gestion", "id": 1, "email": "g@test.com"}
+
+    monkeypatch.setattr(db_utils, "verifier_connexion", fake_connexion)
+    monkeypatch.setattr(db_cli, "read_table", lambda *a, **kw: 0)
+
+    shell_cli.lancer_shell(
+        app, lignes("db read-clients", "db read-contrats --limit 5", "exit")
+    )
+
+    assert len(appels) == 1
+
+
+def test_shell_continue_apres_une_erreur(monkeypatch):
+    """
+    Vérifie qu'une commande inconnue ou en échec n'arrête pas le shell.
+    """
+    executees = []
+    mini_app = typer.Typer()
+
+    @mini_app.command("ok")
+    def ok():
+        executees.append("ok")
+
+    @mini_app.command("boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(shell_cli.console, "print", lambda *a, **kw: None)
+    shell_cli.lancer_shell(mini_app, lignes("inconnue", "boom", "ok", "'non fermé"))
+
+    assert executees == ["ok"]
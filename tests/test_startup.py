@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Racine du dépôt (pour lancer `python -m app.cli` dans un sous-processus)
+RACINE = Path(__file__).resolve().parent.parent
+
+# Budget de temps d'import pour `--help` (somme des temps "self" de -X importtime)
+BUDGET_IMPORT_MS = 800
+
+# Modules lourds qui ne doivent pas être chargés pour afficher l'aide
+MODULES_INTERDITS = ("sqlalchemy", "psycopg2", "sentry_sdk", "werkzeug", "app.models")
+
+
+def lancer_cli(*args, cwd=RACINE):
+    """
+    Lance la CLI avec `python -X importtime` dans un environnement sans configuration de base.
+
+    Retour :
+        tuple : (code de sortie, liste des modules importés, temps d'import total en ms)
+    """
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in ("DB_USER", "DB_PASSWORD", "SENTRY_DSN")
+    }
+    env["PYTHONPATH"] = str(RACINE)
+    resultat = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "app.cli", *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    modules = []
+    total_us = 0
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        self_us, _, module = ligne.split(":", 1)[1].split("|")
+        total_us += int(self_us)
+        modules.append(module.strip())
+    return resultat.returncode, modules, total_us / 1000
+
+
+def test_help_respecte_le_budget_de_demarrage():
+    """
+    Vérifie que `--help` ne charge pas les modules lourds et reste sous le budget d'import.
+    """
+    code, modules, total_ms = lancer_cli("--help")
+
+    assert code == 0
+    charges = [m for m in modules if m.startswith(MODULES_INTERDITS)]
+    assert charges == []
+    assert total_ms < BUDGET_IMPORT_MS
+
+
+def test_logout_sans_moteur_de_base(tmp_path):
+    """
+    Vérifie que `auth logout` fonctionne sans configuration de base ni moteur SQLAlchemy.
+    """
+    (tmp_path / ".token").write_text("fake-token")
+
+    code, modules, _ = lancer_cli("auth", "logout", cwd=tmp_path)
+
+    assert code == 0
+    assert not (tmp_path / ".token").exists()
+    assert "psycopg2" not in modules
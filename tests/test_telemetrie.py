@@ -0,0 +1,146 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from sentry_init import TransportLots  # Importé avant que le DSN de test soit défini
+from app import config, telemetrie
+
+
+@pytest.fixture
+def spool(tmp_path, monkeypatch):
+    """Active la télémétrie avec un spool temporaire (aucun envoi réel)."""
+    chemin = tmp_path / "telemetrie.jsonl"
+    monkeypatch.setattr(config, "SENTRY_DSN", "https://cle@exemple.invalid/1")
+    monkeypatch.setattr(config, "TELEMETRIE_SPOOL", str(chemin))
+    monkeypatch.setattr(config, "TELEMETRIE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(config, "TELEMETRIE_BATCH_SIZE", 3)
+    monkeypatch.setattr(config, "TELEMETRIE_DELAI_MAX", 300)
+    return chemin
+
+
+def test_sans_dsn_aucun_evenement(tmp_path, monkeypatch):
+    """Vérifie que, sans SENTRY_DSN, rien n'est écrit ni envoyé."""
+    monkeypatch.setattr(config, "SENTRY_DSN", None)
+    monkeypatch.setattr(config, "TELEMETRIE_SPOOL", str(tmp_path / "spool"))
+
+    assert not telemetrie.evenement_metier("Contrat signé")
+    assert telemetrie.expedier(forcer=True) == 0
+    assert not (tmp_path / "spool").exists()
+
+
+def test_evenements_envoyes_par_lot(spool):
+    """Vérifie que les événements restent en file jusqu'au lot complet, envoyé en un message."""
+    with patch("app.telemetrie.envoyer") as envoyer:
+        telemetrie.evenement_metier("Contrat signé : ID 1", client=4)
+        telemetrie.evenement_metier("Contrat signé : ID 2")
+        assert telemetrie.expedier() == 0  # Lot incomplet : rien n'est envoyé
+        envoyer.assert_not_called()
+
+        telemetrie.evenement_metier("Contrat signé : ID 3")
+        assert telemetrie.expedier() == 3
+
+    envoyer.assert_called_once()
+    evenements = envoyer.call_args.args[0]
+    assert [e["message"] for e in evenements][0] == "Contrat signé : ID 1"
+    assert evenements[0]["contexte"] == {"client": 4}
+    assert not spool.exists()
+
+
+def test_echantillonnage_et_echec_envoi(spool, monkeypatch):
+    """Vérifie l'échantillonnage et la remise en file d'un lot dont l'envoi échoue."""
+    monkeypatch.setattr(config, "TELEMETRIE_SAMPLE_RATE", 0.0)
+    assert not telemetrie.evenement_metier("ignoré")
+    assert not spool.exists()
+
+    monkeypatch.setattr(config, "TELEMETRIE_SAMPLE_RATE", 1.0)
+    telemetrie.evenement_metier("gardé")
+    with patch("app.telemetrie.envoyer", side_effect=OSError("réseau")):
+        assert telemetrie.expedier(forcer=True) == 0
+    # Envoi non confirmé, sans exception : le lot reste aussi dans la file
+    with patch("app.telemetrie.envoyer", return_value=False):
+        assert telemetrie.expedier(forcer=True) == 0
+
+    assert [e["message"] for e in telemetrie.lire_spool(str(spool))] == ["gardé"]
+    assert list(spool.parent.glob("*.envoi")) == []
+
+
+class TransportTest(TransportLots):
+    """Transport de test : garde les enveloppes, ou simule un refus de Sentry."""
+
+    def __init__(self, refus: bool = False):
+        super().__init__("https://cle@exemple.invalid/1", timeout=0.1)
+        self.refus = refus
+        self.envois = []
+
+    def _poster(self, corps):
+        if self.refus:
+            return False
+        self.envois.append(corps)
+        return True
+
+
+@pytest.mark.parametrize("refus, confirme", [(False, True), (True, False)])
+def test_envoi_confirme_par_le_transport(spool, refus, confirme):
+    """
+    Vérifie qu'un envoi n'est confirmé que si Sentry accepte chaque message :
+    un refus ou une erreur réseau ne lève pas d'exception mais n'est pas un succès.
+    """
+    transport = TransportTest(refus)
+    evenements = [{"message": f"Contrat signé : ID {i}"} for i in range(150)]
+
+    assert telemetrie.envoyer(evenements, 0.1, transport=transport) is confirme
+
+    assert len(transport.envois) == (0 if refus else 2)  # 100 événements par message
+    assert transport.acceptees + transport.refusees == 2
+
+
+@pytest.mark.parametrize("statut, accepte", [(200, True), (500, False)])
+def test_transport_lots_reponse_http(statut, accepte):
+    """Vérifie que TransportLots ne compte comme acceptée qu'une réponse HTTP 2xx."""
+    requetes = []
+
+    class Gestionnaire(BaseHTTPRequestHandler):
+        def do_POST(self):
+            requetes.append(
+                (self.path, self.rfile.read(int(self.headers["Content-Length"])))
+            )
+            self.send_response(statut)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    serveur = HTTPServer(("127.0.0.1", 0), Gestionnaire)
+    fil = threading.Thread(target=serveur.handle_request)
+    fil.start()
+    try:
+        transport = TransportLots(
+            f"http://cle@127.0.0.1:{serveur.server_port}/1", timeout=2
+        )
+        assert transport._poster(b"{}") is accepte
+    finally:
+        fil.join()
+        serveur.server_close()
+
+    assert requetes == [("/api/1/envelope/", b"{}")]
+    assert (
+        TransportLots("http://cle@127.0.0.1:9/1", timeout=0.5)._poster(b"{}") is False
+    )
+
+
+def test_spool_pris_par_un_autre_processus(spool):
+    """Vérifie qu'un spool renommé entre-temps par un autre processus est ignoré."""
+    telemetrie.evenement_metier("Contrat signé")
+
+    with patch("app.telemetrie.os.replace", side_effect=FileNotFoundError):
+        assert telemetrie.expedier(forcer=True) == 0
+
+
+def test_lot_pret_apres_delai(spool):
+    """Vérifie qu'un lot incomplet part quand son plus ancien événement a expiré."""
+    evenements = [{"horodatage": 1000.0, "message": "ancien"}]
+
+    assert not telemetrie.lot_pret(evenements, maintenant=1010.0)
+    assert telemetrie.lot_pret(evenements, maintenant=1300.0)